@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+قياس أداء مسار الاستيراد ← التخزين ← التصدير في wordtotemplates.py
+يولّد ملفات وورد ومشاريع اصطناعية بأحجام مختلفة ويقيس الزمن وذروة الذاكرة لكل مرحلة.
+
+أمثلة:
+    python benchmark.py --sizes 1000 10000 100000 --output results.json
+    python benchmark.py --compare old.json new.json
+    python benchmark.py --startup
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import zipfile
+import subprocess
+import importlib.util
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+import wordtotemplates as wt
+
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+STAGES = ['extract', 'extract_stream', 'import', 'generate_js', 'save_project', 'load_project', 'merge', 'export_word', 'normalize', 'tafqit']
+REGRESSION_THRESHOLD = 0.20
+
+# ميزانية الإقلاع: استيراد الوحدة دون واجهة، ثم الزمن حتى أول رسم للنافذة
+HEADLESS_IMPORT_BUDGET_MS = 60
+FIRST_PAINT_BUDGET_MS = 1500
+HEAVY_MODULES = ('PyQt5', 'docx', 'lxml', 'win32com')
+
+# عبارات لبناء محتوى اصطناعي قريب من النماذج الحقيقية
+PHRASES = [
+    'لدي أنا ....... ـــ القاضي في المحكمة العامة',
+    'أدعى ............. بقوله :',
+    'وبعرض الدعوى على المدعى عليه أجاب بقوله :',
+    'بتاريخ 12 / 05 / 1445 هـ',
+    'مبلغاً وقدره 000000 ريال',
+    'وبناء على ما تقدم فقد حكمت بما يلي',
+    'هكذا قال',
+    '(اسم القاضي)',
+    'وبالله التوفيق وصلى الله على نبينا محمد',
+    'فجرى سؤال المدعى عليه هل هو مستعد ببذل اليمين',
+]
+KEYWORDS = ['لدي', 'قائم', 'أدعى', 'أجاب', 'حكم', 'صلح', 'يمين', 'نكول', 'شطب', 'غياب']
+
+
+# ==================== توليد البيانات ====================
+
+def synthetic_templates(size, seed=0):
+    """نماذج اصطناعية موزعة على التصنيفات الافتراضية"""
+    rng = random.Random(seed)
+    templates = {cat: [] for cat in wt.DEFAULT_CATEGORIES}
+    for i in range(size):
+        cat = wt.DEFAULT_CATEGORIES[i % len(wt.DEFAULT_CATEGORIES)]
+        content = ' '.join(rng.choice(PHRASES) for _ in range(rng.randint(2, 8)))
+        keyword = f'{rng.choice(KEYWORDS)}{i}'
+        num = str(len(templates[cat]) + 1)
+        # كما في البيانات الفعلية: نماذج بلا رقم تتكرر كلمتها المفتاحية داخل التصنيف
+        if i % 10 == 0:
+            num, keyword = '', cat
+        templates[cat].append(wt.Template(num, keyword, content, cat))
+    return templates
+
+
+def template_rows(templates):
+    """صفوف (الرقم، الكلمة، المحتوى) لكل تصنيف غير فارغ للمقارنة"""
+    return {cat: [(t.num, t.keyword, t.content) for t in tmpls] for cat, tmpls in templates.items() if tmpls}
+
+
+def synthetic_amounts(size, seed=0):
+    """مبالغ أحكام اصطناعية: أغلبها صحيحة وبعضها بهللات، مع تكرار طبيعي للمبالغ الشائعة"""
+    rng = random.Random(seed)
+    amounts = []
+    for _ in range(size):
+        amount = rng.choice((rng.randint(1, 100000), rng.randint(1, 10 ** 9), rng.randrange(100, 10 ** 7, 500)))
+        if rng.random() < 0.3:
+            amount = f'{amount}.{rng.randint(1, 99):02d}'
+        amounts.append(amount)
+    return amounts
+
+
+def _cell_xml(text):
+    return f'<w:tc><w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p></w:tc>'
+
+
+def write_synthetic_docx(templates, file_path):
+    """كتابة جدول لكل تصنيف في ملف docx مباشرة دون python-docx (أسرع بكثير للأحجام الكبيرة)"""
+    with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ))
+        z.writestr('_rels/.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+            '</Relationships>'
+        ))
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        ]
+        for cat, tmpls in templates.items():
+            if not tmpls:
+                continue
+            parts.append('<w:tbl>')
+            parts.append('<w:tr>' + _cell_xml(f'صندوق {cat}') + _cell_xml('') + _cell_xml('') + '</w:tr>')
+            for t in tmpls:
+                parts.append('<w:tr>' + _cell_xml(t.num) + _cell_xml(t.keyword) + _cell_xml(t.content) + '</w:tr>')
+            parts.append('</w:tbl><w:p/>')
+        parts.append('<w:sectPr/></w:body></w:document>')
+        z.writestr('word/document.xml', ''.join(parts))
+
+
+# ==================== القياس ====================
+
+def _peak_rss_reader():
+    """دالة تقرأ ذروة RSS للعملية بالكيلوبايت بعد تصفيرها إلى الحالي إن أمكن
+
+    الذاكرة التي حررتها المراحل السابقة تبقى محسوبة في RSS ويعاد استخدامها،
+    فتُعاد إلى النظام أولاً (malloc_trim) ثم تُصفّر الذروة عبر clear_refs في لينكس.
+    """
+    if os.path.exists('/proc/self/clear_refs'):
+        import ctypes
+        try:
+            ctypes.CDLL(None).malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+
+        def read():
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1])
+        return read
+
+    import resource
+    # ru_maxrss بالكيلوبايت في لينكس وبالبايت في ماك
+    scale = 1024 if sys.platform == 'darwin' else 1
+    return lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+
+
+def peak_rss_growth(func):
+    """زيادة ذروة RSS بالميغابايت عند تشغيل func في عملية ابنة (fork)
+
+    tracemalloc لا يرى إلا كومة بايثون، أما RSS فيشمل ذاكرة C مثل شجرة lxml في python-docx.
+    يعيد None حيث لا يتوفر fork (ويندوز).
+    """
+    if not hasattr(os, 'fork'):
+        return None
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 1
+        try:
+            read_peak = _peak_rss_reader()
+            before = read_peak()
+            func()
+            os.write(write_fd, str(read_peak() - before).encode())
+            status = 0
+        finally:
+            os._exit(status)
+    os.close(write_fd)
+    with os.fdopen(read_fd, 'rb') as f:
+        output = f.read()
+    _, status = os.waitpid(pid, 0)
+    if status or not output:
+        raise RuntimeError('فشل قياس الذاكرة في العملية الابنة')
+    return round(int(output) / 1024, 3)
+
+
+def measure(func, repeat):
+    """أفضل زمن من عدة تكرارات، ثم تشغيلان منفصلان لقياس ذروة الذاكرة
+
+    peak_mb لكومة بايثون فقط (tracemalloc)، و peak_rss_mb لكل ذاكرة العملية.
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {
+        'seconds': round(best, 6),
+        'peak_mb': round(peak / 1024 / 1024, 3),
+        'peak_rss_mb': peak_rss_growth(func),
+    }
+
+
+def run_size(size, work_dir, repeat, stages, log):
+    """قياس كل المراحل لحجم واحد"""
+    templates = synthetic_templates(size)
+    docx_path = os.path.join(work_dir, f'synthetic_{size}.docx')
+    project_path = os.path.join(work_dir, f'project_{size}.json')
+    write_synthetic_docx(templates, docx_path)
+
+    results = {}
+
+    def record(stage, func):
+        if stage not in stages:
+            return None
+        result, stats = measure(func, repeat)
+        results[stage] = stats
+        rss = stats['peak_rss_mb']
+        log(f'  {stage:<14} {stats["seconds"]:>10.4f} s  {stats["peak_mb"]:>10.2f} MB heap  '
+            f'{"-" if rss is None else f"{rss:.2f}":>10} MB RSS')
+        return result
+
+    # المراحل اللاحقة تعمل على ناتج ما قبلها، وعند تخطي مرحلة نستخدم البيانات الاصطناعية مباشرة
+    tables = record('extract', lambda: wt.read_word_tables(docx_path))
+    record('extract_stream', lambda: wt.stream_word_tables(docx_path).close())
+    imported = None
+    if tables is not None:
+        imported = record('import', lambda: wt.classify_tables(tables))
+    if imported is None:
+        imported = templates
+    record('generate_js', lambda: wt.render_js(wt.build_export_data(imported)))
+    record('save_project', lambda: wt.write_project(imported, project_path))
+    if {'load_project', 'merge'} & set(stages) and not os.path.exists(project_path):
+        wt.write_project(imported, project_path)
+    record('load_project', lambda: wt.read_project(project_path))
+    # دمج مشروع واحد مع نفسه يجب أن يعيده كما هو، بما فيه المفاتيح المكررة
+    merged = record('merge', lambda: wt.merge_projects([project_path])[0])
+    if merged is not None and template_rows(merged) != template_rows(imported):
+        raise RuntimeError('دمج مشروع واحد غيّر نماذجه')
+    record('export_word', lambda: wt.export_word_tables(imported, os.path.join(work_dir, f'export_{size}.docx')))
+    # التنظيف يعدّل النماذج، فكل تكرار يعمل على نسخة جديدة
+    record('normalize', lambda: wt.normalize_templates({
+        category: [wt.Template(t.num, t.keyword, t.content, category) for t in tmpls]
+        for category, tmpls in imported.items()
+    }))
+
+    amounts = synthetic_amounts(size)
+    record('tafqit', lambda: wt.tafqit_batch(amounts))
+    if 'tafqit' in results:
+        results['tafqit']['per_second'] = round(size / max(results['tafqit']['seconds'], 1e-9))
+
+    return {
+        'size': size,
+        'docx_bytes': os.path.getsize(docx_path),
+        'project_bytes': os.path.getsize(project_path) if os.path.exists(project_path) else None,
+        'stages': results,
+    }
+
+
+def run_benchmarks(sizes, repeat=3, stages=STAGES, log=print):
+    """تشغيل القياسات وإرجاع النتائج كقاموس قابل للحفظ"""
+    runs = []
+    with tempfile.TemporaryDirectory(prefix='wt-bench-') as work_dir:
+        for size in sizes:
+            log(f'{size} نموذج:')
+            runs.append(run_size(size, work_dir, repeat, stages, log))
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'runs': runs,
+    }
+
+
+# ==================== زمن الإقلاع ====================
+
+def measure_startup():
+    """قياس زمن الاستيراد عبر -X importtime والتأكد من عدم تحميل المكتبات الثقيلة"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import wordtotemplates'],
+        cwd=base_dir, capture_output=True, text=True
+    )
+
+    import_us = None
+    heavy = set()
+    for line in proc.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        if name == 'wordtotemplates':
+            import_us = int(parts[1])
+        if name.split('.')[0] in HEAVY_MODULES:
+            heavy.add(name.split('.')[0])
+
+    result = {
+        'headless_import_ms': round(import_us / 1000, 2) if import_us is not None else None,
+        'headless_import_budget_ms': HEADLESS_IMPORT_BUDGET_MS,
+        'heavy_modules_loaded': sorted(heavy),
+        'first_paint_ms': None,
+        'first_paint_budget_ms': FIRST_PAINT_BUDGET_MS,
+    }
+
+    if importlib.util.find_spec('PyQt5'):
+        proc = subprocess.run(
+            [sys.executable, os.path.join(base_dir, 'wordtotemplates.py'), '--startup-time'],
+            cwd=base_dir, capture_output=True, text=True, timeout=120
+        )
+        for line in proc.stdout.splitlines():
+            if line.startswith('first_paint_ms='):
+                result['first_paint_ms'] = float(line.split('=', 1)[1])
+
+    result['within_budget'] = (
+        result['headless_import_ms'] is not None
+        and result['headless_import_ms'] <= HEADLESS_IMPORT_BUDGET_MS
+        and not heavy
+        and (result['first_paint_ms'] is None or result['first_paint_ms'] <= FIRST_PAINT_BUDGET_MS)
+    )
+    return result
+
+
+# ==================== المقارنة ====================
+
+def compare_results(old, new, threshold=REGRESSION_THRESHOLD):
+    """مقارنة تشغيلين وإرجاع قائمة التراجعات التي تتجاوز النسبة المسموحة"""
+    old_runs = {run['size']: run['stages'] for run in old['runs']}
+    rows = []
+    for run in new['runs']:
+        before = old_runs.get(run['size'])
+        if not before:
+            continue
+        for stage, stats in run['stages'].items():
+            if stage not in before:
+                continue
+            for metric in ('seconds', 'peak_mb', 'peak_rss_mb'):
+                if before[stage].get(metric) is None or stats.get(metric) is None:
+                    continue
+                old_value, new_value = before[stage][metric], stats[metric]
+                ratio = new_value / old_value if old_value else 1.0
+                rows.append({
+                    'size': run['size'],
+                    'stage': stage,
+                    'metric': metric,
+                    'old': old_value,
+                    'new': new_value,
+                    'ratio': round(ratio, 3),
+                    'regression': ratio > 1 + threshold,
+                })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='قياس أداء محوّل النماذج')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='أحجام المجموعات الاصطناعية')
+    parser.add_argument('--repeat', type=int, default=3, help='عدد التكرارات لكل مرحلة')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help='المراحل المطلوب قياسها')
+    parser.add_argument('--output', '-o', default='benchmark_results.json', help='ملف حفظ النتائج')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='مقارنة ملفي نتائج')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help='نسبة التراجع المسموحة')
+    parser.add_argument('--startup', action='store_true', help='قياس زمن الإقلاع فقط ومقارنته بالميزانية')
+    args = parser.parse_args()
+
+    if args.startup:
+        result = measure_startup()
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return 0 if result['within_budget'] else 1
+
+    if args.compare:
+        with open(args.compare[0], 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.compare[1], 'r', encoding='utf-8') as f:
+            new = json.load(f)
+        rows = compare_results(old, new, args.threshold)
+        for row in rows:
+            flag = '  ⚠️ تراجع' if row['regression'] else ''
+            print(f"{row['size']:>8} {row['stage']:<14} {row['metric']:<8} "
+                  f"{row['old']:>10} → {row['new']:<10} x{row['ratio']}{flag}")
+        return 1 if any(row['regression'] for row in rows) else 0
+
+    results = run_benchmarks(args.sizes, args.repeat, args.stages)
+    results['startup'] = measure_startup()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f'تم حفظ النتائج في {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
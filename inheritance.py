@@ -0,0 +1,772 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+حاسبة المواريث: نسخة بايثون من computeInheritance في index.html
+بكسور دقيقة، مع حفظ النتائج حسب تركيبة الورثة، وحلّ دفعات كبيرة من ملف CSV بالتوازي.
+
+أمثلة:
+    python inheritance.py cases.csv -o results.csv
+    python inheritance.py --cross-check 2000
+    python inheritance.py --corpus inheritance_corpus.json
+"""
+
+import os
+import sys
+import re
+import csv
+import json
+import copy
+import random
+import argparse
+import subprocess
+from fractions import Fraction
+from functools import lru_cache
+from math import lcm
+
+
+# ترتيب الورثة كما في نموذج الموقع (معرّفات الحقول في index.html)
+HEIR_KEYS = (
+    'sons', 'daughters', 'grandsonsSon', 'granddaughtersSon',
+    'father', 'mother', 'grandfather', 'grandmotherMother', 'grandmotherFather',
+    'husband', 'wives',
+    'brothersFull', 'sistersFull', 'brothersFather', 'sistersFather',
+    'brothersMother', 'sistersMother',
+    'nephewsFull', 'nephewsFather', 'unclesFull', 'unclesFather',
+    'cousinsFull', 'cousinsFather',
+)
+
+FARD = 'فرض'
+TASEEB = 'تعصيب'
+FARD_TASEEB = 'فرض + تعصيب'
+
+# العصبات بالنفس بعد الإخوة: (المفتاح، الاسم، الترتيب)
+REMAINING_ASABA = (
+    ('nephewsFull', 'أبناء الأخ الشقيق', 1),
+    ('nephewsFather', 'أبناء الأخ لأب', 2),
+    ('unclesFull', 'العم الشقيق', 3),
+    ('unclesFather', 'العم لأب', 4),
+    ('cousinsFull', 'ابن العم الشقيق', 5),
+    ('cousinsFather', 'ابن العم لأب', 6),
+)
+
+# جهات التعصيب: الأقرب جهة يأخذ الباقي (البنوة ثم الأبوة ثم الأخوة ثم العمومة)
+ASABA_TIERS = {
+    'sons': 1, 'grandsonsSon': 1,
+    'father': 2, 'grandfather': 2,
+    'brothersFull': 3, 'sistersFull': 3, 'brothersFather': 4, 'sistersFather': 4,
+}
+# الإخوة والأخوات لغير أم بترتيب القرب: (المفتاح، الاسم في الحجب)
+SIBLINGS = (
+    ('brothersFull', 'الإخوة الأشقاء'), ('sistersFull', 'الأخوات الشقيقات'),
+    ('brothersFather', 'الإخوة لأب'), ('sistersFather', 'الأخوات لأب'),
+)
+# الأخوات عصبة مع البنات: (المفتاح، اسم الواحدة، اسم الجمع)
+SISTERS_WITH_DAUGHTERS = {
+    'sistersFull': ('الأخت الشقيقة', 'الأخوات الشقيقات'),
+    'sistersFather': ('الأخت لأب', 'الأخوات لأب'),
+}
+# أقرب عاصب ذكر يحجب من بعده، بالترتيب
+MALE_ASABA = (
+    ('sons', 'الأبناء'), ('grandsonsSon', 'أبناء الابن'), ('father', 'الأب'), ('grandfather', 'الجد'),
+    ('brothersFull', 'الإخوة الأشقاء'), ('brothersFather', 'الإخوة لأب'),
+)
+SPOUSES = ('husband', 'wives')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# تركيبات مع نتائج computeInheritance لها كما هي، تُولد بـ --cross-check N --save-corpus
+# وتُطابق بها compute_shares فقط. ما يخالف فيه الحل النهائي (solve) الموقع عمداً:
+# - أسماء الجمع: الموقع يكتب "الزوجةات" و"الجدةات" (تُصحح عند المقارنة عبر JS_LABEL_FIXES)
+# - complete_shares: الإخوة والأخوات مع البنات أو الفرع الذكر أو الجد، والعصبات الأبعد
+#   من عاصب موجود، يسقطون في الموقع دون ذكر؛ هنا يأخذون الباقي أو يُذكرون في المحجوبين
+# - allocate: ثلث الباقي للأم في العمريتين، وسدس الأب/الجد فرضاً مع أبناء الابن
+# ولم يُصحح بعد: الموقع لا يعدّ أولاد الابن فرعاً وارثاً في فروض الزوجين والأم والإخوة لأم
+CORPUS_FILE = 'inheritance_corpus.json'
+JS_LABEL_FIXES = {'الزوجةات': 'الزوجات', 'الجدةات': 'الجدات'}
+
+AWL_EXPLANATION = 'المسألة عائلة: مجموع الفروض يزيد عن أصل المسألة، فيُنقص من كل ذي فرض بقدر نسبته'
+RADD_EXPLANATION = 'الرد: الباقي يُرد على أصحاب الفروض (عدا الزوجين) بنسبة فروضهم'
+
+
+def canonical_heirs(heirs):
+    """تركيبة الورثة كمفتاح ثابت: أعداد صحيحة غير سالبة بترتيب HEIR_KEYS"""
+    key = []
+    for name in HEIR_KEYS:
+        try:
+            count = int(heirs.get(name) or 0)
+        except (TypeError, ValueError):
+            count = 0
+        key.append(max(count, 0))
+    return tuple(key)
+
+
+# ==================== قواعد الفروض والحجب ====================
+
+def compute_shares(heirs):
+    """الفروض والحجب والعول والرد بنفس قواعد computeInheritance في index.html"""
+    h = dict(zip(HEIR_KEYS, canonical_heirs(heirs)))
+    shares = []
+    blocked = []
+    total = Fraction(0)
+
+    def add(key, heir, count, share, value, kind, evidence, males=0, females=0):
+        nonlocal total
+        shares.append({
+            'key': key, 'heir': heir, 'count': count, 'share': share,
+            'share_value': value, 'type': kind, 'evidence': evidence,
+            'males': males, 'females': females,
+        })
+        total += value
+
+    def block(heir, blocked_by, reason):
+        blocked.append({'heir': heir, 'blocked_by': blocked_by, 'reason': reason})
+
+    has_branch = h['sons'] > 0 or h['daughters'] > 0
+    has_male_branch = h['sons'] > 0
+
+    # الحجب
+    if h['sons'] > 0 and h['grandsonsSon'] > 0:
+        block('أبناء الابن', 'الأبناء', 'الفرع الأقرب يحجب الأبعد')
+    if h['sons'] > 0 and h['granddaughtersSon'] > 0:
+        block('بنات الابن', 'الأبناء', 'الابن يحجب بنات الابن')
+
+    if h['father'] > 0 and h['grandfather'] > 0:
+        block('الجد', 'الأب', 'الأب يحجب الجد')
+        h['grandfather'] = 0
+
+    if h['father'] > 0:
+        if h['brothersFull'] > 0:
+            block('الإخوة الأشقاء', 'الأب', 'الأب يحجب الإخوة')
+        if h['sistersFull'] > 0:
+            block('الأخوات الشقيقات', 'الأب', 'الأب يحجب الأخوات')
+        if h['brothersFather'] > 0:
+            block('الإخوة لأب', 'الأب', 'الأب يحجب الإخوة لأب')
+        if h['sistersFather'] > 0:
+            block('الأخوات لأب', 'الأب', 'الأب يحجب الأخوات لأب')
+        h['brothersFull'] = h['sistersFull'] = h['brothersFather'] = h['sistersFather'] = 0
+
+    if has_branch:
+        if h['brothersMother'] > 0:
+            block('الإخوة لأم', 'الفرع الوارث', 'الفرع الوارث يحجب الإخوة لأم')
+        if h['sistersMother'] > 0:
+            block('الأخوات لأم', 'الفرع الوارث', 'الفرع الوارث يحجب الأخوات لأم')
+        h['brothersMother'] = h['sistersMother'] = 0
+
+    # 1. الزوج / الزوجة
+    if h['husband'] > 0:
+        add('husband', 'الزوج', 1,
+            '1/4' if has_branch else '1/2',
+            Fraction(1, 4) if has_branch else Fraction(1, 2),
+            FARD,
+            'قال تعالى: {فَإِن كَانَ لَهُنَّ وَلَدٌ فَلَكُمُ الرُّبُعُ مِمَّا تَرَكْنَ}' if has_branch
+            else 'قال تعالى: {وَلَكُمْ نِصْفُ مَا تَرَكَ أَزْوَاجُكُمْ إِن لَّمْ يَكُن لَّهُنَّ وَلَدٌ}',
+            males=1)
+
+    if h['wives'] > 0:
+        share = '1/8' if has_branch else '1/4'
+        add('wives', 'الزوجات' if h['wives'] > 1 else 'الزوجة', h['wives'],
+            share + (' (يقتسمن)' if h['wives'] > 1 else ''),
+            Fraction(1, 8) if has_branch else Fraction(1, 4),
+            FARD,
+            'قال تعالى: {فَإِن كَانَ لَكُمْ وَلَدٌ فَلَهُنَّ الثُّمُنُ مِمَّا تَرَكْتُم}' if has_branch
+            else 'قال تعالى: {وَلَهُنَّ الرُّبُعُ مِمَّا تَرَكْتُمْ إِن لَّمْ يَكُن لَّكُمْ وَلَدٌ}',
+            females=h['wives'])
+
+    # 2. الأب
+    if h['father'] > 0:
+        if has_male_branch:
+            add('father', 'الأب', 1, '1/6', Fraction(1, 6), FARD,
+                'قال تعالى: {وَلِأَبَوَيْهِ لِكُلِّ وَاحِدٍ مِّنْهُمَا السُّدُسُ مِمَّا تَرَكَ إِن كَانَ لَهُ وَلَدٌ}',
+                males=1)
+        elif h['daughters'] > 0:
+            add('father', 'الأب', 1, '1/6 + الباقي تعصيباً', Fraction(1, 6), FARD_TASEEB,
+                'يأخذ السدس فرضاً لوجود الفرع الوارث، والباقي تعصيباً لعدم وجود الذكور من الفرع',
+                males=1)
+        else:
+            add('father', 'الأب', 1, 'الباقي تعصيباً', Fraction(0), TASEEB,
+                'قال ﷺ: "ألحقوا الفرائض بأهلها فما بقي فلأولى رجل ذكر"',
+                males=1)
+
+    # 3. الأم
+    if h['mother'] > 0:
+        siblings = (h['brothersFull'] + h['sistersFull'] + h['brothersFather']
+                    + h['sistersFather'] + h['brothersMother'] + h['sistersMother'])
+        if has_branch or siblings >= 2:
+            share, value = '1/6', Fraction(1, 6)
+            evidence = 'قال تعالى: {فَإِن كَانَ لَهُ إِخْوَةٌ فَلِأُمِّهِ السُّدُسُ}'
+        elif (h['husband'] > 0 or h['wives'] > 0) and h['father'] > 0:
+            # العمريتان - ثلث الباقي
+            share, value = '1/3 الباقي', Fraction(1, 3)
+            evidence = 'هذه إحدى العمريتين: للأم ثلث الباقي بعد فرض الزوج/الزوجة، قضى بها عمر رضي الله عنه'
+        else:
+            share, value = '1/3', Fraction(1, 3)
+            evidence = 'قال تعالى: {فَإِن لَّمْ يَكُن لَّهُ وَلَدٌ وَوَرِثَهُ أَبَوَاهُ فَلِأُمِّهِ الثُّلُثُ}'
+        add('mother', 'الأم', 1, share, value, FARD, evidence, females=1)
+
+    # 4. الجد (إذا لم يُحجب)
+    if h['grandfather'] > 0 and h['father'] == 0:
+        if has_male_branch:
+            add('grandfather', 'الجد', 1, '1/6', Fraction(1, 6), FARD,
+                'الجد يقوم مقام الأب عند عدمه، فله السدس مع الفرع الوارث الذكر', males=1)
+        elif h['daughters'] > 0:
+            add('grandfather', 'الجد', 1, '1/6 + الباقي تعصيباً', Fraction(1, 6), FARD_TASEEB,
+                'الجد يأخذ السدس فرضاً مع البنات، والباقي تعصيباً', males=1)
+        else:
+            add('grandfather', 'الجد', 1, 'الباقي تعصيباً', Fraction(0), TASEEB,
+                'الجد يأخذ الباقي تعصيباً عند عدم الفرع الوارث', males=1)
+
+    # 5. الجدات
+    grandmothers = h['grandmotherMother'] + h['grandmotherFather']
+    if grandmothers > 0 and h['mother'] == 0:
+        add('grandmothers', 'الجدات' if grandmothers > 1 else 'الجدة', grandmothers,
+            '1/6' + (' (يقتسمن)' if grandmothers > 1 else ''), Fraction(1, 6), FARD,
+            'للجدة أو الجدات السدس، قضى به أبو بكر الصديق رضي الله عنه', females=grandmothers)
+    elif grandmothers > 0 and h['mother'] > 0:
+        block('الجدة/الجدات', 'الأم', 'الأم تحجب الجدات')
+
+    # 6. البنات
+    if h['daughters'] > 0 and h['sons'] == 0:
+        if h['daughters'] == 1:
+            add('daughters', 'البنت', 1, '1/2', Fraction(1, 2), FARD,
+                'قال تعالى: {وَإِن كَانَتْ وَاحِدَةً فَلَهَا النِّصْفُ}', females=1)
+        else:
+            add('daughters', 'البنات', h['daughters'], '2/3 (يقتسمن)', Fraction(2, 3), FARD,
+                'قال تعالى: {فَإِن كُنَّ نِسَاءً فَوْقَ اثْنَتَيْنِ فَلَهُنَّ ثُلُثَا مَا تَرَكَ}',
+                females=h['daughters'])
+
+    # 7. الأبناء والبنات (تعصيب)
+    if h['sons'] > 0:
+        add('sons', 'الأبناء' + (' والبنات' if h['daughters'] > 0 else ''), h['sons'] + h['daughters'],
+            'الباقي تعصيباً (للذكر مثل حظ الأنثيين)', Fraction(0), TASEEB,
+            'قال تعالى: {يُوصِيكُمُ اللَّهُ فِي أَوْلَادِكُمْ لِلذَّكَرِ مِثْلُ حَظِّ الْأُنثَيَيْنِ}',
+            males=h['sons'], females=h['daughters'])
+
+    # 8. بنات الابن
+    if h['granddaughtersSon'] > 0 and h['sons'] == 0:
+        if h['daughters'] == 0:
+            if h['granddaughtersSon'] == 1:
+                add('granddaughtersSon', 'بنت الابن', 1, '1/2', Fraction(1, 2), FARD,
+                    'بنت الابن تأخذ النصف عند انفرادها وعدم وجود البنت', females=1)
+            else:
+                add('granddaughtersSon', 'بنات الابن', h['granddaughtersSon'], '2/3 (يقتسمن)',
+                    Fraction(2, 3), FARD, 'بنات الابن لهن الثلثان عند عدم وجود البنات',
+                    females=h['granddaughtersSon'])
+        elif h['daughters'] == 1:
+            add('granddaughtersSon', 'بنت/بنات الابن', h['granddaughtersSon'], '1/6 (تكملة الثلثين)',
+                Fraction(1, 6), FARD, 'بنات الابن لهن السدس تكملة الثلثين مع البنت الواحدة',
+                females=h['granddaughtersSon'])
+
+    # 9. أبناء الابن مع بنات الابن (تعصيب)
+    if h['grandsonsSon'] > 0 and h['sons'] == 0:
+        add('grandsonsSon', 'أبناء الابن' + (' وبنات الابن' if h['granddaughtersSon'] > 0 else ''),
+            h['grandsonsSon'] + h['granddaughtersSon'], 'الباقي تعصيباً', Fraction(0), TASEEB,
+            'أبناء الابن يعصبون بنات الابن، للذكر مثل حظ الأنثيين',
+            males=h['grandsonsSon'], females=h['granddaughtersSon'])
+        # حذف فرض بنات الابن إن أضيف، بنفس مطابقة الاسم في الموقع
+        for i, s in enumerate(shares):
+            if 'بنت' in s['heir'] and 'الابن' in s['heir']:
+                total -= s['share_value']
+                del shares[i]
+                break
+
+    # 10. الأخوات الشقيقات
+    if h['sistersFull'] > 0 and h['father'] == 0 and not has_branch and h['brothersFull'] == 0:
+        if h['sistersFull'] == 1:
+            add('sistersFull', 'الأخت الشقيقة', 1, '1/2', Fraction(1, 2), FARD,
+                'قال تعالى: {إِنِ امْرُؤٌ هَلَكَ لَيْسَ لَهُ وَلَدٌ وَلَهُ أُخْتٌ فَلَهَا نِصْفُ مَا تَرَكَ}',
+                females=1)
+        else:
+            add('sistersFull', 'الأخوات الشقيقات', h['sistersFull'], '2/3 (يقتسمن)', Fraction(2, 3), FARD,
+                'قال تعالى: {فَإِن كَانَتَا اثْنَتَيْنِ فَلَهُمَا الثُّلُثَانِ مِمَّا تَرَكَ}',
+                females=h['sistersFull'])
+
+    # 11. الإخوة والأخوات الأشقاء (تعصيب)
+    if h['brothersFull'] > 0 and h['father'] == 0 and not has_branch:
+        add('brothersFull', 'الإخوة الأشقاء' + (' والأخوات الشقيقات' if h['sistersFull'] > 0 else ''),
+            h['brothersFull'] + h['sistersFull'], 'الباقي تعصيباً', Fraction(0), TASEEB,
+            'الإخوة الأشقاء عصبة بالنفس، يعصبون أخواتهم',
+            males=h['brothersFull'], females=h['sistersFull'])
+
+    # 12. الأخوات لأب
+    if h['sistersFather'] > 0 and h['father'] == 0 and not has_branch and h['brothersFull'] == 0:
+        if h['sistersFull'] == 0 and h['brothersFather'] == 0:
+            if h['sistersFather'] == 1:
+                add('sistersFather', 'الأخت لأب', 1, '1/2', Fraction(1, 2), FARD,
+                    'الأخت لأب تأخذ النصف عند عدم وجود الأشقاء', females=1)
+            else:
+                add('sistersFather', 'الأخوات لأب', h['sistersFather'], '2/3 (يقتسمن)', Fraction(2, 3), FARD,
+                    'الأخوات لأب لهن الثلثان عند عدم وجود الأشقاء', females=h['sistersFather'])
+        elif h['sistersFull'] == 1:
+            add('sistersFather', 'الأخت/الأخوات لأب', h['sistersFather'], '1/6 (تكملة الثلثين)',
+                Fraction(1, 6), FARD, 'الأخوات لأب لهن السدس تكملة الثلثين مع الأخت الشقيقة',
+                females=h['sistersFather'])
+
+    # 13. الإخوة والأخوات لأب (تعصيب)
+    if (h['brothersFather'] > 0 and h['father'] == 0 and not has_branch
+            and h['brothersFull'] == 0 and h['sistersFull'] < 2):
+        add('brothersFather', 'الإخوة لأب' + (' والأخوات لأب' if h['sistersFather'] > 0 else ''),
+            h['brothersFather'] + h['sistersFather'], 'الباقي تعصيباً', Fraction(0), TASEEB,
+            'الإخوة لأب عصبة، يعصبون أخواتهم لأب',
+            males=h['brothersFather'], females=h['sistersFather'])
+
+    # 14. الإخوة والأخوات لأم
+    siblings_mother = h['brothersMother'] + h['sistersMother']
+    if siblings_mother > 0 and h['father'] == 0 and h['grandfather'] == 0 and not has_branch:
+        if siblings_mother == 1:
+            add('siblingsMother', 'الأخ لأم' if h['brothersMother'] > 0 else 'الأخت لأم', 1, '1/6',
+                Fraction(1, 6), FARD,
+                'قال تعالى: {وَإِن كَانَ رَجُلٌ يُورَثُ كَلَالَةً أَوِ امْرَأَةٌ وَلَهُ أَخٌ أَوْ أُخْتٌ فَلِكُلِّ وَاحِدٍ مِّنْهُمَا السُّدُسُ}')
+        else:
+            # يقتسمون الثلث بالسوية فلا يفرق بين الذكر والأنثى
+            add('siblingsMother', 'الإخوة والأخوات لأم', siblings_mother, '1/3 (يقتسمون بالسوية)',
+                Fraction(1, 3), FARD,
+                'قال تعالى: {فَإِن كَانُوا أَكْثَرَ مِن ذَٰلِكَ فَهُمْ شُرَكَاءُ فِي الثُّلُثِ}')
+
+    # باقي العصبات (أبناء الإخوة، الأعمام، أبناء الأعمام)
+    remaining = [(key, name) for key, name, order in REMAINING_ASABA if h[key] > 0]
+    has_closer = (h['sons'] > 0 or h['grandsonsSon'] > 0 or h['father'] > 0
+                  or h['grandfather'] > 0 or h['brothersFull'] > 0 or h['brothersFather'] > 0)
+    if not has_closer and remaining:
+        key, name = remaining[0]
+        add(key, name, h[key], 'الباقي تعصيباً', Fraction(0), TASEEB,
+            'عصبة بالنفس يأخذ الباقي بعد أصحاب الفروض', males=h[key])
+        for _, other in remaining[1:]:
+            block(other, name, 'العاصب الأقرب يحجب الأبعد')
+
+    awl = None
+    if total > 1:
+        awl = {'original': Fraction(1), 'adjusted': total, 'explanation': AWL_EXPLANATION}
+
+    radd = None
+    has_asaba = any(s['type'] in (TASEEB, FARD_TASEEB) for s in shares)
+    if total < 1 and not has_asaba:
+        radd = {'remaining': 1 - total, 'explanation': RADD_EXPLANATION}
+
+    return {
+        'shares': shares,
+        'blocked': blocked,
+        'total_shares': total,
+        'awl': awl,
+        'radd': radd,
+    }
+
+
+# ==================== ما يسقطه الموقع ====================
+
+def complete_shares(heirs, result):
+    """إكمال نتيجة compute_shares بمن يسقطه الموقع دون أن يذكره في الأنصبة ولا في المحجوبين
+
+    الموقع لا يورّث الإخوة والأخوات لغير أم مع الفرع الوارث ولا يحجبهم، ولا يذكر العصبات
+    الأبعد إذا وُجد عاصب أقرب. هنا:
+    - الفرع الوارث الذكر (الابن وابن الابن) يحجب الإخوة والأخوات
+    - الجد يحجب الإخوة والأخوات كالأب، على قول أبي بكر الصديق رضي الله عنه لا المقاسمة
+    - مع البنات: الأقرب من الإخوة يأخذ الباقي (الأخوات مع البنات عصبات)، ويُحجب من بعده
+    - العصبات بعد الإخوة (أبناء الإخوة والأعمام وأبناؤهم) يحجبهم العاصب الأقرب
+
+    يعيد نتيجة جديدة ولا يعدّل المعطاة.
+    """
+    h = dict(zip(HEIR_KEYS, canonical_heirs(heirs)))
+    shares = list(result['shares'])
+    blocked = list(result['blocked'])
+
+    def block(heir, blocked_by, reason):
+        blocked.append({'heir': heir, 'blocked_by': blocked_by, 'reason': reason})
+
+    siblings = [(key, name) for key, name in SIBLINGS if h[key] > 0]
+    if siblings and h['father'] == 0:
+        male_branch = next((name for key, name in MALE_ASABA[:2] if h[key] > 0), None)
+        if male_branch or h['grandfather'] > 0:
+            # ما أضافه الموقع منهم (مع ابن الابن أو الجد دون البنات) يُحذف من الأنصبة
+            shares = [share for share in shares if share['key'] not in dict(SIBLINGS)]
+            for _, name in siblings:
+                if male_branch:
+                    block(name, male_branch, 'الفرع الوارث الذكر يحجب الإخوة والأخوات')
+                else:
+                    block(name, 'الجد', 'الجد يحجب الإخوة والأخوات كالأب (قول أبي بكر الصديق رضي الله عنه)')
+        elif h['daughters'] > 0:
+            # الأشقاء قبل الإخوة لأب، والذكر يعصّب أخته من نفس الجهة
+            full = h['brothersFull'] > 0 or h['sistersFull'] > 0
+            (brothers_key, brothers_name), (sisters_key, sisters_name) = SIBLINGS[:2] if full else SIBLINGS[2:]
+            males, females = h[brothers_key], h[sisters_key]
+            if males:
+                heir = brothers_name + (' و' + sisters_name if females else '')
+                share = 'الباقي تعصيباً'
+                evidence = 'الإخوة عصبة بالنفس يأخذون الباقي بعد فرض البنات، ويعصّبون أخواتهم'
+            else:
+                single, plural = SISTERS_WITH_DAUGHTERS[sisters_key]
+                heir = plural if females > 1 else single
+                share = 'الباقي تعصيباً مع الغير'
+                evidence = ('الأخوات مع البنات عصبات: قضى ابن مسعود رضي الله عنه للأخت بما بقي '
+                            'بعد البنت وبنت الابن (رواه البخاري)')
+            shares.append({
+                'key': brothers_key if males else sisters_key, 'heir': heir, 'count': males + females,
+                'share': share, 'share_value': Fraction(0), 'type': TASEEB, 'evidence': evidence,
+                'males': males, 'females': females,
+            })
+            if full:
+                for key, name in siblings:
+                    if key in ('brothersFather', 'sistersFather'):
+                        block(name, heir, 'الأقرب من الإخوة يحجب الإخوة لأب')
+
+    remaining = [name for key, name, _ in REMAINING_ASABA if h[key] > 0]
+    site_closer = next((name for key, name in MALE_ASABA if h[key] > 0), None)
+    if remaining and site_closer:
+        # الموقع لا يذكر العصبات الأبعد متى وُجد عاصب أقرب
+        closer = next((share['heir'] for share in shares if share['type'] in (TASEEB, FARD_TASEEB)), site_closer)
+        for name in remaining:
+            block(name, closer, 'العاصب الأقرب يحجب الأبعد')
+
+    total = sum((share['share_value'] for share in shares), Fraction(0))
+    has_asaba = any(share['type'] in (TASEEB, FARD_TASEEB) for share in shares)
+    return dict(
+        result,
+        shares=shares,
+        blocked=blocked,
+        total_shares=total,
+        awl={'original': Fraction(1), 'adjusted': total, 'explanation': AWL_EXPLANATION} if total > 1 else None,
+        radd={'remaining': 1 - total, 'explanation': RADD_EXPLANATION} if total < 1 and not has_asaba else None,
+    )
+
+
+# ==================== توزيع التركة ====================
+
+def allocate(result):
+    """حساب نصيب كل فئة وكل فرد من التركة بكسور دقيقة
+
+    الفروض الفعلية تراعي أمرين لا يظهران في قيم الموقع الاسمية:
+    ثلث الباقي للأم في العمريتين، وسدس الأب/الجد فرضاً مع أبناء الابن.
+    
+    وإن بقي عاصبان من جهتين مختلفتين فالباقي للأقرب جهة، ويُنقل الأبعد من الأنصبة إلى المحجوبين.
+    """
+    shares = result['shares']
+    keys = {s['key'] for s in shares}
+    spouse = sum(s['share_value'] for s in shares if s['key'] in SPOUSES)
+
+    fard = {}
+    asaba = []
+    for i, s in enumerate(shares):
+        value = s['share_value']
+        is_asaba = s['type'] in (TASEEB, FARD_TASEEB)
+        if s['key'] == 'mother' and s['share'] == '1/3 الباقي':
+            value = (1 - spouse) / 3
+        if s['key'] in ('father', 'grandfather') and 'grandsonsSon' in keys:
+            value, is_asaba = Fraction(1, 6), False
+        if value:
+            fard[i] = value
+        if is_asaba:
+            asaba.append(i)
+
+    portions = [Fraction(0)] * len(shares)
+    excluded = []
+    fard_total = sum(fard.values(), Fraction(0))
+    unallocated = Fraction(0)
+    awl_base = None
+
+    if fard_total > 1:
+        awl_base = fard_total
+        for i, value in fard.items():
+            portions[i] = value / fard_total
+    else:
+        for i, value in fard.items():
+            portions[i] = value
+        remainder = 1 - fard_total
+        if asaba:
+            tier = min(ASABA_TIERS.get(shares[i]['key'], 5) for i in asaba)
+            winners = [i for i in asaba if ASABA_TIERS.get(shares[i]['key'], 5) == tier]
+            units = {i: shares[i]['males'] * 2 + shares[i]['females'] for i in winners}
+            total_units = sum(units.values())
+            for i in winners:
+                portions[i] += remainder * units[i] / total_units
+            excluded = [i for i in asaba if i not in winners and not portions[i]]
+        elif remainder:
+            eligible = {i: v for i, v in fard.items() if shares[i]['key'] not in SPOUSES}
+            if eligible:
+                eligible_total = sum(eligible.values(), Fraction(0))
+                for i, value in eligible.items():
+                    portions[i] += remainder * value / eligible_total
+            else:
+                unallocated = remainder
+
+    blocked = list(result['blocked'])
+    if excluded:
+        winners = '، '.join(shares[i]['heir'] for i in asaba if i not in excluded)
+        for i in excluded:
+            blocked.append({
+                'heir': shares[i]['heir'],
+                'blocked_by': winners,
+                'reason': 'العاصب الأقرب جهة يحجب الأبعد',
+            })
+        kept = [i for i in range(len(shares)) if i not in excluded]
+        shares = [shares[i] for i in kept]
+        portions = [portions[i] for i in kept]
+
+    allocation = []
+    denominators = [unallocated.denominator]
+    for s, portion in zip(shares, portions):
+        entry = {'portion': portion}
+        if s['males'] and s['females'] and s['type'] == TASEEB:
+            unit = portion / (s['males'] * 2 + s['females'])
+            entry['per_male'] = unit * 2
+            entry['per_female'] = unit
+            denominators += [entry['per_male'].denominator, unit.denominator]
+        else:
+            entry['per_person'] = portion / s['count']
+            denominators.append(entry['per_person'].denominator)
+        allocation.append(entry)
+
+    return {
+        'shares': shares,
+        'blocked': blocked,
+        'allocation': allocation,
+        'awl_base': awl_base,
+        'unallocated': unallocated,
+        # أصل المسألة بعد التصحيح: أصغر عدد تخرج منه سهام كل فرد صحيحة
+        'base': lcm(*denominators),
+    }
+
+
+@lru_cache(maxsize=65536)
+def solve(key):
+    """حل مسألة لتركيبة ورثة معيّنة (مفتاح canonical_heirs) مع حفظ النتيجة"""
+    heirs = dict(zip(HEIR_KEYS, key))
+    result = complete_shares(heirs, compute_shares(heirs))
+    result = dict(result, **allocate(result))
+    return result
+
+
+def solve_case(heirs, estate=0):
+    """حل مسألة واحدة وحساب المبالغ إن وُجدت قيمة للتركة
+
+    تعيد نسخة من النتيجة المحفوظة حتى لا يفسد تعديلها ما يعود لاحقاً من solve.
+    """
+    result = copy.deepcopy(solve(canonical_heirs(heirs)))
+    estate = parse_estate(estate)
+    amounts = [
+        {name: value * estate for name, value in entry.items()}
+        for entry in result['allocation']
+    ]
+    return result, amounts
+
+
+# ==================== الدفعات ====================
+
+# أرقام مجمّعة بالآلاف: 1,000 أو 1٬000 أو 1,000.50
+THOUSANDS_PATTERN = re.compile(r'\d{1,3}(?:[,٬]\d{3})+(?:\.\d+)?')
+ARABIC_DIGITS = str.maketrans('٠١٢٣٤٥٦٧٨٩٫', '0123456789.')
+
+
+def parse_estate(value):
+    """قيمة التركة ككسر دقيق، مع قبول الأرقام العربية وفواصل الآلاف؛ ValueError لغير ذلك"""
+    text = str(value or 0).strip().translate(ARABIC_DIGITS)
+    if THOUSANDS_PATTERN.fullmatch(text):
+        text = text.replace(',', '').replace('٬', '')
+    try:
+        estate = Fraction(text)
+    except (ValueError, ZeroDivisionError):
+        raise ValueError(f'قيمة تركة غير صالحة: {value}') from None
+    if estate < 0:
+        raise ValueError(f'قيمة تركة سالبة: {value}')
+    return estate
+
+
+def _solve_keys(keys):
+    return [(key, solve(key)) for key in keys]
+
+
+def solve_batch(cases, workers=None, chunk_size=256, errors=None):
+    """حل عدة مسائل: [(المعرّف، الورثة، التركة), ...] ← [(المعرّف، التركة، النتيجة), ...]
+
+    التركيبات المكررة تُحل مرة واحدة، والتركيبات الفريدة توزّع على عمليات متوازية،
+    والنتائج المتطابقة كائن واحد للقراءة فقط.
+    المسألة بتركة غير صالحة تُتخطى وتُضاف إلى errors كـ (المعرّف، الرسالة)، أو ترفع ValueError إن لم تُمرر.
+    """
+    parsed = []
+    for case_id, heirs, estate in cases:
+        try:
+            parsed.append((case_id, canonical_heirs(heirs), parse_estate(estate)))
+        except ValueError as e:
+            if errors is None:
+                raise ValueError(f'{case_id}: {e}') from None
+            errors.append((case_id, str(e)))
+    cases = parsed
+    unique = sorted({key for _, key, _ in cases})
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(unique) > chunk_size:
+        from concurrent.futures import ProcessPoolExecutor
+        chunks = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+        with ProcessPoolExecutor(workers) as pool:
+            solved = dict(pair for chunk in pool.map(_solve_keys, chunks) for pair in chunk)
+    else:
+        solved = dict(_solve_keys(unique))
+
+    return [(case_id, estate, solved[key]) for case_id, key, estate in cases]
+
+
+def format_fraction(value):
+    return f'{value.numerator}/{value.denominator}' if value.denominator != 1 else str(value.numerator)
+
+
+def read_cases_csv(file_path):
+    """قراءة المسائل من CSV: أعمدة بأسماء HEIR_KEYS مع estate و id اختيارياً"""
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=1):
+            yield row.get('id') or str(line_no), row, row.get('estate') or 0
+
+
+def write_results_csv(results, file_path):
+    """كتابة صف لكل فئة وارثة في كل مسألة"""
+    columns = ['id', 'estate', 'heir', 'count', 'share', 'type', 'portion',
+               'per_person', 'per_male', 'per_female', 'amount', 'base', 'awl', 'radd']
+    with open(file_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for case_id, estate, result in results:
+            for share, entry in zip(result['shares'], result['allocation']):
+                writer.writerow([
+                    case_id, format_fraction(estate), share['heir'], share['count'], share['share'],
+                    share['type'], format_fraction(entry['portion']),
+                    format_fraction(entry['per_person']) if 'per_person' in entry else '',
+                    format_fraction(entry['per_male']) if 'per_male' in entry else '',
+                    format_fraction(entry['per_female']) if 'per_female' in entry else '',
+                    f"{float(entry['portion'] * estate):.2f}",
+                    result['base'],
+                    'نعم' if result['awl'] else '',
+                    'نعم' if result['radd'] else '',
+                ])
+
+
+# ==================== المطابقة مع الموقع ====================
+
+def generate_corpus(size, seed=0):
+    """تركيبات ورثة عشوائية ثابتة البذرة، أغلب الأعداد أصفار كما في الواقع"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        heirs = {}
+        for name in HEIR_KEYS:
+            if rng.random() < 0.25:
+                heirs[name] = 1 if name in ('father', 'mother', 'grandfather', 'husband') else rng.randint(1, 4)
+        if heirs.get('husband'):
+            heirs.pop('wives', None)
+        corpus.append(heirs)
+    return corpus
+
+
+def run_js_engine(corpus, html_path):
+    """تشغيل computeInheritance من index.html عبر node على نفس التركيبات"""
+    with open(html_path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    start = html.index('function computeInheritance(')
+    end = html.index('function displayInheritanceResult(')
+    script = html[start:end] + (
+        "\nlet input = '';"
+        "\nprocess.stdin.on('data', chunk => input += chunk);"
+        "\nprocess.stdin.on('end', () => {"
+        "\n    const cases = JSON.parse(input);"
+        "\n    console.log(JSON.stringify(cases.map(h => computeInheritance(h, 0))));"
+        "\n});\n"
+    )
+    heirs = [dict(zip(HEIR_KEYS, canonical_heirs(h))) for h in corpus]
+    proc = subprocess.run(['node', '-e', script], input=json.dumps(heirs), capture_output=True,
+                          text=True, encoding='utf-8', check=True)
+    return json.loads(proc.stdout)
+
+
+def js_expectation(js):
+    """ما تُقارن به نتيجة بايثون من ناتج computeInheritance (يُحفظ في ملف المدوّنة)"""
+    return {
+        'shares': [[s['heir'], s['count'], s['share'], s['type'], s['evidence']] for s in js['shares']],
+        'blocked': [[b['heir'], b['blockedBy'], b['reason']] for b in js['blocked']],
+        'total_shares': js['totalShares'],
+        'awl': bool(js['awl']),
+        'radd': bool(js['radd']),
+    }
+
+
+def compare_case(heirs, expected):
+    """مقارنة قواعد compute_shares بنتيجة الموقع لتركيبة واحدة، وإرجاع الحقول المختلفة
+
+    تُقارن الفروض والحجب قبل allocate لأنه يصحح عمداً ما يخالف فيه الموقع.
+    """
+    py = compute_shares(heirs)
+    problems = []
+    py_shares = [[s['heir'], s['count'], s['share'], s['type'], s['evidence']] for s in py['shares']]
+    js_shares = [[JS_LABEL_FIXES.get(share[0], share[0])] + share[1:] for share in expected['shares']]
+    if py_shares != js_shares:
+        problems.append('shares')
+    if [[b['heir'], b['blocked_by'], b['reason']] for b in py['blocked']] != expected['blocked']:
+        problems.append('blocked')
+    if abs(float(py['total_shares']) - expected['total_shares']) > 1e-9:
+        problems.append('totalShares')
+    # عند اكتمال الفروض تماماً قد يظهر في الموقع عول أو رد وهمي بسبب تقريب الكسور العشرية
+    exact = py['total_shares'] == 1 and abs(expected['total_shares'] - 1) < 1e-9
+    if not exact and (bool(py['awl']) != expected['awl'] or bool(py['radd']) != expected['radd']):
+        problems.append('awl/radd')
+    return problems
+
+
+def cross_check(corpus, expectations):
+    """مقارنة نتائج بايثون بنتائج الموقع، وإرجاع قائمة الاختلافات"""
+    mismatches = []
+    for heirs, expected in zip(corpus, expectations):
+        problems = compare_case(heirs, expected)
+        if problems:
+            mismatches.append({'heirs': heirs, 'fields': problems})
+    return mismatches
+
+
+def write_corpus(corpus, expectations, file_path):
+    """حفظ التركيبات مع نتائج الموقع لها حتى تُعاد المطابقة دون node"""
+    # تركيبة في كل سطر حتى تبقى الفروق مقروءة عند إعادة التوليد
+    lines = (json.dumps({'heirs': heirs, 'expected': expected}, ensure_ascii=False, separators=(',', ':'))
+             for heirs, expected in zip(corpus, expectations))
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('[\n' + ',\n'.join(lines) + '\n]\n')
+
+
+def read_corpus(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        cases = json.load(f)
+    return [case['heirs'] for case in cases], [case['expected'] for case in cases]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='حاسبة المواريث')
+    parser.add_argument('cases', nargs='?', help='ملف CSV بأعمدة الورثة (sons, daughters, ...) و estate')
+    parser.add_argument('--output', '-o', default='inheritance_results.csv', help='ملف النتائج')
+    parser.add_argument('--workers', type=int, help='عدد العمليات المتوازية')
+    parser.add_argument('--cross-check', type=int, metavar='N', help='مطابقة N تركيبة عشوائية مع index.html عبر node')
+    parser.add_argument('--save-corpus', metavar='FILE', help='حفظ تركيبات --cross-check ونتائج الموقع لها')
+    parser.add_argument('--corpus', metavar='FILE', help=f'مطابقة مدوّنة محفوظة دون node (مثل {CORPUS_FILE})')
+    parser.add_argument('--html', default=os.path.join(BASE_DIR, 'index.html'))
+    args = parser.parse_args()
+
+    if args.cross_check or args.corpus:
+        if args.corpus:
+            corpus, expectations = read_corpus(args.corpus)
+        else:
+            corpus = generate_corpus(args.cross_check)
+            expectations = [js_expectation(js) for js in run_js_engine(corpus, args.html)]
+            if args.save_corpus:
+                write_corpus(corpus, expectations, args.save_corpus)
+        mismatches = cross_check(corpus, expectations)
+        for m in mismatches[:20]:
+            print(json.dumps(m, ensure_ascii=False))
+        print(f'تمت مطابقة {len(corpus) - len(mismatches)} من {len(corpus)} تركيبة')
+        return 1 if mismatches else 0
+
+    if not args.cases:
+        parser.print_help()
+        return 2
+
+    errors = []
+    results = solve_batch(read_cases_csv(args.cases), args.workers, errors=errors)
+    write_results_csv(results, args.output)
+    for case_id, message in errors:
+        print(f'تخطي المسألة {case_id}: {message}', file=sys.stderr)
+    print(f'تم حل {len(results)} مسألة وحفظ النتائج في {args.output}')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
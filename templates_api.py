@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+خادم HTTP محلي يعرض نماذج ملف مشروع لأدوات إدارة القضايا
+مبني على asyncio دون مكتبات خارجية: فهارس في الذاكرة، ETag، ضغط gzip، وتخزين مؤقت للردود.
+يعيد تحميل المشروع تلقائياً عند تعديل ملفه.
+
+المسارات:
+    GET /categories                        التصنيفات وعدد نماذج كل منها
+    GET /categories/<التصنيف>              نماذج تصنيف واحد
+    GET /templates/<id>                    نموذج بمعرّفه
+    GET /templates?num=..&keyword=..       بحث بالرقم أو الكلمة المفتاحية (مع category اختيارياً)
+    GET /search?q=..&category=..&limit=..  بحث نصي مفهرس
+    GET /health
+
+أمثلة:
+    python templates_api.py templates_project.json
+    python templates_api.py templates_project.json --host 0.0.0.0 --port 8080
+"""
+
+import os
+import re
+import sys
+import json
+import gzip
+import time
+import asyncio
+import hashlib
+import argparse
+from bisect import bisect_left
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl, unquote
+
+from wordtotemplates import read_project
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+CACHE_SIZE = 1024
+GZIP_MIN_SIZE = 1024
+MAX_HEADER_BYTES = 16384
+MAX_BODY_BYTES = 1 << 20
+KEEP_ALIVE_TIMEOUT = 15
+RELOAD_INTERVAL = 1.0
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 200
+
+STATUS_TEXT = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    431: 'Request Header Fields Too Large',
+}
+
+# توحيد الحروف للبحث: حذف التشكيل والتطويل، وتوحيد صور الألف والياء والتاء المربوطة
+SEARCH_TRANSLATION = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا', 'ى': 'ي', 'ة': 'ه', 'ـ': None,
+    **{chr(code): None for code in range(0x064B, 0x0653)},
+})
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_search(text):
+    return text.translate(SEARCH_TRANSLATION).lower()
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(normalize_search(text))
+
+
+# ==================== الفهرس ====================
+
+class TemplateIndex:
+    """فهارس ثابتة في الذاكرة: بالمعرّف والتصنيف والرقم والكلمة، وفهرس مقلوب للكلمات"""
+
+    def __init__(self, templates):
+        self.records = []
+        self.keywords = []
+        self.categories = {}
+        self.by_num = {}
+        self.by_keyword = {}
+        self.postings = {}
+
+        for cat, tmpls in templates.items():
+            ids = self.categories[cat] = []
+            for tmpl in tmpls:
+                tid = len(self.records)
+                keyword = normalize_search(tmpl.keyword)
+                self.records.append({
+                    'id': tid, 'category': cat,
+                    'num': tmpl.num, 'keyword': tmpl.keyword, 'content': tmpl.content,
+                })
+                self.keywords.append(keyword)
+                ids.append(tid)
+                self.by_num.setdefault(tmpl.num, []).append(tid)
+                self.by_keyword.setdefault(keyword, []).append(tid)
+                # المعرّفات تزيد دائماً فتبقى قوائم الفهرس مرتبة
+                for token in set(tokenize(tmpl.keyword + ' ' + tmpl.content)):
+                    self.postings.setdefault(token, []).append(tid)
+        self.vocabulary = sorted(self.postings)
+
+    def _prefixed(self, token):
+        """كل المعرّفات لكلمات تبدأ بالبادئة (للبحث أثناء الكتابة)"""
+        ids = set()
+        pos = bisect_left(self.vocabulary, token)
+        while pos < len(self.vocabulary) and self.vocabulary[pos].startswith(token):
+            ids.update(self.postings[self.vocabulary[pos]])
+            pos += 1
+        return ids
+
+    def search(self, query, category=None, limit=SEARCH_LIMIT):
+        """تقاطع قوائم الكلمات بدءاً بالأقصر، وآخر كلمة تطابق كبادئة"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        *exact, last = tokens
+        lists = sorted((self.postings.get(token, ()) for token in exact), key=len)
+        result = None
+        for ids in lists:
+            result = set(ids) if result is None else result.intersection(ids)
+            if not result:
+                return []
+        prefixed = self._prefixed(last)
+        result = prefixed if result is None else result & prefixed
+
+        if category:
+            result = [tid for tid in result if self.records[tid]['category'] == category]
+        # ما تطابق كلمته المفتاحية أولاً ثم بترتيب الملف
+        first = tokens[0]
+        ranked = sorted(result, key=lambda tid: (first not in self.keywords[tid], tid))
+        return [self.records[tid] for tid in ranked[:limit]]
+
+
+# ==================== الخادم ====================
+
+class TemplateAPI:
+    """توجيه الطلبات وتخزين الردود الجاهزة (النص والنسخة المضغوطة والبصمة)"""
+
+    def __init__(self, project_path, cache_size=CACHE_SIZE):
+        self.project_path = project_path
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.load()
+
+    def load(self):
+        self.mtime = os.path.getmtime(self.project_path)
+        self.index = TemplateIndex(read_project(self.project_path))
+        self.cache.clear()
+        self.checked = time.monotonic()
+
+    def maybe_reload(self):
+        """إعادة التحميل عند تغير وقت تعديل الملف، مع فحص واحد في الثانية على الأكثر"""
+        now = time.monotonic()
+        if now - self.checked < RELOAD_INTERVAL:
+            return
+        self.checked = now
+        try:
+            if os.path.getmtime(self.project_path) != self.mtime:
+                self.load()
+        except (OSError, ValueError) as e:
+            # ملف يُكتب الآن أو تالف: نستمر بالنسخة المحمّلة
+            print(f'تعذر إعادة تحميل المشروع: {e}', file=sys.stderr)
+
+    def route(self, target):
+        """إرجاع (الحالة، البيانات) للمسار المطلوب"""
+        split = urlsplit(target)
+        parts = [unquote(part) for part in split.path.split('/') if part]
+        query = dict(parse_qsl(split.query))
+        index = self.index
+
+        if not parts or parts == ['health']:
+            return 200, {'status': 'ok', 'templates': len(index.records), 'categories': len(index.categories)}
+
+        if parts[0] == 'categories':
+            if len(parts) == 1:
+                return 200, [{'name': cat, 'count': len(ids)} for cat, ids in index.categories.items()]
+            ids = index.categories.get(parts[1])
+            if ids is None:
+                return 404, {'error': f'لا يوجد تصنيف باسم {parts[1]}'}
+            return 200, [index.records[tid] for tid in ids]
+
+        if parts[0] == 'templates':
+            if len(parts) == 2:
+                # isdigit وحده يقبل أرقاماً مثل ² لا يقبلها int
+                if not (parts[1].isascii() and parts[1].isdigit()) or int(parts[1]) >= len(index.records):
+                    return 404, {'error': f'لا يوجد نموذج بالمعرّف {parts[1]}'}
+                return 200, index.records[int(parts[1])]
+            if 'num' in query:
+                ids = index.by_num.get(query['num'], [])
+            elif 'keyword' in query:
+                ids = index.by_keyword.get(normalize_search(query['keyword']), [])
+            else:
+                return 400, {'error': 'حدد num أو keyword'}
+            category = query.get('category')
+            return 200, [index.records[tid] for tid in ids if not category or index.records[tid]['category'] == category]
+
+        if parts[0] == 'search':
+            if not query.get('q'):
+                return 400, {'error': 'حدد نص البحث في q'}
+            try:
+                limit = min(max(int(query.get('limit', SEARCH_LIMIT)), 1), MAX_SEARCH_LIMIT)
+            except ValueError:
+                return 400, {'error': 'limit يجب أن يكون عدداً'}
+            return 200, index.search(query['q'], query.get('category'), limit)
+
+        return 404, {'error': 'المسار غير موجود'}
+
+    def lookup(self, target):
+        """الرد من الذاكرة المؤقتة أو بناؤه: [الحالة، النص، البصمة، النسخة المضغوطة]"""
+        entry = self.cache.get(target)
+        if entry is not None:
+            self.cache.move_to_end(target)
+            return entry
+
+        status, payload = self.route(target)
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        entry = [status, body, etag, None]
+        self.cache[target] = entry
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return entry
+
+    async def handle(self, reader, writer):
+        """خدمة اتصال واحد مع إبقائه مفتوحاً لطلبات متتالية (keep-alive)"""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_TIMEOUT)
+                except asyncio.LimitOverrunError:
+                    writer.write(self.render(431, {'error': 'الترويسات أكبر من المسموح'}, 'HTTP/1.1', False))
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    writer.write(self.render(400, {'error': 'طلب غير صالح'}, 'HTTP/1.1', False))
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                # int() يقبل الإشارة والشرطة السفلية والأرقام غير اللاتينية، فنقبل الأرقام اللاتينية فقط
+                raw_length = headers.get('content-length') or '0'
+                if not (raw_length.isascii() and raw_length.isdigit()):
+                    writer.write(self.render(400, {'error': 'Content-Length غير صالح'}, version, False))
+                    break
+                length = int(raw_length)
+                if length > MAX_BODY_BYTES:
+                    writer.write(self.render(413, {'error': 'الطلب أكبر من المسموح'}, version, False))
+                    break
+                if length:
+                    try:
+                        await reader.readexactly(length)
+                    except asyncio.IncompleteReadError:
+                        break
+
+                if method not in ('GET', 'HEAD'):
+                    writer.write(self.render(405, {'error': 'المسموح GET و HEAD فقط'}, version, keep_alive))
+                else:
+                    self.maybe_reload()
+                    writer.write(self.respond(target, headers, version, keep_alive, method == 'HEAD'))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def respond(self, target, headers, version, keep_alive, head_only):
+        entry = self.lookup(target)
+        status, body, etag, _ = entry
+
+        if status == 200 and etag in headers.get('if-none-match', ''):
+            return self.head_bytes(304, version, keep_alive, etag, 0, None)
+
+        encoding = None
+        if len(body) >= GZIP_MIN_SIZE and 'gzip' in headers.get('accept-encoding', ''):
+            if entry[3] is None:
+                entry[3] = gzip.compress(body, 6, mtime=0)
+            body = entry[3]
+            encoding = 'gzip'
+
+        head = self.head_bytes(status, version, keep_alive, etag, len(body), encoding)
+        return head if head_only else head + body
+
+    def render(self, status, payload, version, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        return self.head_bytes(status, version, keep_alive, None, len(body), None) + body
+
+    @staticmethod
+    def head_bytes(status, version, keep_alive, etag, length, encoding):
+        lines = [
+            f'{version} {status} {STATUS_TEXT[status]}',
+            'Content-Type: application/json; charset=utf-8',
+            f'Content-Length: {length}',
+            'Cache-Control: no-cache',
+            'Vary: Accept-Encoding',
+            'Access-Control-Allow-Origin: *',
+            f'Connection: {"keep-alive" if keep_alive else "close"}',
+        ]
+        if etag:
+            lines.append(f'ETag: {etag}')
+        if encoding:
+            lines.append(f'Content-Encoding: {encoding}')
+        if status == 405:
+            lines.append('Allow: GET, HEAD')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def serve(project_path, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    api = TemplateAPI(project_path)
+    server = await asyncio.start_server(api.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f'يعمل الخادم على http://{host}:{port} ({len(api.index.records)} نموذج)')
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='خادم HTTP لنماذج ملف مشروع')
+    parser.add_argument('project', help='ملف المشروع (JSON)')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='عنوان الاستماع (افتراضياً الجهاز المحلي فقط)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='المنفذ')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.project, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
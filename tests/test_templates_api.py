@@ -0,0 +1,82 @@
+import gzip
+import json
+import asyncio
+import threading
+import http.client
+from urllib.parse import quote
+
+import pytest
+
+from wordtotemplates import Template, write_project
+from templates_api import TemplateAPI
+
+
+CATEGORY = 'الدعوى'
+
+
+@pytest.fixture
+def server(tmp_path):
+    """تشغيل الخادم على منفذ محلي عشوائي في خيط منفصل"""
+    project = tmp_path / 'project.json'
+    templates = {CATEGORY: [
+        Template(str(i), f'كلمة{i}', 'أدعى ............. بقوله ' * 40, CATEGORY) for i in range(1, 4)
+    ]}
+    write_project(templates, str(project))
+
+    loop = asyncio.new_event_loop()
+    api = TemplateAPI(str(project))
+    srv = loop.run_until_complete(asyncio.start_server(api.handle, '127.0.0.1', 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield srv.sockets[0].getsockname()[1]
+
+    async def shutdown():
+        # انتظار اتصالات العملاء التي أُغلقت حتى تنهي معالجاتها قبل إيقاف الحلقة
+        srv.close()
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def get(port, path, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    try:
+        conn.request('GET', path, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def test_template_by_id(server):
+    status, headers, body = get(server, '/templates/0')
+    assert status == 200
+    assert json.loads(body)['keyword'] == 'كلمة1'
+    assert headers['ETag']
+
+
+def test_etag_not_modified(server):
+    _, headers, _ = get(server, '/templates/0')
+    status, _, body = get(server, '/templates/0', {'If-None-Match': headers['ETag']})
+    assert status == 304
+    assert body == b''
+
+
+def test_gzip_response(server):
+    path = '/categories/' + quote(CATEGORY)
+    _, _, plain = get(server, path)
+    status, headers, body = get(server, path, {'Accept-Encoding': 'gzip'})
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(body) == plain
+
+
+@pytest.mark.parametrize('template_id', ['99', 'abc', '%C2%B2', '-1'])
+def test_bad_template_id(server, template_id):
+    status, _, body = get(server, '/templates/' + template_id)
+    assert status == 404
+    assert 'error' in json.loads(body)
@@ -6,1120 +6,2477 @@
 """
 
 import sys
+import re
 import json
 import os
-from pathlib import Path
-
-try:
-    from PyQt5.QtWidgets import (
-        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-        QLabel, QPushButton, QLineEdit, QTextEdit, QComboBox, QListWidget,
-        QListWidgetItem, QFileDialog, QMessageBox, QSplitter, QGroupBox,
-        QFormLayout, QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView,
-        QStyle, QStyleFactory, QInputDialog, QMenu, QAction, QStatusBar,
-        QProgressBar, QFrame, QSpinBox, QCheckBox
-    )
-    from PyQt5.QtCore import Qt, QSize, QTimer
-    from PyQt5.QtGui import QFont, QIcon, QPalette, QColor, QClipboard
-except ImportError:
-    print("يجب تثبيت PyQt5 أولاً:")
-    print("pip install PyQt5")
-    sys.exit(1)
-
-try:
-    from docx import Document
-    from docx.table import Table
-except ImportError:
-    print("يجب تثبيت python-docx أولاً:")
-    print("pip install python-docx")
-    sys.exit(1)
+import io
+import mmap
+import bisect
+import zipfile
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from functools import lru_cache
+
+# زمن بدء التحميل لقياس الإقلاع حتى أول رسم للنافذة
+STARTED = time.perf_counter()
+
+# المكتبات الثقيلة (PyQt5 و python-docx/lxml و win32com) لا تُحمّل هنا،
+# بل عند أول استخدام فقط، حتى تبقى الأوامر دون واجهة سريعة ولا تلمس Qt
+
+
+def load_docx():
+    """تحميل python-docx عند أول حاجة لقراءة ملف وورد"""
+    try:
+        from docx import Document
+    except ImportError:
+        raise ImportError('يجب تثبيت python-docx أولاً:\npip install python-docx')
+    return Document
+
+
+def __getattr__(name):
+    # التوافق مع من يستورد الواجهة من هذا الملف: wordtotemplates.TemplateConverter
+    if name == 'TemplateConverter':
+        from wordtotemplates_gui import TemplateConverter
+        return TemplateConverter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ==================== قياس الأداء ====================
+
+# حدود أعمدة المدرج التكراري بالثواني
+HISTOGRAM_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0)
+TIMING_WINDOW = 500
+
+
+class Instrumentation:
+    """قياس أزمنة المراحل الساخنة مع نافذة متحركة لكل مرحلة"""
+    
+    def __init__(self, window=TIMING_WINDOW):
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.profiler = None
+    
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - started)
+    
+    def reset(self):
+        self.samples.clear()
+    
+    def summary(self):
+        """إحصائيات كل مرحلة: العدد والمتوسط والنسب المئوية والمدرج التكراري"""
+        stages = {}
+        for name, values in self.samples.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            histogram = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+            for value in ordered:
+                histogram[bisect.bisect_left(HISTOGRAM_BUCKETS, value)] += 1
+            stages[name] = {
+                'count': len(ordered),
+                'total': sum(ordered),
+                'mean': sum(ordered) / len(ordered),
+                'p50': ordered[len(ordered) // 2],
+                'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                'max': ordered[-1],
+                'histogram': histogram,
+            }
+        return {'buckets': list(HISTOGRAM_BUCKETS), 'stages': stages}
+    
+    @property
+    def capturing(self):
+        return self.profiler is not None
+    
+    def start_capture(self):
+        """تفعيل cProfile و tracemalloc"""
+        if self.profiler:
+            return
+        import cProfile
+        import tracemalloc
+        self.profiler = cProfile.Profile()
+        tracemalloc.start()
+        self.profiler.enable()
+    
+    def stop_capture(self, limit=25):
+        """إيقاف الالتقاط وإرجاع أثقل الدوال وأكبر مواضع حجز الذاكرة"""
+        if not self.profiler:
+            return None
+        import pstats
+        import tracemalloc
+        self.profiler.disable()
+        stats = pstats.Stats(self.profiler)
+        self.profiler = None
+        
+        functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        return {
+            'functions': [
+                {'function': f'{os.path.basename(path)}:{line}({func})', 'calls': nc, 'tottime': tt, 'cumtime': ct}
+                for (path, line, func), (cc, nc, tt, ct, callers) in functions
+            ],
+            'memory_peak': peak,
+            'allocations': [
+                {'location': str(stat.traceback[0]), 'size': stat.size, 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:limit]
+            ],
+        }
+    
+    def to_json(self, capture=None):
+        data = {
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'timings': self.summary(),
+        }
+        if capture:
+            data['capture'] = capture
+        return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+INSTRUMENTS = Instrumentation()
+
+
+# ==================== العناصر النائبة ====================
+
+# نمط موحد يطابق ما تبحث عنه formatContent في index.html بنفس الترتيب:
+# التواريخ، ثم الأصفار، ثم النقاط، ثم (اسم القاضي)
+PLACEHOLDER_PATTERN = re.compile(
+    r'(?P<date>[0-9]{2}\s*/\s*[0-9]{2}\s*/\s*[0-9]{4})'
+    r'|(?P<zeros>0{5,})'
+    r'|(?P<dots>\.{5,})'
+    r'|(?P<judge>\(\s*اسم القاضي\s*\))'
+)
+
+PLACEHOLDER_TYPES = ('date', 'zeros', 'dots', 'judge')
+
+
+def _js_offsets(content):
+    """جدول تحويل المواضع إلى وحدات UTF-16 كما يحسبها JavaScript"""
+    if content.isascii() or all(ord(ch) < 0x10000 for ch in content):
+        return None
+    offsets = [0]
+    for ch in content:
+        offsets.append(offsets[-1] + (2 if ord(ch) >= 0x10000 else 1))
+    return offsets
+
+
+def tokenize_placeholders(content):
+    """تقسيم المحتوى إلى نصوص وعناصر نائبة: [[النوع، البداية، النهاية], ...]"""
+    segments = []
+    pos = 0
+    for match in PLACEHOLDER_PATTERN.finditer(content):
+        start, end = match.span()
+        if start > pos:
+            segments.append(['text', pos, start])
+        segments.append([match.lastgroup, start, end])
+        pos = end
+    if pos < len(content):
+        segments.append(['text', pos, len(content)])
+    
+    offsets = _js_offsets(content)
+    if offsets:
+        segments = [[kind, offsets[start], offsets[end]] for kind, start, end in segments]
+    return segments
+
+
+def count_placeholders(content):
+    """عدد العناصر النائبة في المحتوى حسب النوع"""
+    return Counter(match.lastgroup for match in PLACEHOLDER_PATTERN.finditer(content))
 
 
 class Template:
     """كائن النموذج"""
-    def __init__(self, num='', keyword='', content='', category=''):
+    def __init__(self, num='', keyword='', content='', category='', history=None):
         self.num = num
         self.keyword = keyword
         self.content = content
         self.category = category
+        self.history = history
     
-    def to_dict(self):
-        return {
+    def to_dict(self, segments=False):
+        data = {
             'num': self.num,
             'keyword': self.keyword,
             'content': self.content
         }
+        if segments:
+            data['segments'] = tokenize_placeholders(self.content)
+        return data
     
     def __str__(self):
         return f"[{self.num}] {self.keyword}: {self.content[:50]}..."
 
 
-class TemplateConverter(QMainWindow):
-    """النافذة الرئيسية للتطبيق"""
+# ==================== ملفات المشروع ====================
+
+PROJECT_VERSION = '1.1'
+
+
+def read_project(file_path):
+    """قراءة ملف مشروع وإرجاع {التصنيف: [Template, ...]}"""
+    with INSTRUMENTS.stage('project_read'), open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
     
-    # التصنيفات الافتراضية
-    DEFAULT_CATEGORIES = [
-        'الدعوى', 'الإجابة', 'المرافعة', 'الأسباب', 'الحكم',
-        'الشهادة', 'الصلح', 'اليمين', 'النكول', 'الكفالة',
-        'الالتماس', 'الشطب', 'الغياب', 'الاختصاص', 'التمويل',
-        'العقارات', 'المشاكل_التقنية'
-    ]
+    templates = {}
+    for cat, tmpls in data.get('templates', {}).items():
+        templates[cat] = [
+            Template(
+                t.get('num', ''), t.get('keyword', ''), t.get('content', ''), cat,
+                TemplateHistory(t['history']) if t.get('history') else None
+            )
+            for t in tmpls
+        ]
+    return templates
+
+
+def _project_entry(tmpl):
+    data = tmpl.to_dict()
+    if tmpl.history:
+        data['history'] = tmpl.history.to_list()
+    return data
+
+
+def write_project(templates, file_path):
+    """كتابة النماذج في ملف مشروع"""
+    data = {
+        'version': PROJECT_VERSION,
+        'templates': {cat: [_project_entry(t) for t in tmpls] for cat, tmpls in templates.items()}
+    }
+    with INSTRUMENTS.stage('file_write'), open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# ==================== الاستخراج من وورد ====================
+
+# التصنيفات الافتراضية
+DEFAULT_CATEGORIES = [
+    'الدعوى', 'الإجابة', 'المرافعة', 'الأسباب', 'الحكم',
+    'الشهادة', 'الصلح', 'اليمين', 'النكول', 'الكفالة',
+    'الالتماس', 'الشطب', 'الغياب', 'الاختصاص', 'التمويل',
+    'العقارات', 'المشاكل_التقنية'
+]
+
+# قاموس لربط أسماء الجداول بالتصنيفات
+CATEGORY_MAPPING = {
+    'الدعوى': 'الدعوى',
+    'صندوق الدعوى': 'الدعوى',
+    'الإجابة': 'الإجابة',
+    'صندوق الإجابة': 'الإجابة',
+    'المرافعة': 'المرافعة',
+    'صندوق المرافعة': 'المرافعة',
+    'الأسباب': 'الأسباب',
+    'صندوق الأسباب': 'الأسباب',
+    'الحكم': 'الحكم',
+    'صندوق الحكم': 'الحكم',
+    'الشهادة': 'الشهادة',
+    'الصلح': 'الصلح',
+    'اليمين': 'اليمين',
+    'النكول': 'النكول',
+    'الكفالة': 'الكفالة',
+    'الالتماس': 'الالتماس',
+    'الشطب': 'الشطب',
+    'الغياب': 'الغياب',
+    'الاختصاص': 'الاختصاص',
+    'التمويل': 'التمويل',
+    'العقارات': 'العقارات',
+    'المشاكل': 'المشاكل_التقنية',
+}
+
+MIN_CONTENT_LENGTH = 10
+
+
+def read_word_tables(file_path):
+    """قراءة جداول ملف وورد (مسار أو ملف في الذاكرة) كقوائم صفوف نصية"""
+    Document = load_docx()
+    with INSTRUMENTS.stage('document_open'):
+        doc = Document(file_path)
     
-    def __init__(self):
-        super().__init__()
-        self.templates = {}  # {category: [Template, ...]}
-        self.current_file = None
-        self.is_dark_mode = False
-        self.init_categories()
-        self.init_ui()
-        self.apply_light_theme()
-    
-    def init_categories(self):
-        """تهيئة التصنيفات"""
-        for cat in self.DEFAULT_CATEGORIES:
-            self.templates[cat] = []
-    
-    def init_ui(self):
-        """إنشاء واجهة المستخدم"""
-        self.setWindowTitle('محوّل نماذج الوورد إلى Templates Data')
-        self.setMinimumSize(1200, 800)
-        self.setLayoutDirection(Qt.RightToLeft)
-        
-        # الودجت المركزي
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        main_layout = QVBoxLayout(central_widget)
-        
-        # شريط الأدوات العلوي
-        toolbar = self.create_toolbar()
-        main_layout.addLayout(toolbar)
-        
-        # التبويبات
-        self.tabs = QTabWidget()
-        self.tabs.addTab(self.create_import_tab(), '📥 استيراد من وورد')
-        self.tabs.addTab(self.create_manual_tab(), '✏️ إضافة يدوية')
-        self.tabs.addTab(self.create_preview_tab(), '👁️ معاينة')
-        self.tabs.addTab(self.create_export_tab(), '📤 تصدير')
-        main_layout.addWidget(self.tabs)
-        
-        # شريط الحالة
-        self.status_bar = QStatusBar()
-        self.setStatusBar(self.status_bar)
-        self.update_status()
-        
-        # شريط الحقوق
-        credits = QLabel('تطوير: عبدالكريم العبود | abo.saleh.g@gmail.com')
-        credits.setAlignment(Qt.AlignCenter)
-        credits.setStyleSheet('color: #888; padding: 5px;')
-        main_layout.addWidget(credits)
-    
-    def create_toolbar(self):
-        """إنشاء شريط الأدوات"""
-        layout = QHBoxLayout()
-        
-        # زر فتح ملف
-        btn_open = QPushButton('📂 فتح ملف وورد')
-        btn_open.clicked.connect(self.open_word_file)
-        layout.addWidget(btn_open)
-        
-        # زر حفظ المشروع
-        btn_save = QPushButton('💾 حفظ المشروع')
-        btn_save.clicked.connect(self.save_project)
-        layout.addWidget(btn_save)
-        
-        # زر تحميل المشروع
-        btn_load = QPushButton('📁 تحميل مشروع')
-        btn_load.clicked.connect(self.load_project)
-        layout.addWidget(btn_load)
-        
-        layout.addStretch()
-        
-        # زر الوضع الليلي
-        self.btn_theme = QPushButton('🌙 الوضع الليلي')
-        self.btn_theme.clicked.connect(self.toggle_theme)
-        layout.addWidget(self.btn_theme)
-        
-        return layout
+    tables = []
+    with INSTRUMENTS.stage('table_walk'):
+        for table in doc.tables:
+            rows = []
+            for row in table.rows:
+                cells = [cell.text.strip() for cell in row.cells]
+                rows.append(cells)
+            if rows:
+                tables.append(rows)
+    return tables
+
+
+def detect_category(table_data, default='الدعوى'):
+    """تحديد التصنيف من أول خلية في الجدول"""
+    first_cell = table_data[0][0] if table_data[0] else ''
+    for key, cat in CATEGORY_MAPPING.items():
+        if key in first_cell:
+            return cat
+    return default
+
+
+def rows_to_templates(table_data, category):
+    """تحويل صفوف الجدول إلى نماذج مع تخطي الصف الأول (العنوان غالباً)"""
+    templates = []
+    for row in table_data[1:]:
+        if len(row) >= 3:
+            num = row[0].strip()
+            keyword = row[1].strip()
+            content = row[2].strip()
+            
+            if content and len(content) > MIN_CONTENT_LENGTH:
+                templates.append(Template(num, keyword, content, category))
+    return templates
+
+
+def classify_tables(tables):
+    """استيراد كل الجداول مع تحديد تصنيف كل جدول تلقائياً"""
+    templates = {}
+    with INSTRUMENTS.stage('classification'):
+        for table_data in tables:
+            if not table_data:
+                continue
+            category = detect_category(table_data)
+            templates.setdefault(category, []).extend(rows_to_templates(table_data, category))
+    return templates
+
+
+# ==================== التصدير ====================
+
+def build_export_data(templates, segments=False, compact=False):
+    """تجهيز بيانات التصدير مع استبعاد التصنيفات الفارغة"""
+    data = {}
+    for cat, tmpls in templates.items():
+        if tmpls:
+            if compact:
+                tmpls = [Template(t.num, t.keyword.strip(), compact_content(t.content), cat) for t in tmpls]
+            data[cat] = [t.to_dict(segments) for t in tmpls]
+    return data
+
+
+def render_json(data, minify=False):
+    """تحويل البيانات إلى نص JSON"""
+    with INSTRUMENTS.stage('serialization'):
+        if minify:
+            return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        return json.dumps(data, ensure_ascii=False, indent=4)
+
+
+def render_js(data, minify=False):
+    """تحويل البيانات إلى كود templatesData"""
+    return f"const templatesData = {render_json(data, minify)};"
+
+
+@lru_cache(maxsize=None)
+def default_file_mode():
+    """صلاحيات الملف الجديد حسب umask (قراءة umask تتطلب تغييره ثم إرجاعه)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def atomic_write(file_path, text):
+    """كتابة الملف (نص أو bytes) عبر ملف مؤقت ثم إعادة تسمية حتى لا يُقرأ نصف مكتوب
     
-    def create_import_tab(self):
-        """تبويب الاستيراد من وورد"""
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-        
-        # معلومات الملف
-        file_group = QGroupBox('ملف الوورد')
-        file_layout = QHBoxLayout(file_group)
-        
-        self.lbl_file = QLabel('لم يتم اختيار ملف')
-        file_layout.addWidget(self.lbl_file)
-        
-        btn_browse = QPushButton('استعراض...')
-        btn_browse.clicked.connect(self.open_word_file)
-        file_layout.addWidget(btn_browse)
-        
-        layout.addWidget(file_group)
-        
-        # جدول الجداول المستخرجة
-        tables_group = QGroupBox('الجداول المكتشفة')
-        tables_layout = QVBoxLayout(tables_group)
-        
-        self.tables_list = QListWidget()
-        self.tables_list.itemClicked.connect(self.on_table_selected)
-        tables_layout.addWidget(self.tables_list)
-        
-        layout.addWidget(tables_group)
-        
-        # معاينة الجدول المحدد
-        preview_group = QGroupBox('محتوى الجدول')
-        preview_layout = QVBoxLayout(preview_group)
-        
-        self.table_preview = QTableWidget()
-        self.table_preview.setLayoutDirection(Qt.RightToLeft)
-        preview_layout.addWidget(self.table_preview)
-        
-        # أزرار الاستيراد
-        import_layout = QHBoxLayout()
-        
-        self.cmb_import_category = QComboBox()
-        self.cmb_import_category.addItems(self.DEFAULT_CATEGORIES)
-        import_layout.addWidget(QLabel('التصنيف:'))
-        import_layout.addWidget(self.cmb_import_category)
-        
-        btn_import = QPushButton('📥 استيراد الجدول المحدد')
-        btn_import.clicked.connect(self.import_selected_table)
-        import_layout.addWidget(btn_import)
-        
-        btn_import_all = QPushButton('📥 استيراد الكل (تلقائي)')
-        btn_import_all.clicked.connect(self.import_all_tables)
-        import_layout.addWidget(btn_import_all)
-        
-        preview_layout.addLayout(import_layout)
-        layout.addWidget(preview_group)
-        
-        return widget
+    mkstemp ينشئ الملف بصلاحية المالك فقط، فتُنسخ صلاحيات الملف القديم إن وُجد وإلا الافتراضية.
+    """
+    import shutil
     
-    def create_manual_tab(self):
-        """تبويب الإضافة اليدوية"""
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        
-        # القائمة الجانبية - التصنيفات والنماذج
-        sidebar = QWidget()
-        sidebar_layout = QVBoxLayout(sidebar)
-        sidebar.setMaximumWidth(350)
-        
-        # التصنيفات
-        cat_group = QGroupBox('التصنيفات')
-        cat_layout = QVBoxLayout(cat_group)
-        
-        self.categories_list = QListWidget()
-        self.categories_list.addItems(self.DEFAULT_CATEGORIES)
-        self.categories_list.currentRowChanged.connect(self.on_category_changed)
-        cat_layout.addWidget(self.categories_list)
-        
-        cat_buttons = QHBoxLayout()
-        btn_add_cat = QPushButton('➕')
-        btn_add_cat.setToolTip('إضافة تصنيف')
-        btn_add_cat.clicked.connect(self.add_category)
-        cat_buttons.addWidget(btn_add_cat)
-        
-        btn_del_cat = QPushButton('➖')
-        btn_del_cat.setToolTip('حذف تصنيف')
-        btn_del_cat.clicked.connect(self.delete_category)
-        cat_buttons.addWidget(btn_del_cat)
-        cat_layout.addLayout(cat_buttons)
-        
-        sidebar_layout.addWidget(cat_group)
-        
-        # النماذج في التصنيف
-        templates_group = QGroupBox('النماذج')
-        templates_layout = QVBoxLayout(templates_group)
-        
-        self.templates_list = QListWidget()
-        self.templates_list.currentRowChanged.connect(self.on_template_selected)
-        self.templates_list.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.templates_list.customContextMenuRequested.connect(self.show_template_context_menu)
-        templates_layout.addWidget(self.templates_list)
-        
-        tmpl_buttons = QHBoxLayout()
-        btn_add_tmpl = QPushButton('➕ إضافة نموذج')
-        btn_add_tmpl.clicked.connect(self.add_template)
-        tmpl_buttons.addWidget(btn_add_tmpl)
-        
-        btn_del_tmpl = QPushButton('🗑️ حذف')
-        btn_del_tmpl.clicked.connect(self.delete_template)
-        tmpl_buttons.addWidget(btn_del_tmpl)
-        templates_layout.addLayout(tmpl_buttons)
-        
-        sidebar_layout.addWidget(templates_group)
-        layout.addWidget(sidebar)
-        
-        # منطقة التحرير
-        editor = QWidget()
-        editor_layout = QVBoxLayout(editor)
-        
-        form_group = QGroupBox('تحرير النموذج')
-        form_layout = QFormLayout(form_group)
-        
-        self.txt_num = QLineEdit()
-        self.txt_num.setPlaceholderText('مثال: 1، 2، 30')
-        form_layout.addRow('الرقم:', self.txt_num)
-        
-        self.txt_keyword = QLineEdit()
-        self.txt_keyword.setPlaceholderText('مثال: لدي1، قائم، أدعى')
-        form_layout.addRow('الكلمة المفتاحية:', self.txt_keyword)
-        
-        self.txt_content = QTextEdit()
-        self.txt_content.setPlaceholderText('محتوى النموذج...')
-        self.txt_content.setMinimumHeight(300)
-        form_layout.addRow('المحتوى:', self.txt_content)
-        
-        editor_layout.addWidget(form_group)
-        
-        # أزرار الحفظ
-        save_layout = QHBoxLayout()
-        btn_save_template = QPushButton('💾 حفظ التعديلات')
-        btn_save_template.clicked.connect(self.save_current_template)
-        save_layout.addWidget(btn_save_template)
-        
-        btn_clear = QPushButton('🔄 مسح الحقول')
-        btn_clear.clicked.connect(self.clear_editor)
-        save_layout.addWidget(btn_clear)
-        
-        editor_layout.addLayout(save_layout)
-        layout.addWidget(editor)
-        
-        return widget
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(file_path))
+    try:
+        mode, encoding = ('wb', None) if isinstance(text, bytes) else ('w', 'utf-8')
+        with INSTRUMENTS.stage('file_write'), os.fdopen(fd, mode, encoding=encoding) as f:
+            f.write(text)
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        else:
+            os.chmod(temp_path, default_file_mode())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+# ==================== تحديث index.html ====================
+
+TEMPLATES_MARKER = b'const templatesData'
+# خارج النصوص يهمنا فقط بداية نص أو قوس؛ داخلها نهاية النص أو الهروب
+JSON_STRUCTURE_PATTERN = re.compile(rb'["{}]')
+JSON_STRING_END_PATTERN = re.compile(rb'["\\]')
+
+
+def find_templates_block(mm):
+    """تحديد موضع كتلة const templatesData = {...}; دون قراءة الملف كله"""
+    start = mm.find(TEMPLATES_MARKER)
+    if start < 0:
+        raise ValueError('لم يتم العثور على const templatesData في الملف')
+    pos = mm.find(b'{', start)
+    if pos < 0:
+        raise ValueError('كتلة templatesData غير مكتملة')
     
-    def create_preview_tab(self):
-        """تبويب المعاينة"""
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-        
-        # إحصائيات
-        stats_group = QGroupBox('📊 إحصائيات')
-        stats_layout = QHBoxLayout(stats_group)
-        
-        self.lbl_total_templates = QLabel('إجمالي النماذج: 0')
-        stats_layout.addWidget(self.lbl_total_templates)
-        
-        self.lbl_total_categories = QLabel('التصنيفات: 0')
-        stats_layout.addWidget(self.lbl_total_categories)
-        
-        layout.addWidget(stats_group)
-        
-        # معاينة الكود
-        preview_group = QGroupBox('معاينة الكود')
-        preview_layout = QVBoxLayout(preview_group)
-        
-        format_layout = QHBoxLayout()
-        format_layout.addWidget(QLabel('الصيغة:'))
-        
-        self.cmb_format = QComboBox()
-        self.cmb_format.addItems(['JavaScript (templatesData)', 'JSON'])
-        self.cmb_format.currentIndexChanged.connect(self.update_preview)
-        format_layout.addWidget(self.cmb_format)
-        
-        btn_refresh = QPushButton('🔄 تحديث المعاينة')
-        btn_refresh.clicked.connect(self.update_preview)
-        format_layout.addWidget(btn_refresh)
-        
-        format_layout.addStretch()
-        preview_layout.addLayout(format_layout)
-        
-        self.preview_text = QTextEdit()
-        self.preview_text.setReadOnly(True)
-        self.preview_text.setFont(QFont('Courier New', 10))
-        self.preview_text.setLayoutDirection(Qt.LeftToRight)
-        preview_layout.addWidget(self.preview_text)
-        
-        # أزرار النسخ
-        copy_layout = QHBoxLayout()
-        btn_copy = QPushButton('📋 نسخ للحافظة')
-        btn_copy.clicked.connect(self.copy_to_clipboard)
-        copy_layout.addWidget(btn_copy)
-        preview_layout.addLayout(copy_layout)
-        
-        layout.addWidget(preview_group)
-        
-        return widget
+    depth = 0
+    while True:
+        match = JSON_STRUCTURE_PATTERN.search(mm, pos)
+        if not match:
+            raise ValueError('كتلة templatesData غير مغلقة')
+        ch = match.group()
+        pos = match.end()
+        if ch == b'"':
+            # تخطي النص حتى علامة التنصيص المغلقة مع مراعاة \"
+            while True:
+                match = JSON_STRING_END_PATTERN.search(mm, pos)
+                if not match:
+                    raise ValueError('نص غير مغلق في templatesData')
+                pos = match.end()
+                if match.group() == b'\\':
+                    pos += 1
+                else:
+                    break
+        elif ch == b'{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                break
     
-    def create_export_tab(self):
-        """تبويب التصدير"""
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-        
-        # خيارات التصدير
-        options_group = QGroupBox('خيارات التصدير')
-        options_layout = QFormLayout(options_group)
-        
-        self.cmb_export_format = QComboBox()
-        self.cmb_export_format.addItems([
-            'JavaScript (.js) - للاستخدام في HTML',
-            'JSON (.json) - بيانات خام'
-        ])
-        options_layout.addRow('الصيغة:', self.cmb_export_format)
-        
-        self.chk_minify = QCheckBox('ضغط الكود (minify)')
-        options_layout.addRow('', self.chk_minify)
-        
-        layout.addWidget(options_group)
-        
-        # أزرار التصدير
-        export_group = QGroupBox('تصدير')
-        export_layout = QVBoxLayout(export_group)
-        
-        btn_export_file = QPushButton('💾 حفظ كملف')
-        btn_export_file.clicked.connect(self.export_to_file)
-        btn_export_file.setMinimumHeight(50)
-        export_layout.addWidget(btn_export_file)
-        
-        btn_export_clipboard = QPushButton('📋 نسخ للحافظة')
-        btn_export_clipboard.clicked.connect(self.copy_to_clipboard)
-        btn_export_clipboard.setMinimumHeight(50)
-        export_layout.addWidget(btn_export_clipboard)
-        
-        layout.addWidget(export_group)
-        layout.addStretch()
-        
-        return widget
+    if mm[pos:pos + 1] == b';':
+        pos += 1
+    return start, pos
+
+
+def patch_index_html(html_path, code):
+    """استبدال كتلة templatesData في index.html بالكود الجديد
+    
+    يعيد False إذا كان المحتوى مطابقاً فلا حاجة للكتابة.
+    """
+    import shutil
+    import hashlib
+    
+    new_block = code.encode('utf-8')
+    with open(html_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start, end = find_templates_block(mm)
+        if hashlib.sha256(mm[start:end]).digest() == hashlib.sha256(new_block).digest():
+            return False
+        
+        view = memoryview(mm)
+        directory = os.path.dirname(os.path.abspath(html_path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.html')
+        try:
+            with INSTRUMENTS.stage('file_write'), os.fdopen(fd, 'wb') as out:
+                out.write(view[:start])
+                out.write(new_block)
+                out.write(view[end:])
+            view.release()
+            shutil.copymode(html_path, temp_path)
+            os.replace(temp_path, html_path)
+        except BaseException:
+            view.release()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    return True
+
+
+HTML_EXTENSIONS = ('.html', '.htm')
+
+
+def write_export(output, data, minify=False):
+    """كتابة البيانات حسب امتداد الملف: JSON، أو تحديث كتلة templatesData في صفحة HTML، أو JS
+    
+    يعيد False إذا كانت الصفحة مطابقة فلم تُكتب.
+    """
+    lower = output.lower()
+    if lower.endswith(HTML_EXTENSIONS):
+        return patch_index_html(output, render_js(data, minify))
+    if lower.endswith('.json'):
+        atomic_write(output, render_json(data, minify))
+    else:
+        atomic_write(output, render_js(data, minify))
+    return True
+
+
+# ==================== الإصدار الإنتاجي ====================
+
+# مسافات زائدة حول الأسطر أو متكررة داخل السطر
+COMPACT_PATTERN = re.compile(r'[ \t]*(\n)[ \t]*|[ \t]{2,}|\t')
+MIN_INTERNED_LENGTH = 8
+
+
+def compact_content(text):
+    """حذف المسافات الزائدة دون المساس بالنقاط والأصفار"""
+    return COMPACT_PATTERN.sub(lambda m: m.group(1) or ' ', text).strip()
+
+
+def intern_strings(data):
+    """استبدال النصوص المكررة بفهارس في جدول نصوص مشترك"""
+    counts = Counter(
+        value for tmpls in data.values() for t in tmpls
+        for key, value in t.items()
+        if key in ('keyword', 'content') and len(value) >= MIN_INTERNED_LENGTH
+    )
+    table = {}
+    interned = {}
+    for cat, tmpls in data.items():
+        interned[cat] = []
+        for t in tmpls:
+            entry = dict(t)
+            for key in ('keyword', 'content'):
+                value = entry[key]
+                if counts[value] > 1:
+                    entry[key] = table.setdefault(value, len(table))
+            interned[cat].append(entry)
+    return list(table), interned
+
+
+def render_production_js(data):
+    """كود templatesData مضغوط يعيد بناء النصوص المكررة من جدول مشترك عند التحميل"""
+    strings, interned = intern_strings(data)
+    if not strings:
+        return render_js(data, minify=True)
+    return (
+        "const templatesData=((s,d)=>{for(const c in d)for(const t of d[c])"
+        "for(const k in t)if(typeof t[k]==='number')t[k]=s[t[k]];return d})"
+        f"({render_json(strings, True)},{render_json(interned, True)});"
+    )
+
+
+def write_compressed_siblings(file_path):
+    """كتابة نسخ .gz و .br بجانب الملف وإرجاع أحجامها"""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    
+    import gzip
+    
+    sizes = {}
+    gz_path = file_path + '.gz'
+    # mtime=0 حتى يكون الناتج ثابتاً بين التصديرات
+    compressed = gzip.compress(raw, compresslevel=9, mtime=0)
+    atomic_write(gz_path, compressed)
+    sizes[gz_path] = len(compressed)
+    
+    br_path = file_path + '.br'
+    try:
+        import brotli
+    except ImportError:
+        # نسخة .br من تصدير سابق ستُقدَّم للمتصفحات بنماذج قديمة
+        if os.path.exists(br_path):
+            os.remove(br_path)
+        sizes[br_path] = None
+        return sizes
+    compressed = brotli.compress(raw, mode=brotli.MODE_TEXT, quality=11)
+    atomic_write(br_path, compressed)
+    sizes[br_path] = len(compressed)
+    return sizes
+
+
+def export_production(templates, file_path, segments=False):
+    """تصدير إنتاجي: ضغط المحتوى وتوحيد النصوص المكررة ثم ملفات .gz و .br
+    
+    يعيد تقرير الأحجام {الملف: الحجم بالبايت}، والقيمة None تعني أن brotli غير مثبت.
+    """
+    data = build_export_data(templates, segments, compact=True)
+    if file_path.lower().endswith('.json'):
+        code = render_json(data, minify=True)
+        baseline = render_json(build_export_data(templates, segments), minify=False)
+    else:
+        code = render_production_js(data)
+        baseline = render_js(build_export_data(templates, segments), minify=False)
+    atomic_write(file_path, code)
+    
+    report = {'(بدون ضغط)': len(baseline.encode('utf-8')), file_path: os.path.getsize(file_path)}
+    report.update(write_compressed_siblings(file_path))
+    return report
+
+
+def format_size_report(report):
+    """تقرير الأحجام كنص مقروء"""
+    lines = []
+    for name, size in report.items():
+        label = os.path.basename(name) if os.sep in name else name
+        if size is None:
+            lines.append(f'{label}: تخطي (pip install brotli)')
+        else:
+            lines.append(f'{label}: {size / 1024:.1f} KB')
+    return '\n'.join(lines)
+
+
+# ==================== وضع المراقبة ====================
+
+WATCH_DEBOUNCE = 0.3
+
+
+def is_word_document(path):
+    """ملف docx حقيقي وليس ملف القفل المؤقت الذي ينشئه وورد (~$)"""
+    name = os.path.basename(path)
+    return name.lower().endswith('.docx') and not name.startswith('~$')
+
+
+class DocumentWatcher:
+    """مراقبة ملفات الوورد وإعادة بناء templatesData عند تغيّرها"""
     
-    # ==================== وظائف الاستيراد ====================
+    def __init__(self, source, output, minify=False, segments=False, log=print, normalize=None):
+        self.source = os.path.abspath(source)
+        self.output = os.path.abspath(output)
+        self.minify = minify
+        self.segments = segments
+        self.log = log
+        self.normalize = normalize
+        self.documents = {}  # {المسار: {التصنيف: [Template, ...]}}
+        self.pending = set()
+        self.lock = threading.Lock()
+        # بناء واحد في كل مرة: كلها تعدّل self.documents وتكتب نفس الناتج
+        self.rebuild_lock = threading.Lock()
+        self.timer = None
     
-    def open_word_file(self):
-        """فتح ملف وورد"""
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, 'اختر ملف وورد', '', 'Word Files (*.docx *.doc);;All Files (*)'
+    def scan(self):
+        """قائمة ملفات الوورد في المصدر"""
+        if os.path.isfile(self.source):
+            return [self.source]
+        return sorted(
+            os.path.join(self.source, name) for name in os.listdir(self.source)
+            if is_word_document(name)
         )
-        if file_path:
-            self.current_file = file_path
-            self.lbl_file.setText(os.path.basename(file_path))
-            
-            # إذا كان الملف .doc (قديم) نحوله إلى .docx
-            if file_path.lower().endswith('.doc') and not file_path.lower().endswith('.docx'):
-                converted_path = self.convert_doc_to_docx(file_path)
-                if converted_path:
-                    self.extract_tables_from_word(converted_path)
-                else:
-                    QMessageBox.critical(self, 'خطأ', 
-                        'لم يتم التحويل. جرّب:\n'
-                        '1. تحويل الملف يدوياً إلى .docx من Word\n'
-                        '2. أو تثبيت LibreOffice')
-            else:
-                self.extract_tables_from_word(file_path)
     
-    def convert_doc_to_docx(self, doc_path):
-        """تحويل ملف .doc إلى .docx"""
-        import subprocess
-        import tempfile
-        
-        # المسار المؤقت للملف المحول
-        temp_dir = tempfile.gettempdir()
-        docx_path = os.path.join(temp_dir, os.path.basename(doc_path) + 'x')
-        
-        # محاولة 1: استخدام LibreOffice
+    def extract(self, path):
+        """إعادة استخراج ملف واحد فقط"""
         try:
-            # البحث عن LibreOffice
-            libreoffice_paths = [
-                r'C:\Program Files\LibreOffice\program\soffice.exe',
-                r'C:\Program Files (x86)\LibreOffice\program\soffice.exe',
-                '/usr/bin/libreoffice',
-                '/usr/bin/soffice',
-                'libreoffice',
-                'soffice'
-            ]
-            
-            soffice = None
-            for path in libreoffice_paths:
-                if os.path.exists(path) or self.command_exists(path):
-                    soffice = path
-                    break
-            
-            if soffice:
-                self.status_bar.showMessage('جاري تحويل الملف...', 0)
-                QApplication.processEvents()
-                
-                result = subprocess.run([
-                    soffice,
-                    '--headless',
-                    '--convert-to', 'docx',
-                    '--outdir', temp_dir,
-                    doc_path
-                ], capture_output=True, timeout=60)
-                
-                if os.path.exists(docx_path):
-                    self.status_bar.showMessage('تم تحويل الملف بنجاح', 3000)
-                    return docx_path
+            templates = classify_tables(read_word_tables(path))
+            if self.normalize is not None:
+                normalize_templates(templates, self.normalize, workers=1)
+            self.documents[path] = templates
         except Exception as e:
-            print(f"LibreOffice error: {e}")
-        
-        # محاولة 2: استخدام Word COM (Windows فقط)
-        if sys.platform == 'win32':
-            try:
-                import win32com.client
-                word = win32com.client.Dispatch('Word.Application')
-                word.Visible = False
-                doc = word.Documents.Open(os.path.abspath(doc_path))
-                doc.SaveAs2(docx_path, FileFormat=16)  # 16 = docx
-                doc.Close()
-                word.Quit()
-                
-                if os.path.exists(docx_path):
-                    self.status_bar.showMessage('تم تحويل الملف بنجاح', 3000)
-                    return docx_path
-            except ImportError:
-                QMessageBox.warning(self, 'تنبيه', 
-                    'لتحويل ملفات .doc، ثبّت:\n'
-                    'pip install pywin32\n\n'
-                    'أو استخدم LibreOffice')
-            except Exception as e:
-                print(f"Word COM error: {e}")
-        
-        return None
+            # قد يكون الملف ما زال قيد الحفظ؛ نُبقي النسخة السابقة
+            self.log(f'تعذّر قراءة {os.path.basename(path)}: {e}')
     
-    def command_exists(self, cmd):
-        """التحقق من وجود أمر"""
-        import shutil
-        return shutil.which(cmd) is not None
+    def merge(self):
+        """دمج نماذج كل الملفات بترتيب أسمائها"""
+        templates = {cat: [] for cat in DEFAULT_CATEGORIES}
+        for path in sorted(self.documents):
+            for cat, tmpls in self.documents[path].items():
+                templates.setdefault(cat, []).extend(tmpls)
+        return templates
     
-    def extract_tables_from_word(self, file_path):
-        """استخراج الجداول من ملف وورد"""
-        try:
-            doc = Document(file_path)
-            self.word_tables = []
-            self.tables_list.clear()
-            
-            for i, table in enumerate(doc.tables):
-                rows = []
-                for row in table.rows:
-                    cells = [cell.text.strip() for cell in row.cells]
-                    rows.append(cells)
-                
-                if rows:
-                    self.word_tables.append(rows)
-                    # تحديد اسم الجدول من أول خلية
-                    first_text = rows[0][0] if rows[0] else f'جدول {i+1}'
-                    preview = first_text[:50] + '...' if len(first_text) > 50 else first_text
-                    self.tables_list.addItem(f'جدول {i+1}: {preview} ({len(rows)} صف)')
-            
-            self.status_bar.showMessage(f'تم استخراج {len(self.word_tables)} جدول', 5000)
-            
-        except Exception as e:
-            QMessageBox.critical(self, 'خطأ', f'فشل في قراءة الملف:\n{str(e)}')
-    
-    def on_table_selected(self, item):
-        """عند اختيار جدول"""
-        idx = self.tables_list.currentRow()
-        if idx >= 0 and idx < len(self.word_tables):
-            self.show_table_preview(self.word_tables[idx])
-    
-    def show_table_preview(self, table_data):
-        """عرض معاينة الجدول"""
-        self.table_preview.clear()
-        if not table_data:
-            return
-        
-        # تحديد عدد الأعمدة
-        max_cols = max(len(row) for row in table_data)
-        self.table_preview.setRowCount(len(table_data))
-        self.table_preview.setColumnCount(max_cols)
+    def rebuild(self, changed=None):
+        """إعادة الاستخراج للملفات المتغيرة ثم كتابة الناتج"""
+        started = time.perf_counter()
+        if changed is None:
+            self.documents = {}
+            changed = self.scan()
+        for path in changed:
+            if os.path.exists(path):
+                self.extract(path)
+            else:
+                self.documents.pop(path, None)
         
-        for i, row in enumerate(table_data):
-            for j, cell in enumerate(row):
-                item = QTableWidgetItem(cell[:100])  # اقتصار النص
-                self.table_preview.setItem(i, j, item)
+        data = build_export_data(self.merge(), self.segments)
+        write_export(self.output, data, self.minify)
         
-        self.table_preview.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        total = sum(len(tmpls) for tmpls in data.values())
+        elapsed = time.perf_counter() - started
+        self.log(f'تم تحديث {os.path.basename(self.output)}: {total} نموذج ({elapsed:.2f} ث)')
     
-    def import_selected_table(self):
-        """استيراد الجدول المحدد"""
-        idx = self.tables_list.currentRow()
-        if idx < 0:
-            QMessageBox.warning(self, 'تنبيه', 'اختر جدولاً أولاً')
+    def on_change(self, path):
+        """تجميع التغييرات المتتالية (وورد يحفظ على عدة مراحل) ثم البناء مرة واحدة"""
+        path = os.path.abspath(path)
+        if not is_word_document(path):
             return
-        
-        category = self.cmb_import_category.currentText()
-        table_data = self.word_tables[idx]
-        
-        imported = 0
-        for row in table_data[1:]:  # تخطي الصف الأول (العنوان غالباً)
-            if len(row) >= 3:
-                num = row[0].strip()
-                keyword = row[1].strip()
-                content = row[2].strip()
-                
-                if content and len(content) > 10:
-                    template = Template(num, keyword, content, category)
-                    self.templates[category].append(template)
-                    imported += 1
-        
-        self.update_templates_list()
-        self.update_status()
-        QMessageBox.information(self, 'تم', f'تم استيراد {imported} نموذج إلى "{category}"')
-    
-    def import_all_tables(self):
-        """استيراد كل الجداول تلقائياً"""
-        if not hasattr(self, 'word_tables') or not self.word_tables:
-            QMessageBox.warning(self, 'تنبيه', 'لا توجد جداول للاستيراد')
+        if os.path.isfile(self.source) and path != self.source:
             return
-        
-        # قاموس لربط أسماء الجداول بالتصنيفات
-        category_mapping = {
-            'الدعوى': 'الدعوى',
-            'صندوق الدعوى': 'الدعوى',
-            'الإجابة': 'الإجابة',
-            'صندوق الإجابة': 'الإجابة',
-            'المرافعة': 'المرافعة',
-            'صندوق المرافعة': 'المرافعة',
-            'الأسباب': 'الأسباب',
-            'صندوق الأسباب': 'الأسباب',
-            'الحكم': 'الحكم',
-            'صندوق الحكم': 'الحكم',
-            'الشهادة': 'الشهادة',
-            'الصلح': 'الصلح',
-            'اليمين': 'اليمين',
-            'النكول': 'النكول',
-            'الكفالة': 'الكفالة',
-            'الالتماس': 'الالتماس',
-            'الشطب': 'الشطب',
-            'الغياب': 'الغياب',
-            'الاختصاص': 'الاختصاص',
-            'التمويل': 'التمويل',
-            'العقارات': 'العقارات',
-            'المشاكل': 'المشاكل_التقنية',
-        }
-        
-        total_imported = 0
-        
-        for table_data in self.word_tables:
-            if not table_data:
-                continue
-            
-            # محاولة تحديد التصنيف من أول صف
-            first_cell = table_data[0][0] if table_data[0] else ''
-            category = 'الدعوى'  # افتراضي
-            
-            for key, cat in category_mapping.items():
-                if key in first_cell:
-                    category = cat
-                    break
-            
-            # استيراد الصفوف
-            for row in table_data[1:]:
-                if len(row) >= 3:
-                    num = row[0].strip()
-                    keyword = row[1].strip()
-                    content = row[2].strip()
-                    
-                    if content and len(content) > 10:
-                        template = Template(num, keyword, content, category)
-                        self.templates[category].append(template)
-                        total_imported += 1
-        
-        self.update_templates_list()
-        self.update_status()
-        QMessageBox.information(self, 'تم', f'تم استيراد {total_imported} نموذج')
+        with self.lock:
+            self.pending.add(path)
+            if self.timer:
+                self.timer.cancel()
+            self.timer = threading.Timer(WATCH_DEBOUNCE, self.flush)
+            self.timer.start()
     
-    # ==================== وظائف التحرير اليدوي ====================
+    def flush(self):
+        # الحفظ أثناء بناء جارٍ ينتظر انتهاءه ثم يأخذ كل ما تراكم
+        with self.rebuild_lock:
+            with self.lock:
+                changed, self.pending = sorted(self.pending), set()
+            if not changed:
+                return
+            try:
+                self.rebuild(changed)
+            except Exception as e:
+                self.log(f'فشل التحديث: {e}')
     
-    def on_category_changed(self, index):
-        """عند تغيير التصنيف"""
-        self.update_templates_list()
+    def run(self):
+        """البناء الأولي ثم المراقبة حتى الإيقاف بـ Ctrl+C"""
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            print("يجب تثبيت watchdog أولاً:")
+            print("pip install watchdog")
+            return 1
+        
+        watcher = self
+        
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                watcher.on_change(event.src_path)
+                # الحفظ عبر ملف مؤقت ثم إعادة تسمية يظهر كحدث نقل
+                dest = getattr(event, 'dest_path', '')
+                if dest:
+                    watcher.on_change(dest)
+        
+        with self.rebuild_lock:
+            self.rebuild()
+        directory = self.source if os.path.isdir(self.source) else os.path.dirname(self.source)
+        observer = Observer()
+        observer.schedule(Handler(), directory, recursive=False)
+        observer.start()
+        self.log(f'جاري مراقبة {directory} ... (Ctrl+C للإيقاف)')
+        try:
+            while observer.is_alive():
+                observer.join(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            observer.stop()
+            observer.join()
+        return 0
+
+
+# ==================== استيراد الأرشيف ====================
+
+# الأرشيف المفتوح في كل عملية عاملة: (الملف، mmap، ZipFile)
+_ARCHIVE = None
+
+
+class MappedFile(mmap.mmap):
+    """mmap قابل للاستخدام مع zipfile (يتطلب seekable قبل بايثون 3.13)"""
     
-    def update_templates_list(self):
-        """تحديث قائمة النماذج"""
-        self.templates_list.clear()
-        
-        current_row = self.categories_list.currentRow()
-        if current_row < 0:
-            return
-        
-        category = self.categories_list.item(current_row).text()
-        
-        if category in self.templates:
-            for i, tmpl in enumerate(self.templates[category]):
-                display = f"[{tmpl.num}] {tmpl.keyword}: {tmpl.content[:40]}..."
-                self.templates_list.addItem(display)
-    
-    def on_template_selected(self, index):
-        """عند اختيار نموذج"""
-        if index < 0:
-            return
-        
-        current_cat = self.categories_list.currentItem()
-        if not current_cat:
-            return
-        
-        category = current_cat.text()
-        
-        if category in self.templates and index < len(self.templates[category]):
-            tmpl = self.templates[category][index]
-            self.txt_num.setText(tmpl.num)
-            self.txt_keyword.setText(tmpl.keyword)
-            self.txt_content.setPlainText(tmpl.content)
-    
-    def add_category(self):
-        """إضافة تصنيف جديد"""
-        name, ok = QInputDialog.getText(self, 'تصنيف جديد', 'اسم التصنيف:')
-        if ok and name:
-            if name not in self.templates:
-                self.templates[name] = []
-                self.categories_list.addItem(name)
-                self.cmb_import_category.addItem(name)
-    
-    def delete_category(self):
-        """حذف التصنيف المحدد"""
-        current = self.categories_list.currentItem()
-        if not current:
-            return
-        
-        name = current.text()
-        reply = QMessageBox.question(
-            self, 'تأكيد الحذف',
-            f'هل تريد حذف التصنيف "{name}" وجميع نماذجه؟',
-            QMessageBox.Yes | QMessageBox.No
-        )
-        
-        if reply == QMessageBox.Yes:
-            if name in self.templates:
-                del self.templates[name]
-            self.categories_list.takeItem(self.categories_list.currentRow())
-            
-            # حذف من القائمة المنسدلة
-            idx = self.cmb_import_category.findText(name)
-            if idx >= 0:
-                self.cmb_import_category.removeItem(idx)
-    
-    def add_template(self):
-        """إضافة نموذج جديد"""
-        current_cat = self.categories_list.currentItem()
-        if not current_cat:
-            QMessageBox.warning(self, 'تنبيه', 'اختر تصنيفاً أولاً')
-            return
-        
-        category = current_cat.text()
-        
-        # إنشاء نموذج فارغ
-        tmpl = Template('', '', '', category)
-        self.templates[category].append(tmpl)
-        self.update_templates_list()
-        
-        # تحديد النموذج الجديد
-        self.templates_list.setCurrentRow(len(self.templates[category]) - 1)
-        self.clear_editor()
-    
-    def delete_template(self):
-        """حذف النموذج المحدد"""
-        current_cat = self.categories_list.currentItem()
-        current_tmpl = self.templates_list.currentRow()
-        
-        if not current_cat or current_tmpl < 0:
+    def seekable(self):
+        return True
+    
+    def seek(self, pos, whence=0):
+        # zipfile يتوقع OSError عند البحث قبل بداية الملف (سجل zip64 في الأرشيف الفارغ)، و mmap يرفع ValueError
+        try:
+            return super().seek(pos, whence)
+        except ValueError as e:
+            raise OSError(str(e)) from None
+
+
+def map_file(f):
+    return MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def is_archive(path):
+    return path.lower().endswith('.zip')
+
+
+def archive_members(zf):
+    """ملفات docx داخل الأرشيف بترتيبها، مع تجاهل ملفات القفل ومجلدات macOS"""
+    return [
+        info.filename for info in zf.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith('__MACOSX/')
+        and is_word_document(info.filename)
+    ]
+
+
+def _open_archive(archive_path):
+    """فتح الأرشيف عبر mmap: الصفحات تُقرأ من ذاكرة النظام المشتركة عند الحاجة فقط"""
+    global _ARCHIVE
+    f = open(archive_path, 'rb')
+    mm = map_file(f)
+    _ARCHIVE = (f, mm, zipfile.ZipFile(mm))
+
+
+def _read_archive_member(name):
+    """استخراج جداول ملف واحد من الأرشيف المفتوح دون ملفات مؤقتة"""
+    zf = _ARCHIVE[2]
+    return name, read_word_tables(io.BytesIO(zf.read(name)))
+
+
+def read_archive_tables(archive_path, workers=None):
+    """قراءة جداول كل ملفات docx داخل أرشيف zip بالتوازي
+    
+    يعيد [(اسم الملف، الجداول), ...] بترتيب الأرشيف.
+    """
+    global _ARCHIVE
+    name = os.path.basename(archive_path)
+    try:
+        with open(archive_path, 'rb') as f, map_file(f) as mm:
+            with zipfile.ZipFile(mm) as zf:
+                members = archive_members(zf)
+    except (ValueError, zipfile.BadZipFile) as e:
+        # mmap يرفض الملف الفارغ بـ ValueError
+        raise ValueError(f'{name} ليس أرشيف zip صالحاً') from e
+    if not members:
+        raise ValueError(f'لا توجد ملفات .docx في {name}')
+    
+    workers = min(workers or os.cpu_count() or 1, len(members))
+    if workers <= 1:
+        _open_archive(archive_path)
+        try:
+            return [_read_archive_member(name) for name in members]
+        finally:
+            f, mm, zf = _ARCHIVE
+            zf.close()
+            mm.close()
+            f.close()
+            _ARCHIVE = None
+    
+    # تحليل XML يحتاج المعالج فنوزعه على عمليات، وكل عملية تفتح الأرشيف عبر mmap مرة واحدة
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(workers, initializer=_open_archive, initargs=(archive_path,)) as pool:
+        return list(pool.map(_read_archive_member, members))
+
+
+def classify_archive(archive_path, workers=None):
+    """استيراد كل جداول الأرشيف مع تحديد التصنيفات تلقائياً"""
+    templates = {}
+    for name, tables in read_archive_tables(archive_path, workers):
+        for cat, tmpls in classify_tables(tables).items():
+            templates.setdefault(cat, []).extend(tmpls)
+    return templates
+
+
+# ==================== فحص البيانات ====================
+
+# القواعد المسجلة: (الرمز، الخطورة، الدالة)
+# كل دالة تستقبل (النموذج، حالة التصنيف) وتعيد رسالة عند وجود مشكلة أو None،
+# أو (الرسالة، موضع النموذج المرتبط) كما في الرقم المكرر؛ state['index'] موضع النموذج الحالي
+LINT_RULES = []
+
+LATIN_PATTERN = re.compile(r'[A-Za-z]+')
+BRACKETS_PATTERN = re.compile(r'[()\[\]{}«»]')
+BRACKET_PAIRS = {')': '(', ']': '[', '}': '{', '»': '«'}
+
+
+def lint_rule(code, severity='error'):
+    """تسجيل قاعدة فحص جديدة"""
+    def register(check):
+        LINT_RULES.append((code, severity, check))
+        return check
+    return register
+
+
+@lint_rule('empty-content')
+def _check_empty_content(tmpl, state):
+    if len(tmpl.content) <= MIN_CONTENT_LENGTH:
+        return 'المحتوى فارغ أو قصير جداً'
+
+
+@lint_rule('empty-keyword', 'warning')
+def _check_empty_keyword(tmpl, state):
+    if not tmpl.keyword:
+        return 'الكلمة المفتاحية فارغة'
+
+
+@lint_rule('duplicate-num')
+def _check_duplicate_num(tmpl, state):
+    if not tmpl.num:
+        return None
+    seen = state.setdefault('nums', {})
+    if tmpl.num in seen:
+        return f'الرقم {tmpl.num} مكرر في التصنيف', seen[tmpl.num]
+    seen[tmpl.num] = state['index']
+
+
+@lint_rule('unbalanced-brackets')
+def _check_brackets(tmpl, state):
+    stack = []
+    for match in BRACKETS_PATTERN.finditer(tmpl.content):
+        ch = match.group()
+        if ch in BRACKET_PAIRS:
+            if not stack or stack.pop() != BRACKET_PAIRS[ch]:
+                return f'قوس "{ch}" بلا قوس افتتاح مطابق'
+        else:
+            stack.append(ch)
+    if stack:
+        return f'قوس "{stack[-1]}" غير مغلق'
+
+
+@lint_rule('latin-chars', 'warning')
+def _check_latin(tmpl, state):
+    match = LATIN_PATTERN.search(tmpl.content) or LATIN_PATTERN.search(tmpl.keyword)
+    if match:
+        return f'أحرف لاتينية: "{match.group()}"'
+
+
+def lint_templates(templates, categories=None):
+    """فحص النماذج في مرور واحد وإرجاع قائمة المشاكل
+    
+    categories: لتقييد الفحص بتصنيفات معينة (للفحص التزايدي بعد التعديل)
+    """
+    issues = []
+    for cat, tmpls in templates.items():
+        if categories is not None and cat not in categories:
+            continue
+        state = {}
+        for index, tmpl in enumerate(tmpls):
+            state['index'] = index
+            for code, severity, check in LINT_RULES:
+                message = check(tmpl, state)
+                if not message:
+                    continue
+                issue = {
+                    'category': cat,
+                    'index': index,
+                    'num': tmpl.num,
+                    'rule': code,
+                    'severity': severity,
+                }
+                if isinstance(message, tuple):
+                    message, issue['related'] = message
+                issue['message'] = message
+                issues.append(issue)
+    return issues
+
+
+def lint_summary(issues):
+    """ملخص نتيجة الفحص حسب الخطورة"""
+    counts = Counter(issue['severity'] for issue in issues)
+    return {'errors': counts['error'], 'warnings': counts['warning'], 'issues': issues}
+
+
+# ==================== التفقيط ====================
+
+# نفس جدول العملات في index.html، مع جنس الوحدة الفرعية ومثناها
+CURRENCIES = {
+    'SAR': {'singular': 'ريال سعودي', 'dual': 'ريالان سعوديان', 'plural': 'ريالات سعودية', 'subunit': 'هللة', 'subunit_dual': 'هللتان', 'subunit_plural': 'هللات', 'subunit_gender': 'f'},
+    'USD': {'singular': 'دولار أمريكي', 'dual': 'دولاران أمريكيان', 'plural': 'دولارات أمريكية', 'subunit': 'سنت', 'subunit_dual': 'سنتان', 'subunit_plural': 'سنتات', 'subunit_gender': 'm'},
+    'EUR': {'singular': 'يورو', 'dual': 'يورو', 'plural': 'يورو', 'subunit': 'سنت', 'subunit_dual': 'سنتان', 'subunit_plural': 'سنتات', 'subunit_gender': 'm'},
+    'GBP': {'singular': 'جنيه إسترليني', 'dual': 'جنيهان إسترلينيان', 'plural': 'جنيهات إسترلينية', 'subunit': 'بنس', 'subunit_dual': 'بنسان', 'subunit_plural': 'بنسات', 'subunit_gender': 'm'},
+    'AED': {'singular': 'درهم إماراتي', 'dual': 'درهمان إماراتيان', 'plural': 'دراهم إماراتية', 'subunit': 'فلس', 'subunit_dual': 'فلسان', 'subunit_plural': 'فلوس', 'subunit_gender': 'm'},
+    'KWD': {'singular': 'دينار كويتي', 'dual': 'ديناران كويتيان', 'plural': 'دنانير كويتية', 'subunit': 'فلس', 'subunit_dual': 'فلسان', 'subunit_plural': 'فلوس', 'subunit_gender': 'm'},
+    'QAR': {'singular': 'ريال قطري', 'dual': 'ريالان قطريان', 'plural': 'ريالات قطرية', 'subunit': 'درهم', 'subunit_dual': 'درهمان', 'subunit_plural': 'دراهم', 'subunit_gender': 'm'},
+    'BHD': {'singular': 'دينار بحريني', 'dual': 'ديناران بحرينيان', 'plural': 'دنانير بحرينية', 'subunit': 'فلس', 'subunit_dual': 'فلسان', 'subunit_plural': 'فلوس', 'subunit_gender': 'm'},
+    'OMR': {'singular': 'ريال عماني', 'dual': 'ريالان عمانيان', 'plural': 'ريالات عمانية', 'subunit': 'بيسة', 'subunit_dual': 'بيستان', 'subunit_plural': 'بيسات', 'subunit_gender': 'f'},
+    'EGP': {'singular': 'جنيه مصري', 'dual': 'جنيهان مصريان', 'plural': 'جنيهات مصرية', 'subunit': 'قرش', 'subunit_dual': 'قرشان', 'subunit_plural': 'قروش', 'subunit_gender': 'm'},
+    'JOD': {'singular': 'دينار أردني', 'dual': 'ديناران أردنيان', 'plural': 'دنانير أردنية', 'subunit': 'قرش', 'subunit_dual': 'قرشان', 'subunit_plural': 'قروش', 'subunit_gender': 'm'},
+    'NONE': None,
+}
+
+ONES = {
+    'm': ['', 'واحد', 'اثنان', 'ثلاثة', 'أربعة', 'خمسة', 'ستة', 'سبعة', 'ثمانية', 'تسعة', 'عشرة',
+          'أحد عشر', 'اثنا عشر', 'ثلاثة عشر', 'أربعة عشر', 'خمسة عشر', 'ستة عشر', 'سبعة عشر',
+          'ثمانية عشر', 'تسعة عشر'],
+    'f': ['', 'واحدة', 'اثنتان', 'ثلاث', 'أربع', 'خمس', 'ست', 'سبع', 'ثماني', 'تسع', 'عشر',
+          'إحدى عشرة', 'اثنتا عشرة', 'ثلاث عشرة', 'أربع عشرة', 'خمس عشرة', 'ست عشرة', 'سبع عشرة',
+          'ثماني عشرة', 'تسع عشرة'],
+}
+TENS = ['', '', 'عشرون', 'ثلاثون', 'أربعون', 'خمسون', 'ستون', 'سبعون', 'ثمانون', 'تسعون']
+HUNDREDS = ['', 'مائة', 'مائتان', 'ثلاثمائة', 'أربعمائة', 'خمسمائة', 'ستمائة', 'سبعمائة', 'ثمانمائة', 'تسعمائة']
+
+# (القيمة، المفرد، المثنى، الجمع) من الأكبر للأصغر
+SCALES = (
+    (10 ** 9, 'مليار', 'ملياران', 'مليارات'),
+    (10 ** 6, 'مليون', 'مليونان', 'ملايين'),
+    (10 ** 3, 'ألف', 'ألفان', 'آلاف'),
+)
+
+
+@lru_cache(maxsize=None)
+def tafqit_table(style='مائة', gender='m'):
+    """كتابة الأعداد 0-999 محسوبة مرة واحدة لكل صيغة وجنس"""
+    ones = ONES[gender]
+    table = ['']
+    for n in range(1, 1000):
+        parts = []
+        h, rest = divmod(n, 100)
+        if h:
+            word = HUNDREDS[h]
+            parts.append(word.replace('مائة', 'مئة') if style == 'مئة' else word)
+        if rest >= 20:
+            t, o = divmod(rest, 10)
+            # المعطوف المؤنث على العشرات: إحدى وعشرون
+            unit = 'إحدى' if gender == 'f' and o == 1 else ones[o]
+            parts.append(f'{unit} و{TENS[t]}' if o else TENS[t])
+        elif rest:
+            parts.append(ones[rest])
+        table.append(' و'.join(parts))
+    return tuple(table)
+
+
+@lru_cache(maxsize=None)
+def _scale_table(style, scale_index):
+    """عبارات المراتب الجاهزة: ثلاثة آلاف، مليونان، خمسة عشر مليار ..."""
+    _, singular, dual, plural = SCALES[scale_index]
+    words = tafqit_table(style, 'm')
+    table = ['', singular, dual]
+    for count in range(3, 1000):
+        table.append(f'{words[count]} {plural if count <= 10 else singular}')
+    return tuple(table)
+
+
+def number_to_words(num, style='مائة', gender='m'):
+    """كتابة عدد صحيح بالحروف بتجميع عبارات المراتب من الجداول الجاهزة"""
+    if num == 0:
+        return 'صفر'
+    if num < 0:
+        return 'سالب ' + number_to_words(-num, style, gender)
+    
+    parts = []
+    for index, (value, singular, _, _) in enumerate(SCALES):
+        if num >= value:
+            count, num = divmod(num, value)
+            if count < 1000:
+                parts.append(_scale_table(style, index)[count])
+            else:
+                # أكثر من 999 مليار: تُكتب الكمية نفسها بالحروف كما يفعل الموقع
+                parts.append(f'{number_to_words(count, style)} {singular}')
+    if num:
+        parts.append(tafqit_table(style, gender)[num])
+    return ' و'.join(parts)
+
+
+def _counted(count, words, singular, dual, plural):
+    """إلحاق المعدود بالعدد: واحد/اثنان/3-10/غيرها"""
+    if count == 2:
+        return dual
+    if 3 <= count <= 10:
+        return f'{words} {plural}'
+    return f'{words} {singular}'
+
+
+def tafqit(amount, currency='SAR', style='مائة'):
+    """كتابة مبلغ بالحروف مع العملة كما في أداة التفقيط بالموقع"""
+    from decimal import Decimal, ROUND_HALF_UP
+    
+    value = Decimal(str(amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    if value < 0:
+        raise ValueError('المبلغ يجب ألا يكون سالباً')
+    int_part = int(value)
+    dec_part = int((value - int_part) * 100)
+    
+    words = number_to_words(int_part, style)
+    curr = CURRENCIES[currency]
+    if curr is None:
+        return words
+    
+    result = _counted(int_part, words, curr['singular'], curr['dual'], curr['plural'])
+    if dec_part:
+        sub_words = number_to_words(dec_part, style, curr['subunit_gender'])
+        result += ' و' + _counted(dec_part, sub_words, curr['subunit'], curr['subunit_dual'], curr['subunit_plural'])
+    return result + ' فقط لا غير'
+
+
+def tafqit_batch(amounts, currency='SAR', style='مائة'):
+    """تفقيط مجموعة مبالغ دفعة واحدة؛ المبالغ المكررة تُحسب مرة واحدة"""
+    cache = {}
+    results = []
+    for amount in amounts:
+        text = cache.get(amount)
+        if text is None:
+            text = cache[amount] = tafqit(amount, currency, style)
+        results.append(text)
+    return results
+
+
+# ==================== توليد المستندات ====================
+
+W_NAMESPACE = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    '</Relationships>'
+)
+DOCX_DOCUMENT_START = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document xmlns:w="{W_NAMESPACE}"><w:body>'
+DOCX_DOCUMENT_END = '<w:sectPr><w:bidi/></w:sectPr></w:body></w:document>'
+
+# محارف غير مسموحة في XML 1.0 (قد تأتي من النسخ واللصق)
+XML_INVALID_PATTERN = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+BODY_START_PATTERN = re.compile(rb'<w:body[^>]*>')
+FILE_NAME_INVALID_PATTERN = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+def xml_text(text):
+    """تهريب النص لإدراجه داخل <w:t>"""
+    from xml.sax.saxutils import escape
+    return escape(XML_INVALID_PATTERN.sub('', text))
+
+
+def docx_paragraphs(text):
+    """فقرات عربية (من اليمين لليسار) لكل سطر من النص"""
+    return ''.join(
+        '<w:p><w:pPr><w:bidi/><w:jc w:val="both"/></w:pPr>'
+        f'<w:r><w:rPr><w:rtl/></w:rPr><w:t xml:space="preserve">{xml_text(line)}</w:t></w:r></w:p>'
+        for line in text.split('\n')
+    )
+
+
+def load_docx_base(base_path=None):
+    """تجهيز المستند الأساسي مرة واحدة: (الأجزاء الثابتة، بداية document.xml، نهايته)
+    
+    يُدرج النص المولَّد في آخر متن المستند الأساسي قبل إعدادات الصفحة،
+    فتبقى الترويسة والأنماط والنصوص الثابتة كما هي.
+    """
+    if base_path is None:
+        parts = {'[Content_Types].xml': DOCX_CONTENT_TYPES.encode('utf-8'), '_rels/.rels': DOCX_RELS.encode('utf-8')}
+        return parts, DOCX_DOCUMENT_START.encode('utf-8'), DOCX_DOCUMENT_END.encode('utf-8')
+    
+    with zipfile.ZipFile(base_path) as zf:
+        parts = {name: zf.read(name) for name in zf.namelist() if name != 'word/document.xml'}
+        document = zf.read('word/document.xml')
+    split = document.rfind(b'<w:sectPr')
+    if split < 0:
+        split = document.rfind(b'</w:body>')
+    if split < 0 or not BODY_START_PATTERN.search(document):
+        raise ValueError(f'المستند الأساسي غير صالح: {base_path}')
+    return parts, document[:split], document[split:]
+
+
+def compile_fill_plan(content):
+    """تحويل محتوى النموذج إلى خطة تعبئة: نصوص ثابتة وخانات مسماة
+    
+    كل عنصر نائب يأخذ اسماً بنوعه وترتيبه (dots1، dots2، zeros1، date1، judge1)،
+    ويمكن تعبئة كل عناصر النوع معاً بالاسم العام (dots، zeros، date، judge).
+    """
+    plan = []
+    seen = Counter()
+    pos = 0
+    for match in PLACEHOLDER_PATTERN.finditer(content):
+        kind = match.lastgroup
+        seen[kind] += 1
+        if match.start() > pos:
+            plan.append(content[pos:match.start()])
+        plan.append((f'{kind}{seen[kind]}', kind, match.group()))
+        pos = match.end()
+    if pos < len(content):
+        plan.append(content[pos:])
+    return tuple(plan)
+
+
+def fill_fields(plan):
+    """أسماء الخانات في خطة التعبئة بترتيب ظهورها"""
+    return [piece[0] for piece in plan if isinstance(piece, tuple)]
+
+
+_tafqit_cached = lru_cache(maxsize=65536)(tafqit)
+
+
+def fill_template(plan, record, spell_amounts=False, missing=None):
+    """تعبئة خطة النموذج من سجل واحد؛ الخانات الناقصة تبقى كما هي وتُحصى في missing"""
+    out = []
+    for piece in plan:
+        if piece.__class__ is str:
+            out.append(piece)
+            continue
+        key, kind, original = piece
+        value = record.get(key)
+        if value is None or value == '':
+            value = record.get(kind)
+        if value is None or value == '':
+            if missing is not None:
+                missing[key] += 1
+            out.append(original)
+            continue
+        value = str(value)
+        if spell_amounts and kind == 'zeros':
+            try:
+                value = f'{value} ({_tafqit_cached(value.replace(",", ""))})'
+            except (ArithmeticError, ValueError):
+                pass
+        out.append(value)
+    return ''.join(out)
+
+
+def _iter_json_array(f, chunk_size=1 << 16):
+    """قراءة عناصر مصفوفة JSON واحداً تلو الآخر دون تحميل الملف كاملاً"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if not started and buffer:
+            if buffer[0] != '[':
+                raise ValueError('ملف JSON يجب أن يكون مصفوفة سجلات')
+            buffer = buffer[1:]
+            started = True
+            continue
+        if started and buffer[:1] == ',':
+            buffer = buffer[1:]
+            continue
+        if started and buffer[:1] == ']':
             return
-        
-        category = current_cat.text()
-        
-        reply = QMessageBox.question(
-            self, 'تأكيد الحذف',
-            'هل تريد حذف هذا النموذج؟',
-            QMessageBox.Yes | QMessageBox.No
-        )
-        
-        if reply == QMessageBox.Yes:
-            if category in self.templates:
-                del self.templates[category][current_tmpl]
-                self.update_templates_list()
-                self.clear_editor()
-                self.update_status()
-    
-    def save_current_template(self):
-        """حفظ التعديلات على النموذج الحالي"""
-        current_cat = self.categories_list.currentItem()
-        current_idx = self.templates_list.currentRow()
-        
-        if not current_cat or current_idx < 0:
-            QMessageBox.warning(self, 'تنبيه', 'اختر نموذجاً أولاً')
+        if started and buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield item
+                buffer = buffer[end:]
+                continue
+        if eof:
+            if started:
+                raise ValueError('ملف JSON غير مكتمل')
             return
-        
-        category = current_cat.text()
-        
-        if category in self.templates and current_idx < len(self.templates[category]):
-            tmpl = self.templates[category][current_idx]
-            tmpl.num = self.txt_num.text().strip()
-            tmpl.keyword = self.txt_keyword.text().strip()
-            tmpl.content = self.txt_content.toPlainText().strip()
-            
-            self.update_templates_list()
-            self.templates_list.setCurrentRow(current_idx)
-            self.update_status()
-            self.status_bar.showMessage('تم حفظ التعديلات', 3000)
-    
-    def clear_editor(self):
-        """مسح حقول التحرير"""
-        self.txt_num.clear()
-        self.txt_keyword.clear()
-        self.txt_content.clear()
-    
-    def show_template_context_menu(self, pos):
-        """قائمة السياق للنماذج"""
-        menu = QMenu(self)
-        
-        action_copy = menu.addAction('📋 نسخ المحتوى')
-        action_copy.triggered.connect(self.copy_template_content)
-        
-        action_delete = menu.addAction('🗑️ حذف')
-        action_delete.triggered.connect(self.delete_template)
-        
-        menu.exec_(self.templates_list.mapToGlobal(pos))
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+
+def iter_records(file_path):
+    """قراءة سجلات القضايا تدفقياً من CSV أو JSON Lines أو مصفوفة JSON"""
+    lower = file_path.lower()
+    if lower.endswith('.csv'):
+        import csv
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            yield from csv.DictReader(f)
+    elif lower.endswith(('.jsonl', '.ndjson')):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            yield from _iter_json_array(f)
+
+
+def find_template(templates, selector, category=None):
+    """البحث عن نموذج برقمه أو كلمته المفتاحية، اختيارياً داخل تصنيف محدد"""
+    cats = [category] if category else list(templates)
+    for cat in cats:
+        for tmpl in templates.get(cat, []):
+            if selector in (tmpl.num, tmpl.keyword):
+                return tmpl
+    where = f' في تصنيف {category}' if category else ''
+    raise KeyError(f'لا يوجد نموذج بالرقم أو الكلمة "{selector}"{where}')
+
+
+# مهمة التوليد في كل عملية عاملة: (الخطة، المستند الأساسي، المجلد، الصيغة، الخيارات)
+_FILL_JOB = None
+
+
+def _init_fill_job(plan, base, out_dir, fmt, spell_amounts):
+    global _FILL_JOB
+    _FILL_JOB = (plan, base, out_dir, fmt, spell_amounts)
+
+
+def _document_name(index, record, name_field):
+    name = str(record.get(name_field) or '') if name_field else ''
+    name = FILE_NAME_INVALID_PATTERN.sub('_', name).strip('._')
+    return name or f'{index:06d}'
+
+
+def _fill_chunk(chunk):
+    """تعبئة دفعة من السجلات وكتابتها؛ يعيد (العدد، الخانات الناقصة)"""
+    plan, base, out_dir, fmt, spell_amounts = _FILL_JOB
+    missing = Counter()
+    for name, record in chunk:
+        text = fill_template(plan, record, spell_amounts, missing)
+        path = os.path.join(out_dir, f'{name}.{fmt}')
+        if fmt == 'txt':
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            continue
+        parts, start, end = base
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for part_name, data in parts.items():
+                zf.writestr(part_name, data)
+            zf.writestr('word/document.xml', start + docx_paragraphs(text).encode('utf-8') + end)
+    return len(chunk), missing
+
+
+def generate_documents(template, records, out_dir, fmt='docx', base_docx=None, workers=None,
+                       name_field=None, spell_amounts=False, chunk_size=200):
+    """توليد مستند لكل سجل من نموذج واحد
     
-    def copy_template_content(self):
-        """نسخ محتوى النموذج"""
-        content = self.txt_content.toPlainText()
-        if content:
-            QApplication.clipboard().setText(content)
-            self.status_bar.showMessage('تم النسخ للحافظة', 3000)
+    السجلات تُقرأ تدفقياً وتوزع دفعات على عمليات عاملة، ولا يتجاوز عدد
+    الدفعات المعلقة ضعف عدد العمليات، فتبقى الذاكرة ثابتة مهما كبر الملف.
+    الأسماء تُحدد هنا لا في العمليات حتى لا يكتب سجلان بنفس قيمة name_field
+    على ملف واحد: الاسم المكرر يُلحق به رقم السجل ويُحصى في renamed.
+    """
+    if fmt not in ('docx', 'txt'):
+        raise ValueError(f'صيغة غير مدعومة: {fmt}')
+    os.makedirs(out_dir, exist_ok=True)
+    plan = compile_fill_plan(template.content)
+    base = load_docx_base(base_docx) if fmt == 'docx' else None
+    job = (plan, base, out_dir, fmt, spell_amounts)
+    # أسماء الملفات المستخدمة (بلا تمييز لحالة الأحرف كما في ويندوز)
+    used = set()
+    renamed = 0
     
-    # ==================== وظائف المعاينة والتصدير ====================
+    def chunks():
+        nonlocal renamed
+        chunk = []
+        for index, record in enumerate(records, 1):
+            name = _document_name(index, record, name_field)
+            if name_field:
+                unique = name
+                while unique.casefold() in used:
+                    unique = f'{name}_{index:06d}' if unique == name else f'{unique}_'
+                renamed += unique != name
+                name = unique
+                used.add(name.casefold())
+            chunk.append((name, record))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
     
-    def update_preview(self):
-        """تحديث المعاينة"""
-        format_type = self.cmb_format.currentIndex()
-        
-        # حساب الإحصائيات
-        total = sum(len(tmpls) for tmpls in self.templates.values())
-        non_empty_cats = sum(1 for tmpls in self.templates.values() if tmpls)
-        
-        self.lbl_total_templates.setText(f'إجمالي النماذج: {total}')
-        self.lbl_total_categories.setText(f'التصنيفات: {non_empty_cats}')
-        
-        # إنشاء الكود
-        if format_type == 0:  # JavaScript
-            code = self.generate_js_code()
-        else:  # JSON
-            code = self.generate_json_code()
-        
-        self.preview_text.setPlainText(code)
-    
-    def generate_js_code(self, minify=False):
-        """إنشاء كود JavaScript"""
-        data = {}
-        for cat, tmpls in self.templates.items():
-            if tmpls:
-                data[cat] = [t.to_dict() for t in tmpls]
-        
-        if minify:
-            json_str = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    total = 0
+    missing = Counter()
+    started = time.perf_counter()
+    with INSTRUMENTS.stage('generate'):
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1:
+            _init_fill_job(*job)
+            for chunk in chunks():
+                count, chunk_missing = _fill_chunk(chunk)
+                total += count
+                missing.update(chunk_missing)
         else:
-            json_str = json.dumps(data, ensure_ascii=False, indent=4)
-        
-        return f"const templatesData = {json_str};"
-    
-    def generate_json_code(self, minify=False):
-        """إنشاء كود JSON"""
-        data = {}
-        for cat, tmpls in self.templates.items():
-            if tmpls:
-                data[cat] = [t.to_dict() for t in tmpls]
-        
-        if minify:
-            return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
-        else:
-            return json.dumps(data, ensure_ascii=False, indent=4)
+            from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+            with ProcessPoolExecutor(workers, initializer=_init_fill_job, initargs=job) as pool:
+                pending = set()
+                for chunk in chunks():
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            count, chunk_missing = future.result()
+                            total += count
+                            missing.update(chunk_missing)
+                    pending.add(pool.submit(_fill_chunk, chunk))
+                for future in pending:
+                    count, chunk_missing = future.result()
+                    total += count
+                    missing.update(chunk_missing)
     
-    def copy_to_clipboard(self):
-        """نسخ للحافظة"""
-        format_type = self.cmb_format.currentIndex() if hasattr(self, 'cmb_format') else 0
-        minify = self.chk_minify.isChecked() if hasattr(self, 'chk_minify') else False
-        
-        if format_type == 0:
-            code = self.generate_js_code(minify)
+    elapsed = time.perf_counter() - started
+    return {
+        'documents': total,
+        'seconds': round(elapsed, 3),
+        'per_minute': round(total / elapsed * 60) if elapsed else None,
+        'fields': fill_fields(plan),
+        'missing': dict(missing),
+        'renamed': renamed,
+    }
+
+
+# ==================== التصدير إلى وورد ====================
+
+# جدول بحدود واتجاه من اليمين لليسار، بعرض ثابت للأعمدة: الرقم، الكلمة، النص
+WORD_TABLE_START = (
+    '<w:tbl><w:tblPr><w:bidiVisual/><w:tblW w:w="5000" w:type="pct"/><w:tblBorders>'
+    + ''.join(f'<w:{side} w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+              for side in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV'))
+    + '</w:tblBorders><w:tblLayout w:type="fixed"/></w:tblPr>'
+    '<w:tblGrid><w:gridCol w:w="900"/><w:gridCol w:w="1800"/><w:gridCol w:w="7000"/></w:tblGrid>'
+)
+WORD_TABLE_END = '</w:tbl><w:p/>'
+WORD_TABLE_HEADERS = ('الرقم', 'الكلمة المفتاحية')
+
+
+def _word_cell(text):
+    """خلية بفقرة لكل سطر حتى يعيدها cell.text بنفس الأسطر عند الاستيراد"""
+    return '<w:tc>' + docx_paragraphs(text) + '</w:tc>'
+
+
+def table_header(category):
+    """عنوان الجدول الذي يتعرف عليه detect_category، مع تنبيه للتصنيفات غير المعروفة"""
+    header = category if category.startswith('صندوق') else f'صندوق {category}'
+    return header, detect_category([[header]], default=None) == category
+
+
+def render_word_tables(templates):
+    """بناء document.xml بجدول لكل تصنيف بنفس تخطيط الاستيراد (رقم، كلمة، نص)"""
+    parts = [DOCX_DOCUMENT_START]
+    append = parts.append
+    for cat, tmpls in templates.items():
+        if not tmpls:
+            continue
+        header, _ = table_header(cat)
+        append(WORD_TABLE_START)
+        append('<w:tr>' + _word_cell(header) + _word_cell(WORD_TABLE_HEADERS[0]) + _word_cell(WORD_TABLE_HEADERS[1]) + '</w:tr>')
+        for t in tmpls:
+            append('<w:tr>' + _word_cell(t.num) + _word_cell(t.keyword) + _word_cell(t.content) + '</w:tr>')
+        append(WORD_TABLE_END)
+    append(DOCX_DOCUMENT_END)
+    return ''.join(parts)
+
+
+def export_word_tables(templates, file_path):
+    """كتابة النماذج في ملف وورد يعاد استيراده كما هو عبر classify_tables
+    
+    يعيد تقريراً بعدد الجداول والنماذج، والتصنيفات التي لن يُتعرف عليها عند
+    الاستيراد، والنماذج التي سيتخطاها الاستيراد لقصر محتواها.
+    """
+    report = {'tables': 0, 'templates': 0, 'unrecognized': [], 'too_short': 0}
+    for cat, tmpls in templates.items():
+        if not tmpls:
+            continue
+        report['tables'] += 1
+        report['templates'] += len(tmpls)
+        if not table_header(cat)[1]:
+            report['unrecognized'].append(cat)
+        report['too_short'] += sum(1 for t in tmpls if len(t.content.strip()) <= MIN_CONTENT_LENGTH)
+    
+    with INSTRUMENTS.stage('word_export'):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('[Content_Types].xml', DOCX_CONTENT_TYPES)
+            zf.writestr('_rels/.rels', DOCX_RELS)
+            zf.writestr('word/document.xml', render_word_tables(templates))
+    atomic_write(file_path, buffer.getvalue())
+    return report
+
+
+# ==================== سجل التعديلات ====================
+
+# نسخة كاملة كل عدد من المراجعات، وبينها فروق فقط
+SNAPSHOT_INTERVAL = 10
+# الكلمات والمسافات بينها: الفروق على مستوى الكلمة أصغر وأوضح من الحروف
+DIFF_TOKEN_PATTERN = re.compile(r'\s+|[^\s]+')
+
+
+def make_delta(old, new):
+    """الفرق بين نصين كقائمة [البداية، النهاية، النص البديل] بمواضع النص القديم"""
+    from difflib import SequenceMatcher
+    a = DIFF_TOKEN_PATTERN.findall(old)
+    b = DIFF_TOKEN_PATTERN.findall(new)
+    offsets = [0]
+    for token in a:
+        offsets.append(offsets[-1] + len(token))
+    return [
+        [offsets[i1], offsets[i2], ''.join(b[j1:j2])]
+        for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+        if tag != 'equal'
+    ]
+
+
+def apply_delta(old, delta):
+    out = []
+    pos = 0
+    for start, end, text in delta:
+        out.append(old[pos:start])
+        out.append(text)
+        pos = end
+    out.append(old[pos:])
+    return ''.join(out)
+
+
+def normalize_when(when):
+    """تحويل التاريخ إلى نص ISO قابل للمقارنة؛ التاريخ وحده يعني نهاية ذلك اليوم"""
+    when = when if isinstance(when, str) else when.isoformat(timespec='seconds')
+    return when + 'T23:59:59' if len(when) == 10 else when
+
+
+class TemplateHistory:
+    """مراجعات محتوى نموذج واحد: أول مراجعة والمراجعة كل SNAPSHOT_INTERVAL نسخة كاملة
+    
+    المراجعة الأولى بوقت فارغ تمثل المحتوى قبل بدء السجل.
+    """
+    
+    def __init__(self, revisions=None):
+        self.revisions = revisions or []
+        self.times = [r['time'] for r in self.revisions]
+    
+    def __len__(self):
+        return len(self.revisions)
+    
+    def record(self, old, new, when=None):
+        """تسجيل تعديل من old إلى new؛ لا شيء إن لم يتغير المحتوى"""
+        if old == new:
+            return False
+        if not self.revisions:
+            self._append({'time': '', 'snapshot': old})
+        when = normalize_when(when) if when else time.strftime('%Y-%m-%dT%H:%M:%S')
+        if len(self.revisions) % SNAPSHOT_INTERVAL == 0:
+            self._append({'time': when, 'snapshot': new})
         else:
-            code = self.generate_json_code(minify)
-        
-        QApplication.clipboard().setText(code)
-        self.status_bar.showMessage('تم النسخ للحافظة ✓', 3000)
-        QMessageBox.information(self, 'تم', 'تم نسخ الكود للحافظة بنجاح')
-    
-    def export_to_file(self):
-        """تصدير كملف"""
-        format_idx = self.cmb_export_format.currentIndex()
-        minify = self.chk_minify.isChecked()
-        
-        if format_idx == 0:  # JavaScript
-            ext = 'js'
-            code = self.generate_js_code(minify)
-        else:  # JSON
-            ext = 'json'
-            code = self.generate_json_code(minify)
-        
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, 'حفظ الملف', f'templatesData.{ext}',
-            f'{ext.upper()} Files (*.{ext});;All Files (*)'
-        )
-        
-        if file_path:
-            try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(code)
-                QMessageBox.information(self, 'تم', f'تم حفظ الملف:\n{file_path}')
-            except Exception as e:
-                QMessageBox.critical(self, 'خطأ', f'فشل في الحفظ:\n{str(e)}')
+            self._append({'time': when, 'delta': make_delta(old, new)})
+        return True
     
-    # ==================== حفظ/تحميل المشروع ====================
+    def _append(self, revision):
+        self.revisions.append(revision)
+        self.times.append(revision['time'])
     
-    def save_project(self):
-        """حفظ المشروع"""
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, 'حفظ المشروع', 'templates_project.json',
-            'JSON Files (*.json);;All Files (*)'
-        )
-        
-        if file_path:
-            try:
-                data = {
-                    'version': '1.0',
-                    'templates': {cat: [t.to_dict() for t in tmpls] for cat, tmpls in self.templates.items()}
-                }
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                self.status_bar.showMessage('تم حفظ المشروع', 3000)
-            except Exception as e:
-                QMessageBox.critical(self, 'خطأ', f'فشل في الحفظ:\n{str(e)}')
+    def pop(self):
+        """حذف آخر مراجعة (عند التراجع عن التعديل)"""
+        self.revisions.pop()
+        self.times.pop()
+        if len(self.revisions) == 1:
+            self.revisions.clear()
+            self.times.clear()
     
-    def load_project(self):
-        """تحميل مشروع"""
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, 'تحميل مشروع', '', 'JSON Files (*.json);;All Files (*)'
-        )
-        
-        if file_path:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                self.templates = {}
-                for cat, tmpls in data.get('templates', {}).items():
-                    self.templates[cat] = [
-                        Template(t.get('num', ''), t.get('keyword', ''), t.get('content', ''), cat)
-                        for t in tmpls
-                    ]
-                
-                # تحديث القوائم
-                self.categories_list.clear()
-                self.categories_list.addItems(list(self.templates.keys()))
-                
-                self.cmb_import_category.clear()
-                self.cmb_import_category.addItems(list(self.templates.keys()))
+    def content_at_revision(self, index):
+        """بناء المحتوى من أقرب نسخة كاملة سابقة وتطبيق الفروق بعدها فقط"""
+        base = index - index % SNAPSHOT_INTERVAL
+        content = self.revisions[base]['snapshot']
+        for revision in self.revisions[base + 1:index + 1]:
+            content = apply_delta(content, revision['delta'])
+        return content
+    
+    def content_as_of(self, when):
+        """المحتوى كما كان في تاريخ معين، أو None إن لم يوجد سجل حتى ذلك الوقت"""
+        if not self.revisions:
+            return None
+        index = bisect.bisect_right(self.times, normalize_when(when)) - 1
+        return self.content_at_revision(max(index, 0))
+    
+    def to_list(self):
+        return self.revisions
+
+
+# ==================== التراجع والإعادة ====================
+
+UNDO_LIMIT = 200
+
+
+class Command:
+    """أمر قابل للتراجع على مخزن النماذج؛ يحفظ ما يغيّره فقط"""
+    label = ''
+    
+    def apply(self, templates):
+        raise NotImplementedError
+    
+    def revert(self, templates):
+        raise NotImplementedError
+
+
+class EditTemplate(Command):
+    """تعديل حقول نموذج واحد"""
+    label = 'تعديل نموذج'
+    
+    def __init__(self, category, index, num, keyword, content):
+        self.category = category
+        self.index = index
+        self.values = (num, keyword, content)
+        self.previous = None
+        self.recorded = False
+    
+    def apply(self, templates):
+        tmpl = templates[self.category][self.index]
+        self.previous = (tmpl.num, tmpl.keyword, tmpl.content)
+        if tmpl.history is None:
+            tmpl.history = TemplateHistory()
+        self.recorded = tmpl.history.record(tmpl.content, self.values[2])
+        tmpl.num, tmpl.keyword, tmpl.content = self.values
+    
+    def revert(self, templates):
+        tmpl = templates[self.category][self.index]
+        tmpl.num, tmpl.keyword, tmpl.content = self.previous
+        if self.recorded:
+            tmpl.history.pop()
+
+
+class AddTemplate(Command):
+    """إضافة نموذج في آخر التصنيف"""
+    label = 'إضافة نموذج'
+    
+    def __init__(self, category, template):
+        self.category = category
+        self.template = template
+    
+    def apply(self, templates):
+        templates[self.category].append(self.template)
+    
+    def revert(self, templates):
+        templates[self.category].pop()
+
+
+class DeleteTemplate(Command):
+    """حذف نموذج مع حفظه لإعادته في موضعه"""
+    label = 'حذف نموذج'
+    
+    def __init__(self, category, index):
+        self.category = category
+        self.index = index
+        self.template = None
+    
+    def apply(self, templates):
+        self.template = templates[self.category].pop(self.index)
+    
+    def revert(self, templates):
+        templates[self.category].insert(self.index, self.template)
+
+
+class ImportTemplates(Command):
+    """استيراد دفعة نماذج: التراجع يقص ما أضيف في آخر كل تصنيف دون نسخ الباقي"""
+    label = 'استيراد'
+    
+    def __init__(self, additions):
+        self.additions = {cat: tmpls for cat, tmpls in additions.items() if tmpls}
+        self.lengths = {}
+    
+    @property
+    def count(self):
+        return sum(len(tmpls) for tmpls in self.additions.values())
+    
+    def apply(self, templates):
+        for cat, tmpls in self.additions.items():
+            self.lengths[cat] = len(templates[cat]) if cat in templates else None
+            templates.setdefault(cat, []).extend(tmpls)
+    
+    def revert(self, templates):
+        for cat in reversed(list(self.additions)):
+            length = self.lengths[cat]
+            if length is None:
+                del templates[cat]
+            else:
+                del templates[cat][length:]
+
+
+class AddCategory(Command):
+    label = 'إضافة تصنيف'
+    
+    def __init__(self, name):
+        self.name = name
+    
+    def apply(self, templates):
+        templates[self.name] = []
+    
+    def revert(self, templates):
+        del templates[self.name]
+
+
+class DeleteCategory(Command):
+    """حذف تصنيف بنماذجه؛ القائمة نفسها تُحفظ وتعاد في موضعها"""
+    label = 'حذف تصنيف'
+    
+    def __init__(self, name):
+        self.name = name
+        self.position = None
+        self.templates = None
+    
+    def apply(self, templates):
+        self.position = list(templates).index(self.name)
+        self.templates = templates.pop(self.name)
+    
+    def revert(self, templates):
+        # القاموس يحفظ الترتيب، فنعيد بناء ما بعد الموضع فقط (عدد التصنيفات صغير)
+        tail = [(cat, templates.pop(cat)) for cat in list(templates)[self.position:]]
+        templates[self.name] = self.templates
+        templates.update(tail)
+
+
+class ReplaceTemplates(Command):
+    """استبدال محتوى المخزن كاملاً (مثل ناتج الدمج) مع الاحتفاظ بالسابق"""
+    label = 'دمج مشاريع'
+    
+    def __init__(self, templates):
+        self.templates = templates
+        self.previous = None
+    
+    def apply(self, templates):
+        self.previous = dict(templates)
+        templates.clear()
+        templates.update(self.templates)
+    
+    def revert(self, templates):
+        templates.clear()
+        templates.update(self.previous)
+
+
+class UndoStack:
+    """سجل الأوامر على مخزن نماذج واحد بحد أقصى للخطوات المحفوظة"""
+    
+    def __init__(self, templates, limit=UNDO_LIMIT):
+        self.templates = templates
+        self.done = deque(maxlen=limit)
+        self.undone = []
+    
+    def push(self, command):
+        """تنفيذ الأمر وتسجيله؛ أي أمر جديد يلغي ما يمكن إعادته"""
+        command.apply(self.templates)
+        self.done.append(command)
+        self.undone.clear()
+        return command
+    
+    def undo(self):
+        if not self.done:
+            return None
+        command = self.done.pop()
+        command.revert(self.templates)
+        self.undone.append(command)
+        return command
+    
+    def redo(self):
+        if not self.undone:
+            return None
+        command = self.undone.pop()
+        command.apply(self.templates)
+        self.done.append(command)
+        return command
+    
+    def can_undo(self):
+        return bool(self.done)
+    
+    def can_redo(self):
+        return bool(self.undone)
+    
+    def clear(self):
+        self.done.clear()
+        self.undone.clear()
+
+
+# ==================== دمج المشاريع ====================
+
+MERGE_POLICIES = ('keep-newest', 'keep-both', 'manual')
+
+
+def content_hash(content):
+    import hashlib
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def merge_projects(sources, policy='keep-newest', base=None):
+    """دمج ملفات مشاريع بالمفتاح (التصنيف، الرقم، الكلمة المفتاحية)
+    
+    المفتاح قد يتكرر داخل المشروع الواحد، فتُطابق تكراراته بالترتيب كما في diff_templates:
+    التكرار الثاني في ملف يقابل التكرار الثاني في غيره، ولا تعارض داخل المصدر الواحد.
+    تُقرأ الملفات واحداً تلو الآخر ولا يبقى في الذاكرة إلا الناتج وفهرسه،
+    والتعارض هو اختلاف بصمة المحتوى لنفس المفتاح:
+    - keep-newest: النسخة من الملف الأحدث تعديلاً (ثم الأخير في الترتيب)
+    - keep-both: تبقى كل النسخ المختلفة وتُميَّز الكلمة المفتاحية باسم الفرع
+    - manual: تبقى النسخة الأولى ويُترك القرار لتقرير التعارضات
+    
+    يعيد (النماذج، التقرير).
+    """
+    if policy not in MERGE_POLICIES:
+        raise ValueError(f'سياسة دمج غير معروفة: {policy}')
+    
+    merged = {}
+    # المفتاح → [موضعه في التصنيف، البصمة، المصدر، وقت التعديل]
+    index = {}
+    # المفتاح → بصمات النسخ المحفوظة (keep-both)
+    kept = {}
+    conflicts = {}
+    report = {'policy': policy, 'sources': [], 'duplicates': 0}
+    
+    def add(source, mtime, templates):
+        count = 0
+        occurrences = Counter()
+        for cat, tmpls in templates.items():
+            target = merged.setdefault(cat, [])
+            for tmpl in tmpls:
+                count += 1
+                digest = content_hash(tmpl.content)
+                # النماذج بلا رقم ولا كلمة لا يجمعها إلا تطابق المحتوى
+                key = (cat, tmpl.num, tmpl.keyword) if (tmpl.num or tmpl.keyword) else (cat, digest)
+                occurrences[key] += 1
+                key += (occurrences[key],)
+                entry = index.get(key)
+                if entry is None:
+                    index[key] = [len(target), digest, source, mtime]
+                    target.append(tmpl)
+                    continue
+                if digest == entry[1] or (policy == 'keep-both' and digest in kept.get(key, ())):
+                    report['duplicates'] += 1
+                    continue
                 
-                self.update_status()
-                self.status_bar.showMessage('تم تحميل المشروع', 3000)
+                conflict = conflicts.get(key)
+                if conflict is None:
+                    first = target[entry[0]]
+                    conflict = conflicts[key] = {
+                        'category': cat, 'num': tmpl.num, 'keyword': tmpl.keyword,
+                        'variants': [{'source': entry[2], 'hash': entry[1], 'content': first.content}],
+                    }
+                conflict['variants'].append({'source': source, 'hash': digest, 'content': tmpl.content})
                 
-            except Exception as e:
-                QMessageBox.critical(self, 'خطأ', f'فشل في التحميل:\n{str(e)}')
+                if policy == 'keep-newest':
+                    if mtime >= entry[3]:
+                        target[entry[0]] = tmpl
+                        entry[1:] = [digest, source, mtime]
+                    conflict['kept'] = entry[2]
+                elif policy == 'keep-both':
+                    kept.setdefault(key, {entry[1]}).add(digest)
+                    branch = os.path.splitext(os.path.basename(source))[0]
+                    target.append(Template(tmpl.num, f'{tmpl.keyword} ({branch})', tmpl.content, cat))
+                else:
+                    conflict['kept'] = entry[2]
+        report['sources'].append({'source': source, 'templates': count})
+    
+    with INSTRUMENTS.stage('merge'):
+        if base is not None:
+            add('الحالي', float('-inf'), base)
+        for path in sources:
+            add(path, os.path.getmtime(path), read_project(path))
+    
+    report['templates'] = sum(len(tmpls) for tmpls in merged.values())
+    report['conflicts'] = list(conflicts.values())
+    return merged, report
+
+
+# ==================== مقارنة الإصدارات ====================
+
+PRODUCTION_PREFIX = 'const templatesData=(('
+DIFF_CONTEXT_WORDS = 6
+
+
+def _resolve_interned(strings, interned):
+    for tmpls in interned.values():
+        for t in tmpls:
+            for key, value in t.items():
+                if isinstance(value, int):
+                    t[key] = strings[value]
+    return interned
+
+
+def parse_templates_code(code):
+    """استخراج البيانات من كود templatesData بصيغتيه العادية والإنتاجية"""
+    decoder = json.JSONDecoder()
+    if code.startswith(PRODUCTION_PREFIX):
+        pos = code.index('})(', len(PRODUCTION_PREFIX)) + 3
+        strings, pos = decoder.raw_decode(code, pos)
+        interned, _ = decoder.raw_decode(code, code.index(',', pos) + 1)
+        return _resolve_interned(strings, interned)
+    return decoder.raw_decode(code, code.index('{'))[0]
+
+
+def load_templates_data(file_path):
+    """قراءة نماذج من مشروع أو تصدير JSON أو ملف JS أو index.html: {التصنيف: [{num, keyword, content}]}"""
+    lower = file_path.lower()
+    if lower.endswith('.json'):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data.get('templates'), dict) and 'version' in data:
+            return {cat: [t.to_dict() for t in tmpls] for cat, tmpls in read_project(file_path).items()}
+        return data
+    
+    if lower.endswith('.js'):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return parse_templates_code(f.read())
+    
+    with open(file_path, 'rb') as f, map_file(f) as mm:
+        start, end = find_templates_block(mm)
+        code = mm[start:end].decode('utf-8')
+    return parse_templates_code(code)
+
+
+def word_diff(old, new):
+    """فروق على مستوى الكلمة: [(equal|delete|insert، النص), ...]"""
+    from difflib import SequenceMatcher
+    a = DIFF_TOKEN_PATTERN.findall(old)
+    b = DIFF_TOKEN_PATTERN.findall(new)
+    segments = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            segments.append(('equal', ''.join(a[i1:i2])))
+            continue
+        if i2 > i1:
+            segments.append(('delete', ''.join(a[i1:i2])))
+        if j2 > j1:
+            segments.append(('insert', ''.join(b[j1:j2])))
+    return segments
+
+
+def _keyed(data):
+    """فهرس المفتاح → قائمة المحتويات (قد يتكرر المفتاح داخل التصنيف)"""
+    index = {}
+    for cat, tmpls in data.items():
+        for t in tmpls:
+            index.setdefault((cat, t.get('num', ''), t.get('keyword', '')), []).append(t.get('content', ''))
+    return index
+
+
+def diff_templates(old, new, ignore_whitespace=True):
+    """مقارنة إصدارين بربط المفاتيح (التصنيف، الرقم، الكلمة) عبر القواميس
+    
+    النماذج التي تغير مفتاحها فقط تُطابق بالمحتوى وتظهر كنقل لا كحذف وإضافة.
+    تجاهل المسافات يوحّدها كما يفعل الإصدار الإنتاجي حتى لا تظهر كتعديلات.
+    """
+    with INSTRUMENTS.stage('diff'):
+        old_index = _keyed(old)
+        new_index = _keyed(new)
+        removed, added, modified = [], [], []
+        
+        for key, old_contents in old_index.items():
+            new_contents = new_index.get(key, ())
+            for i, content in enumerate(old_contents):
+                if i >= len(new_contents):
+                    removed.append((key, content))
+                elif content != new_contents[i]:
+                    # التوحيد للنصوص المختلفة فقط، فالمطابقة التامة تبقى مقارنة مباشرة
+                    if ignore_whitespace:
+                        content, other = compact_content(content), compact_content(new_contents[i])
+                        if content != other:
+                            modified.append((key, content, other))
+                    else:
+                        modified.append((key, content, new_contents[i]))
+        for key, new_contents in new_index.items():
+            old_count = len(old_index.get(key, ()))
+            added.extend((key, content) for content in new_contents[old_count:])
+        
+        # ما حُذف وأضيف بنفس المحتوى هو نقل أو إعادة تسمية
+        removed_by_content = {}
+        for key, content in removed:
+            removed_by_content.setdefault(content, []).append(key)
+        moved = []
+        still_added = []
+        for key, content in added:
+            sources = removed_by_content.get(content)
+            if sources:
+                moved.append({'from': _key_dict(sources.pop(0)), 'to': _key_dict(key)})
+            else:
+                still_added.append(_key_dict(key, content=content))
+        still_removed = [
+            _key_dict(key, content=content)
+            for content, keys in removed_by_content.items() for key in keys
+        ]
+        
+        changes = [
+            dict(_key_dict(key), diff=word_diff(old_content, new_content))
+            for key, old_content, new_content in modified
+        ]
+    
+    return {
+        'summary': {
+            'old': sum(len(v) for v in old_index.values()),
+            'new': sum(len(v) for v in new_index.values()),
+            'added': len(still_added),
+            'removed': len(still_removed),
+            'modified': len(changes),
+            'moved': len(moved),
+        },
+        'added': still_added,
+        'removed': still_removed,
+        'modified': changes,
+        'moved': moved,
+    }
+
+
+def _key_dict(key, **extra):
+    cat, num, keyword = key
+    return dict({'category': cat, 'num': num, 'keyword': keyword}, **extra)
+
+
+def _label(entry):
+    return f"[{entry['category']}] {entry['num']} {entry['keyword']}".rstrip()
+
+
+def _clip_context(text, context, first, last):
+    """اختصار النص غير المتغير إلى كلمات قليلة حول مواضع التغيير"""
+    words = text.split()
+    if len(words) <= context * 2:
+        return ' '.join(words)
+    head = [] if first else words[:context]
+    tail = [] if last else words[-context:]
+    return ' '.join(head + ['…'] + tail)
+
+
+def format_changelog(report, context=DIFF_CONTEXT_WORDS):
+    """سجل تغييرات نصي: [-محذوف-] و{+مضاف+} مع كلمات قليلة من السياق"""
+    s = report['summary']
+    lines = [f"أضيف {s['added']}، حذف {s['removed']}، عدل {s['modified']}، نقل {s['moved']} "
+             f"({s['old']} ← {s['new']} نموذج)"]
+    for entry in report['added']:
+        lines.append(f"+ {_label(entry)}")
+    for entry in report['removed']:
+        lines.append(f"- {_label(entry)}")
+    for entry in report['moved']:
+        lines.append(f"→ {_label(entry['from'])} ⇐ {_label(entry['to'])}")
+    for entry in report['modified']:
+        segments = entry['diff']
+        parts = []
+        for i, (tag, text) in enumerate(segments):
+            if tag == 'delete':
+                parts.append(f"[-{text.strip() or '␣'}-]")
+            elif tag == 'insert':
+                parts.append(f"{{+{text.strip() or '␣'}+}}")
+            else:
+                parts.append(_clip_context(text, context, i == 0, i == len(segments) - 1))
+        lines.append(f"~ {_label(entry)}: {' '.join(p for p in parts if p)}")
+    return '\n'.join(lines)
+
+
+# ==================== الاستيراد بذاكرة محدودة ====================
+
+# الملفات الأكبر من هذا تُقرأ تدفقياً تلقائياً
+LARGE_DOCUMENT_BYTES = 20 * 1024 * 1024
+MAX_CELL_CHARS = 20000
+MAX_TABLE_ROWS = 200000
+PREVIEW_ROWS = 200
+HEADER_PREVIEW_CHARS = 200
+
+
+class TableStore:
+    """جداول مستخرجة: الملخصات في الذاكرة والصفوف في ملف مؤقت تُقرأ عند الطلب
+    
+    يُستخدم مكان قائمة الجداول: len() والتكرار والفهرسة تعيد صفوف جدول واحد فقط.
+    """
+    
+    def __init__(self):
+        self.file = tempfile.TemporaryFile(prefix='wt-tables-')
+        self.tables = []
+        self._current = None
+    
+    def start_table(self):
+        self.file.seek(0, os.SEEK_END)
+        self._current = {'offset': self.file.tell(), 'end': None, 'rows': 0, 'columns': 0,
+                         'header': None, 'truncated_cells': 0, 'dropped_rows': 0}
     
-    # ==================== المظهر ====================
+    def append_row(self, cells):
+        table = self._current
+        if table['header'] is None:
+            table['header'] = [cell[:HEADER_PREVIEW_CHARS] for cell in cells]
+        table['rows'] += 1
+        table['columns'] = max(table['columns'], len(cells))
+        self.file.write(json.dumps(cells, ensure_ascii=False).encode('utf-8') + b'\n')
     
-    def toggle_theme(self):
-        """تبديل الوضع الليلي"""
-        self.is_dark_mode = not self.is_dark_mode
-        if self.is_dark_mode:
-            self.apply_dark_theme()
-            self.btn_theme.setText('☀️ الوضع النهاري')
+    def finish_table(self):
+        """إغلاق الجدول الحالي؛ الجداول بلا صفوف تُهمل كما في read_word_tables"""
+        table, self._current = self._current, None
+        if table['rows']:
+            table['end'] = self.file.tell()
+            self.tables.append(table)
+    
+    def rows(self, index, limit=None):
+        """قراءة صفوف جدول من الملف المؤقت، اختيارياً أول limit صف فقط"""
+        table = self.tables[index]
+        self.file.seek(table['offset'])
+        rows = []
+        while self.file.tell() < table['end'] and (limit is None or len(rows) < limit):
+            rows.append(json.loads(self.file.readline()))
+        return rows
+    
+    def __len__(self):
+        return len(self.tables)
+    
+    def __getitem__(self, index):
+        return self.rows(index)
+    
+    def __iter__(self):
+        for index in range(len(self.tables)):
+            yield self.rows(index)
+    
+    def close(self):
+        self.file.close()
+        self.tables = []
+
+
+def stream_word_tables(file_path, store=None, max_cell_chars=MAX_CELL_CHARS, max_rows=MAX_TABLE_ROWS):
+    """قراءة جداول ملف docx تدفقياً عبر expat دون بناء شجرة المستند
+    
+    تعيد نفس صفوف read_word_tables (الخلايا المدمجة أفقياً ورأسياً تتكرر كما
+    في python-docx)، لكن كل صف يُكتب في TableStore فور اكتماله، ونص الخلية
+    يتوقف تجميعه عند max_cell_chars، والصفوف بعد max_rows في الجدول تُهمل.
+    """
+    from xml.parsers import expat
+    
+    store = store if store is not None else TableStore()
+    w = W_NAMESPACE + '}'
+    tbl, tr, tc, p, r, t = w + 'tbl', w + 'tr', w + 'tc', w + 'p', w + 'r', w + 't'
+    breaks = {w + 'tab': '\t', w + 'br': '\n', w + 'cr': '\n'}
+    grid_span, v_merge, val = w + 'gridSpan', w + 'vMerge', w + 'val'
+    
+    depth = 0
+    row = None
+    above = []
+    cell = None
+    in_run = in_text = False
+    
+    def add_text(text):
+        room = max_cell_chars - cell['length']
+        if room <= 0:
+            cell['truncated'] = True
+            return
+        if len(text) > room:
+            text = text[:room]
+            cell['truncated'] = True
+        cell['parts'].append(text)
+        cell['length'] += len(text)
+    
+    def start(name, attrs):
+        nonlocal depth, row, above, cell, in_run, in_text
+        if name == tbl:
+            depth += 1
+            if depth == 1:
+                store.start_table()
+                above = []
+        elif depth != 1:
+            return
+        elif name == tr:
+            row = []
+        elif name == tc:
+            cell = {'parts': [], 'length': 0, 'paragraphs': 0, 'span': 1, 'merge': False, 'truncated': False}
+        elif cell is None:
+            return
+        elif name == p:
+            if cell['paragraphs']:
+                add_text('\n')
+            cell['paragraphs'] += 1
+        elif name == r:
+            in_run = True
+        elif name == t:
+            in_text = True
+        elif name in breaks and in_run:
+            add_text(breaks[name])
+        elif name == grid_span:
+            cell['span'] = int(attrs.get(val, 1))
+        elif name == v_merge:
+            cell['merge'] = attrs.get(val, 'continue') == 'continue'
+    
+    def end(name):
+        nonlocal depth, row, above, cell, in_run, in_text
+        if name == tbl:
+            if depth == 1:
+                store.finish_table()
+            depth -= 1
+        elif depth != 1:
+            return
+        elif name == t:
+            in_text = False
+        elif name == r:
+            in_run = False
+        elif name == tc and cell is not None:
+            row.append(cell)
+            cell = None
+        elif name == tr and row is not None:
+            table = store._current
+            if table['rows'] >= max_rows:
+                table['dropped_rows'] += 1
+            else:
+                # الدمج الرأسي يكرر نص الخلية التي فوقه، والأفقي يكرر الخلية بعدد الأعمدة
+                cells = []
+                for item in row:
+                    column = len(cells)
+                    if item['merge'] and column < len(above):
+                        text = above[column]
+                    else:
+                        text = ''.join(item['parts']).strip()
+                        table['truncated_cells'] += item['truncated']
+                    cells.extend([text] * item['span'])
+                store.append_row(cells)
+                above = cells
+            row = None
+    
+    def characters(data):
+        if in_text and cell is not None and depth == 1:
+            add_text(data)
+    
+    parser = expat.ParserCreate(namespace_separator='}')
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = characters
+    
+    with INSTRUMENTS.stage('table_stream'), zipfile.ZipFile(file_path) as zf:
+        with zf.open('word/document.xml') as xml:
+            parser.ParseFile(xml)
+    return store
+
+
+# ==================== تنظيف النص العربي ====================
+
+NORMALIZATION_RULES = ('nbsp', 'zero_width', 'persian', 'tatweel', 'dots', 'spaces')
+
+# قواعد المحارف المفردة: جدول str.translate واحد
+CHARACTER_RULES = {
+    'nbsp': dict.fromkeys('\u00a0\u202f\u2007', ' '),
+    # المحارف الصفرية العرض وعلامات الاتجاه والشرطة اللينة
+    'zero_width': dict.fromkeys('\u200b\u200c\u200d\u200e\u200f\u00ad\ufeff\u202a\u202b\u202c\u202d\u202e\u2066\u2067\u2068\u2069'),
+    'persian': {'ی': 'ي', 'ک': 'ك'},
+}
+
+# الحروف العربية دون التطويل (U+0640)
+ARABIC_LETTER = '[ء-ؿف-يٮ-ۓ]'
+ARABIC_LETTER_PATTERN = re.compile(ARABIC_LETTER)
+DOTS_PLACEHOLDER = '.' * 10
+
+# قواعد الأنماط في تعبير واحد يمر على النص مرة واحدة
+REGEX_RULES = {
+    # التطويل داخل الكلمة يُحذف، وفي آخرها يُختصر إلى واحد (هــــ → هـ)، والمنفصل يبقى
+    'tatweel': rf'(?<={ARABIC_LETTER})ـ+(?={ARABIC_LETTER})|(?<={ARABIC_LETTER})ـ{{2,}}',
+    # نقاط العناصر النائبة بأطوال مختلفة أو بمحرف … أو بمسافات بينها
+    # (النقاط المتتالية، أو نقاط مفردة بينها مسافة واحدة مثل ". . . . .")
+    'dots': r'[.…]{2,}|(?:[.…] ){2,}[.…]',
+    'spaces': r' {2,}',
+}
+
+
+class ArabicNormalizer:
+    """تنظيف آثار وورد من النص: جدول translate للمحارف ثم تعبير نمطي واحد
+    
+    يحصي عدد مرات تطبيق كل قاعدة في hits.
+    """
+    
+    def __init__(self, rules=NORMALIZATION_RULES):
+        unknown = set(rules) - set(NORMALIZATION_RULES)
+        if unknown:
+            raise ValueError(f"قواعد غير معروفة: {', '.join(sorted(unknown))}")
+        self.rules = tuple(rules)
+        self.character_rules = {name: CHARACTER_RULES[name] for name in self.rules if name in CHARACTER_RULES}
+        mapping = {}
+        for chars in self.character_rules.values():
+            mapping.update(chars)
+        self.table = str.maketrans(mapping) if mapping else None
+        patterns = [f'(?P<{name}>{REGEX_RULES[name]})' for name in self.rules if name in REGEX_RULES]
+        self.pattern = re.compile('|'.join(patterns)) if patterns else None
+    
+    def _replace(self, match, hits):
+        kind = match.lastgroup
+        text = match.group()
+        if kind == 'tatweel':
+            # داخل الكلمة يُحذف، وفي آخرها يبقى واحد
+            inside = ARABIC_LETTER_PATTERN.match(match.string, match.end())
+            replacement = '' if inside else 'ـ'
+        elif kind == 'dots':
+            if text.count('.') + 3 * text.count('…') < 5:
+                return text
+            replacement = DOTS_PLACEHOLDER
         else:
-            self.apply_light_theme()
-            self.btn_theme.setText('🌙 الوضع الليلي')
-    
-    def apply_light_theme(self):
-        """تطبيق المظهر الفاتح"""
-        self.setStyleSheet("""
-            QMainWindow, QWidget {
-                background-color: #f8f6f1;
-                color: #2c2c2c;
-                font-family: 'Tajawal', 'Segoe UI', sans-serif;
-                font-size: 14px;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 2px solid #e0ddd5;
-                border-radius: 8px;
-                margin-top: 10px;
-                padding-top: 10px;
-                background-color: #ffffff;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top right;
-                padding: 0 10px;
-                color: #1a5f4a;
-            }
-            QPushButton {
-                background-color: #1a5f4a;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #2d8b6e;
-            }
-            QPushButton:pressed {
-                background-color: #0d3d2f;
-            }
-            QLineEdit, QTextEdit, QComboBox, QSpinBox {
-                border: 2px solid #e0ddd5;
-                border-radius: 6px;
-                padding: 8px;
-                background-color: #ffffff;
-            }
-            QLineEdit:focus, QTextEdit:focus, QComboBox:focus {
-                border-color: #1a5f4a;
-            }
-            QListWidget, QTableWidget {
-                border: 2px solid #e0ddd5;
-                border-radius: 6px;
-                background-color: #ffffff;
-            }
-            QListWidget::item:selected, QTableWidget::item:selected {
-                background-color: #1a5f4a;
-                color: white;
-            }
-            QTabWidget::pane {
-                border: 2px solid #e0ddd5;
-                border-radius: 8px;
-                background-color: #ffffff;
-            }
-            QTabBar::tab {
-                background-color: #e0ddd5;
-                padding: 10px 20px;
-                margin-right: 2px;
-                border-top-left-radius: 6px;
-                border-top-right-radius: 6px;
-            }
-            QTabBar::tab:selected {
-                background-color: #1a5f4a;
-                color: white;
-            }
-            QStatusBar {
-                background-color: #1a5f4a;
-                color: white;
-            }
-            QHeaderView::section {
-                background-color: #1a5f4a;
-                color: white;
-                padding: 8px;
-                border: none;
-            }
-        """)
-    
-    def apply_dark_theme(self):
-        """تطبيق المظهر الداكن"""
-        self.setStyleSheet("""
-            QMainWindow, QWidget {
-                background-color: #1a1a1a;
-                color: #f0f0f0;
-                font-family: 'Tajawal', 'Segoe UI', sans-serif;
-                font-size: 14px;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 2px solid #404040;
-                border-radius: 8px;
-                margin-top: 10px;
-                padding-top: 10px;
-                background-color: #2d2d2d;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top right;
-                padding: 0 10px;
-                color: #2d8b6e;
-            }
-            QPushButton {
-                background-color: #2d8b6e;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #3da37f;
-            }
-            QPushButton:pressed {
-                background-color: #1a5f4a;
-            }
-            QLineEdit, QTextEdit, QComboBox, QSpinBox {
-                border: 2px solid #404040;
-                border-radius: 6px;
-                padding: 8px;
-                background-color: #2d2d2d;
-                color: #f0f0f0;
-            }
-            QLineEdit:focus, QTextEdit:focus, QComboBox:focus {
-                border-color: #2d8b6e;
-            }
-            QListWidget, QTableWidget {
-                border: 2px solid #404040;
-                border-radius: 6px;
-                background-color: #2d2d2d;
-                color: #f0f0f0;
-            }
-            QListWidget::item:selected, QTableWidget::item:selected {
-                background-color: #2d8b6e;
-                color: white;
-            }
-            QTabWidget::pane {
-                border: 2px solid #404040;
-                border-radius: 8px;
-                background-color: #2d2d2d;
-            }
-            QTabBar::tab {
-                background-color: #404040;
-                color: #f0f0f0;
-                padding: 10px 20px;
-                margin-right: 2px;
-                border-top-left-radius: 6px;
-                border-top-right-radius: 6px;
-            }
-            QTabBar::tab:selected {
-                background-color: #2d8b6e;
-                color: white;
-            }
-            QStatusBar {
-                background-color: #2d8b6e;
-                color: white;
-            }
-            QHeaderView::section {
-                background-color: #2d8b6e;
-                color: white;
-                padding: 8px;
-                border: none;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #2d2d2d;
-                color: #f0f0f0;
-                selection-background-color: #2d8b6e;
-            }
-        """)
+            replacement = ' '
+        if replacement != text:
+            hits[kind] += 1
+        return replacement
     
-    def update_status(self):
-        """تحديث شريط الحالة"""
-        total = sum(len(tmpls) for tmpls in self.templates.values())
-        self.status_bar.showMessage(f'إجمالي النماذج: {total}')
+    def normalize(self, text, hits=None):
+        if hits is None:
+            hits = Counter()
+        if self.table is not None:
+            translated = text.translate(self.table)
+            # العدّ لكل قاعدة فقط عند وجود تغيير، والنص النظيف لا يكلف إلا المقارنة
+            if translated != text:
+                for name, chars in self.character_rules.items():
+                    count = sum(text.count(ch) for ch in chars)
+                    if count:
+                        hits[name] += count
+                text = translated
+        if self.pattern is not None:
+            text = self.pattern.sub(lambda match: self._replace(match, hits), text)
+        return text
 
 
-def main():
-    app = QApplication(sys.argv)
-    app.setLayoutDirection(Qt.RightToLeft)
+# أقل عدد نصوص يستحق توزيعه على عمليات
+PARALLEL_NORMALIZE_MIN = 20000
+NORMALIZE_CHUNK = 2000
+
+# المنظف في كل عملية عاملة
+_NORMALIZER = None
+
+
+def _init_normalizer(rules):
+    global _NORMALIZER
+    _NORMALIZER = ArabicNormalizer(rules)
+
+
+def _normalize_chunk(texts):
+    hits = Counter()
+    return [_NORMALIZER.normalize(text, hits) for text in texts], hits
+
+
+def normalize_templates(templates, rules=NORMALIZATION_RULES, workers=None):
+    """تنظيف الكلمات المفتاحية والمحتوى في كل النماذج، وإرجاع عدد مرات تطبيق كل قاعدة
+    
+    الدفعات الكبيرة تُوزع على عمليات؛ والصغيرة تُنظف مباشرة لأن كلفة إنشاء العمليات أكبر.
+    """
+    items = [tmpl for tmpls in templates.values() for tmpl in tmpls]
+    texts = [text for tmpl in items for text in (tmpl.keyword, tmpl.content)]
+    hits = Counter()
+    
+    with INSTRUMENTS.stage('normalize'):
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(texts) < PARALLEL_NORMALIZE_MIN:
+            normalizer = ArabicNormalizer(rules)
+            cleaned = [normalizer.normalize(text, hits) for text in texts]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            chunks = [texts[i:i + NORMALIZE_CHUNK] for i in range(0, len(texts), NORMALIZE_CHUNK)]
+            cleaned = []
+            with ProcessPoolExecutor(workers, initializer=_init_normalizer, initargs=(tuple(rules),)) as pool:
+                for chunk, chunk_hits in pool.map(_normalize_chunk, chunks):
+                    cleaned.extend(chunk)
+                    hits.update(chunk_hits)
+    
+    for i, tmpl in enumerate(items):
+        tmpl.keyword = cleaned[2 * i].strip()
+        tmpl.content = cleaned[2 * i + 1].strip()
+    return hits
+
+
+def format_normalization_report(hits):
+    """سطر موجز بعدد التعديلات لكل قاعدة تنظيف"""
+    if not hits:
+        return 'تنظيف النص: لا توجد تغييرات'
+    return 'تنظيف النص: ' + '، '.join(f'{rule} {hits[rule]}' for rule in NORMALIZATION_RULES if hits[rule])
+
+
+def run_cli(argv):
+    """تنفيذ أوامر سطر الأوامر دون واجهة، وإرجاع None لتشغيل الواجهة"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='محوّل نماذج الوورد إلى Templates Data')
+    parser.add_argument('--lint', metavar='PROJECT', help='فحص ملف مشروع وطباعة النتيجة بصيغة JSON')
+    parser.add_argument('--watch', metavar='PATH', help='مراقبة ملف وورد أو مجلد وإعادة التصدير عند كل حفظ')
+    parser.add_argument('--patch', metavar='INDEX_HTML', help='تحديث كتلة templatesData في index.html من مشروع')
+    parser.add_argument('--project', metavar='PROJECT', help='تصدير ملف مشروع إلى --output (أو مصدر --patch)')
+    parser.add_argument('--archive', metavar='ZIP', help='استيراد كل ملفات docx من أرشيف zip وتصديرها إلى --output')
+    parser.add_argument('--workers', type=int, help='عدد العمليات المتوازية لاستيراد الأرشيف')
+    parser.add_argument('--tafqit', nargs='+', metavar='AMOUNT', help='كتابة مبلغ أو أكثر بالحروف')
+    parser.add_argument('--currency', default='SAR', choices=list(CURRENCIES), help='العملة للتفقيط')
+    parser.add_argument('--fill', metavar='RECORDS', help='توليد مستند لكل سجل (CSV أو JSON) من نموذج في --project')
+    parser.add_argument('--history', metavar='PROJECT', help='عرض سجل تعديلات نموذج (--template) من مشروع')
+    parser.add_argument('--as-of', metavar='DATE', help='طباعة محتوى النموذج كما كان في تاريخ (YYYY-MM-DD) مع --history')
+    parser.add_argument('--template', metavar='NUM_OR_KEYWORD', help='رقم النموذج أو كلمته المفتاحية لـ --fill و --history')
+    parser.add_argument('--category', help='تصنيف النموذج لـ --fill و --history')
+    parser.add_argument('--out-dir', default='generated', help='مجلد المستندات المولدة')
+    parser.add_argument('--format', choices=('docx', 'txt'), default='docx', help='صيغة المستندات المولدة')
+    parser.add_argument('--base-docx', help='مستند أساسي (ترويسة وأنماط) تُضاف إليه النصوص المولدة')
+    parser.add_argument('--name-field', help='حقل السجل المستخدم كاسم للملف')
+    parser.add_argument('--spell-amounts', action='store_true', help='إضافة المبلغ بالحروف بعد خانات الأصفار')
+    parser.add_argument('--merge', nargs='+', metavar='PROJECT', help='دمج ملفات مشاريع في --merge-output')
+    parser.add_argument('--policy', choices=MERGE_POLICIES, default='keep-newest', help='سياسة حل التعارضات عند الدمج')
+    parser.add_argument('--merge-output', default='merged_project.json', help='ملف المشروع الناتج عن الدمج')
+    parser.add_argument('--conflicts', metavar='FILE', help='حفظ تقرير التعارضات بصيغة JSON')
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'), help='سجل التغييرات بين إصدارين (index.html أو .js أو .json أو مشروع)')
+    parser.add_argument('--diff-report', metavar='FILE', help='حفظ نتيجة --diff كاملة بصيغة JSON')
+    parser.add_argument('--diff-whitespace', action='store_true', help='عدّ اختلاف المسافات تعديلاً في --diff')
+    parser.add_argument('--normalize', nargs='*', choices=NORMALIZATION_RULES, metavar='RULE',
+                        help=f"تنظيف النص العربي عند الاستيراد (كل القواعد إن لم تُحدد): {' '.join(NORMALIZATION_RULES)}")
+    parser.add_argument('--output', '-o', default='templatesData.js', help='ملف الناتج (.js أو .json أو .docx، أو index.html لتحديث كتلة templatesData فيه)')
+    parser.add_argument('--minify', action='store_true', help='ضغط الكود')
+    parser.add_argument('--segments', action='store_true', help='تضمين مقاطع العناصر النائبة')
+    parser.add_argument('--production', action='store_true', help='إصدار إنتاجي مع ملفات .gz و .br')
+    parser.add_argument('--diagnostics', metavar='FILE', help='حفظ أزمنة المراحل بعد التنفيذ بصيغة JSON')
+    parser.add_argument('--profile', action='store_true', help='التقاط cProfile و tracemalloc مع --diagnostics')
+    parser.add_argument('--headless', action='store_true', help='عدم تشغيل الواجهة إطلاقاً (لا يُحمّل PyQt5)')
+    parser.add_argument('--startup-time', action='store_true', help='طباعة زمن الإقلاع حتى أول رسم للنافذة ثم الخروج')
+    args, _ = parser.parse_known_args(argv)
+    
+    if args.diagnostics:
+        if args.profile:
+            INSTRUMENTS.start_capture()
+        try:
+            exit_code = run_command(parser, args)
+        finally:
+            with open(args.diagnostics, 'w', encoding='utf-8') as f:
+                f.write(INSTRUMENTS.to_json(INSTRUMENTS.stop_capture()))
+        return exit_code
+    return run_command(parser, args)
+
+
+def run_command(parser, args):
+    """تنفيذ الأمر المطلوب من سطر الأوامر"""
+    if args.lint:
+        summary = lint_summary(lint_templates(read_project(args.lint)))
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return 1 if summary['errors'] else 0
+    
+    if args.tafqit:
+        for text in tafqit_batch(args.tafqit, args.currency):
+            print(text)
+        return 0
+    
+    if args.fill:
+        if not (args.project and args.template):
+            parser.error('--fill يتطلب --project و --template')
+        template = find_template(read_project(args.project), args.template, args.category)
+        report = generate_documents(
+            template, iter_records(args.fill), args.out_dir, args.format, args.base_docx,
+            args.workers, args.name_field, args.spell_amounts
+        )
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+    
+    if args.merge:
+        templates, report = merge_projects(args.merge, args.policy)
+        write_project(templates, args.merge_output)
+        if args.conflicts:
+            atomic_write(args.conflicts, json.dumps(report, ensure_ascii=False, indent=2))
+        print(f"تم دمج {report['templates']} نموذج في {args.merge_output} "
+              f"(مكرر: {report['duplicates']}، تعارضات: {len(report['conflicts'])})")
+        return 1 if args.policy == 'manual' and report['conflicts'] else 0
     
-    # تعيين الخط
-    font = QFont('Tajawal', 11)
-    app.setFont(font)
+    if args.diff:
+        old, new = (load_templates_data(path) for path in args.diff)
+        report = diff_templates(old, new, not args.diff_whitespace)
+        if args.diff_report:
+            atomic_write(args.diff_report, json.dumps(report, ensure_ascii=False, indent=2))
+        print(format_changelog(report))
+        return 1 if any(report['summary'][k] for k in ('added', 'removed', 'modified', 'moved')) else 0
     
-    window = TemplateConverter()
-    window.show()
+    if args.history:
+        if not args.template:
+            parser.error('--history يتطلب --template')
+        tmpl = find_template(read_project(args.history), args.template, args.category)
+        history = tmpl.history or TemplateHistory()
+        if args.as_of:
+            content = history.content_as_of(args.as_of)
+            print(tmpl.content if content is None else content)
+            return 0
+        for index, revision in enumerate(history.revisions):
+            kind = 'نسخة كاملة' if 'snapshot' in revision else f"{len(revision['delta'])} تغيير"
+            print(f"{index:>4}  {revision['time'] or 'قبل بدء السجل':<19}  {kind}")
+        return 0
+    
+    if args.patch:
+        if not args.project:
+            parser.error('--patch يتطلب --project')
+        data = build_export_data(read_project(args.project), args.segments)
+        if patch_index_html(args.patch, render_js(data, args.minify)):
+            print(f'تم تحديث {args.patch}')
+        else:
+            print('لا توجد تغييرات')
+        return 0
+    
+    if args.project or args.archive:
+        if args.archive:
+            try:
+                templates = classify_archive(args.archive, args.workers)
+            except ValueError as e:
+                print(e, file=sys.stderr)
+                return 1
+        else:
+            templates = read_project(args.project)
+        if args.normalize is not None:
+            hits = normalize_templates(templates, args.normalize or NORMALIZATION_RULES, args.workers)
+            print(format_normalization_report(hits))
+        if args.production:
+            if args.output.lower().endswith(HTML_EXTENSIONS):
+                parser.error('--production يكتب ملف JS مستقلاً ولا يحدّث صفحات HTML')
+            print(format_size_report(export_production(templates, args.output, args.segments)))
+            return 0
+        if args.output.lower().endswith('.docx'):
+            report = export_word_tables(templates, args.output)
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+            return 0
+        data = build_export_data(templates, args.segments)
+        if write_export(args.output, data, args.minify):
+            print(f'تم حفظ {args.output}')
+        else:
+            print('لا توجد تغييرات')
+        return 0
+    
+    if args.watch:
+        normalize = None if args.normalize is None else (args.normalize or NORMALIZATION_RULES)
+        return DocumentWatcher(args.watch, args.output, args.minify, args.segments, normalize=normalize).run()
+    
+    if args.headless:
+        parser.print_help()
+        return 2
+    
+    return None
+
+
+def main():
+    exit_code = run_cli(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
     
-    sys.exit(app.exec_())
+    # الواجهة تستورد هذا الملف باسمه، فنسجّله حتى لا يُحمّل مرتين عند تشغيله مباشرة
+    sys.modules.setdefault('wordtotemplates', sys.modules[__name__])
+    from wordtotemplates_gui import run_gui
+    sys.exit(run_gui(STARTED, '--startup-time' in sys.argv))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,1480 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+واجهة محوّل نماذج الوورد إلى Templates Data
+تُحمَّل فقط عند تشغيل الواجهة حتى لا تتحمّل الأوامر دون واجهة كلفة PyQt5
+تطوير: عبدالكريم العبود | abo.saleh.g@gmail.com
+"""
+
+import sys
+import os
+import json
+from collections import Counter
+
+try:
+    from PyQt5.QtWidgets import (
+        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+        QLabel, QPushButton, QLineEdit, QTextEdit, QComboBox, QListWidget,
+        QListWidgetItem, QFileDialog, QMessageBox, QSplitter, QGroupBox,
+        QFormLayout, QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView,
+        QStyle, QStyleFactory, QInputDialog, QMenu, QAction, QStatusBar,
+        QProgressBar, QFrame, QSpinBox, QCheckBox
+    )
+    from PyQt5.QtCore import Qt, QSize, QTimer
+    from PyQt5.QtGui import QFont, QIcon, QPalette, QColor, QClipboard, QKeySequence
+except ImportError:
+    print("يجب تثبيت PyQt5 أولاً:")
+    print("pip install PyQt5")
+    sys.exit(1)
+
+from wordtotemplates import (
+    DEFAULT_CATEGORIES, INSTRUMENTS, Template,
+    read_project, write_project, read_word_tables, rows_to_templates, classify_tables,
+    read_archive_tables, is_archive, build_export_data, render_js, render_json, count_placeholders,
+    patch_index_html, export_production, format_size_report, export_word_tables,
+    lint_templates, lint_summary,
+    UndoStack, EditTemplate, AddTemplate, DeleteTemplate, ImportTemplates, AddCategory, DeleteCategory,
+    ReplaceTemplates, MERGE_POLICIES, merge_projects, atomic_write,
+    load_templates_data, diff_templates, format_changelog,
+    TableStore, stream_word_tables, LARGE_DOCUMENT_BYTES, PREVIEW_ROWS,
+    normalize_templates, format_normalization_report,
+)
+
+
+class TemplateConverter(QMainWindow):
+    """النافذة الرئيسية للتطبيق"""
+    
+    # التصنيفات الافتراضية
+    DEFAULT_CATEGORIES = DEFAULT_CATEGORIES
+    
+    def __init__(self):
+        super().__init__()
+        self.templates = {}  # {category: [Template, ...]}
+        self.current_file = None
+        self.is_dark_mode = False
+        self.init_categories()
+        self.history = UndoStack(self.templates)
+        self.init_ui()
+        self.apply_light_theme()
+    
+    def init_categories(self):
+        """تهيئة التصنيفات"""
+        for cat in self.DEFAULT_CATEGORIES:
+            self.templates[cat] = []
+    
+    def init_ui(self):
+        """إنشاء واجهة المستخدم"""
+        self.setWindowTitle('محوّل نماذج الوورد إلى Templates Data')
+        self.setMinimumSize(1200, 800)
+        self.setLayoutDirection(Qt.RightToLeft)
+        
+        # الودجت المركزي
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+        
+        # شريط الأدوات العلوي
+        toolbar = self.create_toolbar()
+        main_layout.addLayout(toolbar)
+        
+        # التبويبات
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.create_import_tab(), '📥 استيراد من وورد')
+        self.tabs.addTab(self.create_manual_tab(), '✏️ إضافة يدوية')
+        self.tabs.addTab(self.create_preview_tab(), '👁️ معاينة')
+        self.tabs.addTab(self.create_export_tab(), '📤 تصدير')
+        self.tabs.addTab(self.create_diagnostics_tab(), '🩺 التشخيص')
+        main_layout.addWidget(self.tabs)
+        
+        # شريط الحالة
+        self.status_bar = QStatusBar()
+        self.setStatusBar(self.status_bar)
+        self.update_status()
+        
+        # شريط الحقوق
+        credits = QLabel('تطوير: عبدالكريم العبود | abo.saleh.g@gmail.com')
+        credits.setAlignment(Qt.AlignCenter)
+        credits.setStyleSheet('color: #888; padding: 5px;')
+        main_layout.addWidget(credits)
+    
+    def create_toolbar(self):
+        """إنشاء شريط الأدوات"""
+        layout = QHBoxLayout()
+        
+        # زر فتح ملف
+        btn_open = QPushButton('📂 فتح ملف وورد')
+        btn_open.clicked.connect(self.open_word_file)
+        layout.addWidget(btn_open)
+        
+        # زر حفظ المشروع
+        btn_save = QPushButton('💾 حفظ المشروع')
+        btn_save.clicked.connect(self.save_project)
+        layout.addWidget(btn_save)
+        
+        # زر تحميل المشروع
+        btn_load = QPushButton('📁 تحميل مشروع')
+        btn_load.clicked.connect(self.load_project)
+        layout.addWidget(btn_load)
+        
+        # زر دمج مشاريع الفروع في المشروع الحالي
+        btn_merge = QPushButton('🔀 دمج مشاريع')
+        btn_merge.clicked.connect(self.merge_projects)
+        layout.addWidget(btn_merge)
+        
+        # التراجع والإعادة (Ctrl+Z / Ctrl+Y) على مستوى النافذة
+        self.btn_undo = QPushButton('↩️ تراجع')
+        self.btn_undo.clicked.connect(self.undo)
+        layout.addWidget(self.btn_undo)
+        
+        self.btn_redo = QPushButton('↪️ إعادة')
+        self.btn_redo.clicked.connect(self.redo)
+        layout.addWidget(self.btn_redo)
+        
+        for sequence, slot in ((QKeySequence.Undo, self.undo), (QKeySequence.Redo, self.redo)):
+            action = QAction(self)
+            action.setShortcut(sequence)
+            action.triggered.connect(slot)
+            self.addAction(action)
+        self.update_history_buttons()
+        
+        layout.addStretch()
+        
+        # زر الوضع الليلي
+        self.btn_theme = QPushButton('🌙 الوضع الليلي')
+        self.btn_theme.clicked.connect(self.toggle_theme)
+        layout.addWidget(self.btn_theme)
+        
+        return layout
+    
+    def create_import_tab(self):
+        """تبويب الاستيراد من وورد"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        # معلومات الملف
+        file_group = QGroupBox('ملف الوورد')
+        file_layout = QHBoxLayout(file_group)
+        
+        self.lbl_file = QLabel('لم يتم اختيار ملف')
+        file_layout.addWidget(self.lbl_file)
+        
+        self.chk_bounded = QCheckBox('ذاكرة محدودة')
+        self.chk_bounded.setToolTip(
+            'قراءة الجداول تدفقياً وحفظ صفوفها في ملف مؤقت بدلاً من الذاكرة، '
+            'مع اقتطاع الخلايا الضخمة. يُفعّل تلقائياً للملفات الكبيرة.')
+        file_layout.addWidget(self.chk_bounded)
+        
+        self.chk_normalize = QCheckBox('تنظيف النص')
+        self.chk_normalize.setChecked(True)
+        self.chk_normalize.setToolTip(
+            'توحيد المسافات والتطويل والحروف الفارسية وحذف المحارف الخفية '
+            'وتوحيد نقاط العناصر النائبة عند الاستيراد.')
+        file_layout.addWidget(self.chk_normalize)
+        
+        btn_browse = QPushButton('استعراض...')
+        btn_browse.clicked.connect(self.open_word_file)
+        file_layout.addWidget(btn_browse)
+        
+        layout.addWidget(file_group)
+        
+        # جدول الجداول المستخرجة
+        tables_group = QGroupBox('الجداول المكتشفة')
+        tables_layout = QVBoxLayout(tables_group)
+        
+        self.tables_list = QListWidget()
+        self.tables_list.itemClicked.connect(self.on_table_selected)
+        tables_layout.addWidget(self.tables_list)
+        
+        layout.addWidget(tables_group)
+        
+        # معاينة الجدول المحدد
+        preview_group = QGroupBox('محتوى الجدول')
+        preview_layout = QVBoxLayout(preview_group)
+        
+        self.table_preview = QTableWidget()
+        self.table_preview.setLayoutDirection(Qt.RightToLeft)
+        preview_layout.addWidget(self.table_preview)
+        
+        # أزرار الاستيراد
+        import_layout = QHBoxLayout()
+        
+        self.cmb_import_category = QComboBox()
+        self.cmb_import_category.addItems(self.DEFAULT_CATEGORIES)
+        import_layout.addWidget(QLabel('التصنيف:'))
+        import_layout.addWidget(self.cmb_import_category)
+        
+        btn_import = QPushButton('📥 استيراد الجدول المحدد')
+        btn_import.clicked.connect(self.import_selected_table)
+        import_layout.addWidget(btn_import)
+        
+        btn_import_all = QPushButton('📥 استيراد الكل (تلقائي)')
+        btn_import_all.clicked.connect(self.import_all_tables)
+        import_layout.addWidget(btn_import_all)
+        
+        preview_layout.addLayout(import_layout)
+        layout.addWidget(preview_group)
+        
+        return widget
+    
+    def create_manual_tab(self):
+        """تبويب الإضافة اليدوية"""
+        widget = QWidget()
+        layout = QHBoxLayout(widget)
+        
+        # القائمة الجانبية - التصنيفات والنماذج
+        sidebar = QWidget()
+        sidebar_layout = QVBoxLayout(sidebar)
+        sidebar.setMaximumWidth(350)
+        
+        # التصنيفات
+        cat_group = QGroupBox('التصنيفات')
+        cat_layout = QVBoxLayout(cat_group)
+        
+        self.categories_list = QListWidget()
+        self.categories_list.addItems(self.DEFAULT_CATEGORIES)
+        self.categories_list.currentRowChanged.connect(self.on_category_changed)
+        cat_layout.addWidget(self.categories_list)
+        
+        cat_buttons = QHBoxLayout()
+        btn_add_cat = QPushButton('➕')
+        btn_add_cat.setToolTip('إضافة تصنيف')
+        btn_add_cat.clicked.connect(self.add_category)
+        cat_buttons.addWidget(btn_add_cat)
+        
+        btn_del_cat = QPushButton('➖')
+        btn_del_cat.setToolTip('حذف تصنيف')
+        btn_del_cat.clicked.connect(self.delete_category)
+        cat_buttons.addWidget(btn_del_cat)
+        cat_layout.addLayout(cat_buttons)
+        
+        sidebar_layout.addWidget(cat_group)
+        
+        # النماذج في التصنيف
+        templates_group = QGroupBox('النماذج')
+        templates_layout = QVBoxLayout(templates_group)
+        
+        self.templates_list = QListWidget()
+        self.templates_list.currentRowChanged.connect(self.on_template_selected)
+        self.templates_list.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.templates_list.customContextMenuRequested.connect(self.show_template_context_menu)
+        templates_layout.addWidget(self.templates_list)
+        
+        tmpl_buttons = QHBoxLayout()
+        btn_add_tmpl = QPushButton('➕ إضافة نموذج')
+        btn_add_tmpl.clicked.connect(self.add_template)
+        tmpl_buttons.addWidget(btn_add_tmpl)
+        
+        btn_del_tmpl = QPushButton('🗑️ حذف')
+        btn_del_tmpl.clicked.connect(self.delete_template)
+        tmpl_buttons.addWidget(btn_del_tmpl)
+        templates_layout.addLayout(tmpl_buttons)
+        
+        sidebar_layout.addWidget(templates_group)
+        layout.addWidget(sidebar)
+        
+        # منطقة التحرير
+        editor = QWidget()
+        editor_layout = QVBoxLayout(editor)
+        
+        form_group = QGroupBox('تحرير النموذج')
+        form_layout = QFormLayout(form_group)
+        
+        self.txt_num = QLineEdit()
+        self.txt_num.setPlaceholderText('مثال: 1، 2، 30')
+        form_layout.addRow('الرقم:', self.txt_num)
+        
+        self.txt_keyword = QLineEdit()
+        self.txt_keyword.setPlaceholderText('مثال: لدي1، قائم، أدعى')
+        form_layout.addRow('الكلمة المفتاحية:', self.txt_keyword)
+        
+        self.txt_content = QTextEdit()
+        self.txt_content.setPlaceholderText('محتوى النموذج...')
+        self.txt_content.setMinimumHeight(300)
+        form_layout.addRow('المحتوى:', self.txt_content)
+        
+        editor_layout.addWidget(form_group)
+        
+        # أزرار الحفظ
+        save_layout = QHBoxLayout()
+        btn_save_template = QPushButton('💾 حفظ التعديلات')
+        btn_save_template.clicked.connect(self.save_current_template)
+        save_layout.addWidget(btn_save_template)
+        
+        btn_clear = QPushButton('🔄 مسح الحقول')
+        btn_clear.clicked.connect(self.clear_editor)
+        save_layout.addWidget(btn_clear)
+        
+        editor_layout.addLayout(save_layout)
+        layout.addWidget(editor)
+        
+        return widget
+    
+    def create_preview_tab(self):
+        """تبويب المعاينة"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        # إحصائيات
+        stats_group = QGroupBox('📊 إحصائيات')
+        stats_layout = QHBoxLayout(stats_group)
+        
+        self.lbl_total_templates = QLabel('إجمالي النماذج: 0')
+        stats_layout.addWidget(self.lbl_total_templates)
+        
+        self.lbl_total_categories = QLabel('التصنيفات: 0')
+        stats_layout.addWidget(self.lbl_total_categories)
+        
+        self.lbl_total_placeholders = QLabel('العناصر النائبة: 0')
+        stats_layout.addWidget(self.lbl_total_placeholders)
+        
+        layout.addWidget(stats_group)
+        
+        # معاينة الكود
+        preview_group = QGroupBox('معاينة الكود')
+        preview_layout = QVBoxLayout(preview_group)
+        
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel('الصيغة:'))
+        
+        self.cmb_format = QComboBox()
+        self.cmb_format.addItems(['JavaScript (templatesData)', 'JSON'])
+        self.cmb_format.currentIndexChanged.connect(self.update_preview)
+        format_layout.addWidget(self.cmb_format)
+        
+        btn_refresh = QPushButton('🔄 تحديث المعاينة')
+        btn_refresh.clicked.connect(self.update_preview)
+        format_layout.addWidget(btn_refresh)
+        
+        format_layout.addStretch()
+        preview_layout.addLayout(format_layout)
+        
+        self.preview_text = QTextEdit()
+        self.preview_text.setReadOnly(True)
+        self.preview_text.setFont(QFont('Courier New', 10))
+        self.preview_text.setLayoutDirection(Qt.LeftToRight)
+        preview_layout.addWidget(self.preview_text)
+        
+        # أزرار النسخ
+        copy_layout = QHBoxLayout()
+        btn_copy = QPushButton('📋 نسخ للحافظة')
+        btn_copy.clicked.connect(self.copy_to_clipboard)
+        copy_layout.addWidget(btn_copy)
+        preview_layout.addLayout(copy_layout)
+        
+        layout.addWidget(preview_group)
+        
+        return widget
+    
+    def create_export_tab(self):
+        """تبويب التصدير"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        # خيارات التصدير
+        options_group = QGroupBox('خيارات التصدير')
+        options_layout = QFormLayout(options_group)
+        
+        self.cmb_export_format = QComboBox()
+        self.cmb_export_format.addItems([
+            'JavaScript (.js) - للاستخدام في HTML',
+            'JSON (.json) - بيانات خام'
+        ])
+        options_layout.addRow('الصيغة:', self.cmb_export_format)
+        
+        self.chk_minify = QCheckBox('ضغط الكود (minify)')
+        options_layout.addRow('', self.chk_minify)
+        
+        self.chk_segments = QCheckBox('تقسيم العناصر النائبة مسبقاً (segments)')
+        self.chk_segments.setToolTip('يضيف لكل نموذج مواضع التواريخ والنقاط والأصفار ليعرضها الموقع دون regex')
+        options_layout.addRow('', self.chk_segments)
+        
+        self.chk_production = QCheckBox('إصدار إنتاجي (ضغط المحتوى + ملفات .gz و .br)')
+        self.chk_production.setToolTip('يحذف المسافات الزائدة ويوحّد النصوص المكررة ثم يكتب نسخاً مضغوطة مسبقاً')
+        options_layout.addRow('', self.chk_production)
+        
+        layout.addWidget(options_group)
+        
+        # أزرار التصدير
+        export_group = QGroupBox('تصدير')
+        export_layout = QVBoxLayout(export_group)
+        
+        btn_export_file = QPushButton('💾 حفظ كملف')
+        btn_export_file.clicked.connect(self.export_to_file)
+        btn_export_file.setMinimumHeight(50)
+        export_layout.addWidget(btn_export_file)
+        
+        btn_export_clipboard = QPushButton('📋 نسخ للحافظة')
+        btn_export_clipboard.clicked.connect(self.copy_to_clipboard)
+        btn_export_clipboard.setMinimumHeight(50)
+        export_layout.addWidget(btn_export_clipboard)
+        
+        btn_export_html = QPushButton('🌐 تحديث index.html مباشرة')
+        btn_export_html.clicked.connect(self.export_to_index_html)
+        btn_export_html.setMinimumHeight(50)
+        export_layout.addWidget(btn_export_html)
+        
+        btn_diff_html = QPushButton('📊 مقارنة مع index.html المنشور')
+        btn_diff_html.clicked.connect(self.show_index_diff)
+        export_layout.addWidget(btn_diff_html)
+        
+        btn_export_word = QPushButton('📄 تصدير إلى وورد (جداول)')
+        btn_export_word.clicked.connect(self.export_to_word)
+        export_layout.addWidget(btn_export_word)
+        
+        btn_lint = QPushButton('🔍 فحص البيانات')
+        btn_lint.clicked.connect(self.show_lint_report)
+        export_layout.addWidget(btn_lint)
+        
+        layout.addWidget(export_group)
+        layout.addStretch()
+        
+        return widget
+    
+    def create_diagnostics_tab(self):
+        """تبويب التشخيص وقياس الأداء"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        timings_group = QGroupBox('أزمنة المراحل')
+        timings_layout = QVBoxLayout(timings_group)
+        
+        self.diagnostics_table = QTableWidget()
+        self.diagnostics_table.setLayoutDirection(Qt.LeftToRight)
+        timings_layout.addWidget(self.diagnostics_table)
+        
+        buttons = QHBoxLayout()
+        btn_refresh = QPushButton('🔄 تحديث')
+        btn_refresh.clicked.connect(self.update_diagnostics)
+        buttons.addWidget(btn_refresh)
+        
+        btn_reset = QPushButton('🧹 تصفير')
+        btn_reset.clicked.connect(self.reset_diagnostics)
+        buttons.addWidget(btn_reset)
+        
+        self.chk_capture = QCheckBox('التقاط تفصيلي (cProfile + tracemalloc)')
+        self.chk_capture.toggled.connect(self.toggle_capture)
+        buttons.addWidget(self.chk_capture)
+        
+        buttons.addStretch()
+        
+        btn_export = QPushButton('💾 تصدير JSON')
+        btn_export.clicked.connect(self.export_diagnostics)
+        buttons.addWidget(btn_export)
+        timings_layout.addLayout(buttons)
+        
+        layout.addWidget(timings_group)
+        
+        self.last_capture = None
+        return widget
+    
+    # ==================== وظائف الاستيراد ====================
+    
+    def open_word_file(self):
+        """فتح ملف وورد"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, 'اختر ملف وورد', '',
+            'Word Files (*.docx *.doc);;ZIP Archives (*.zip);;All Files (*)'
+        )
+        if file_path:
+            self.current_file = file_path
+            self.lbl_file.setText(os.path.basename(file_path))
+            
+            if is_archive(file_path):
+                self.extract_tables_from_archive(file_path)
+            # إذا كان الملف .doc (قديم) نحوله إلى .docx
+            elif file_path.lower().endswith('.doc') and not file_path.lower().endswith('.docx'):
+                converted_path = self.convert_doc_to_docx(file_path)
+                if converted_path:
+                    self.extract_tables_from_word(converted_path)
+                else:
+                    QMessageBox.critical(self, 'خطأ', 
+                        'لم يتم التحويل. جرّب:\n'
+                        '1. تحويل الملف يدوياً إلى .docx من Word\n'
+                        '2. أو تثبيت LibreOffice')
+            else:
+                self.extract_tables_from_word(file_path)
+    
+    def convert_doc_to_docx(self, doc_path):
+        """تحويل ملف .doc إلى .docx"""
+        import subprocess
+        import tempfile
+        
+        # المسار المؤقت للملف المحول
+        temp_dir = tempfile.gettempdir()
+        docx_path = os.path.join(temp_dir, os.path.basename(doc_path) + 'x')
+        
+        # محاولة 1: استخدام LibreOffice
+        try:
+            # البحث عن LibreOffice
+            libreoffice_paths = [
+                r'C:\Program Files\LibreOffice\program\soffice.exe',
+                r'C:\Program Files (x86)\LibreOffice\program\soffice.exe',
+                '/usr/bin/libreoffice',
+                '/usr/bin/soffice',
+                'libreoffice',
+                'soffice'
+            ]
+            
+            soffice = None
+            for path in libreoffice_paths:
+                if os.path.exists(path) or self.command_exists(path):
+                    soffice = path
+                    break
+            
+            if soffice:
+                self.status_bar.showMessage('جاري تحويل الملف...', 0)
+                QApplication.processEvents()
+                
+                result = subprocess.run([
+                    soffice,
+                    '--headless',
+                    '--convert-to', 'docx',
+                    '--outdir', temp_dir,
+                    doc_path
+                ], capture_output=True, timeout=60)
+                
+                if os.path.exists(docx_path):
+                    self.status_bar.showMessage('تم تحويل الملف بنجاح', 3000)
+                    return docx_path
+        except Exception as e:
+            print(f"LibreOffice error: {e}")
+        
+        # محاولة 2: استخدام Word COM (Windows فقط)
+        if sys.platform == 'win32':
+            try:
+                import win32com.client
+                word = win32com.client.Dispatch('Word.Application')
+                word.Visible = False
+                doc = word.Documents.Open(os.path.abspath(doc_path))
+                doc.SaveAs2(docx_path, FileFormat=16)  # 16 = docx
+                doc.Close()
+                word.Quit()
+                
+                if os.path.exists(docx_path):
+                    self.status_bar.showMessage('تم تحويل الملف بنجاح', 3000)
+                    return docx_path
+            except ImportError:
+                QMessageBox.warning(self, 'تنبيه', 
+                    'لتحويل ملفات .doc، ثبّت:\n'
+                    'pip install pywin32\n\n'
+                    'أو استخدم LibreOffice')
+            except Exception as e:
+                print(f"Word COM error: {e}")
+        
+        return None
+    
+    def command_exists(self, cmd):
+        """التحقق من وجود أمر"""
+        import shutil
+        return shutil.which(cmd) is not None
+    
+    def extract_tables_from_word(self, file_path):
+        """استخراج الجداول من ملف وورد"""
+        try:
+            self.release_tables()
+            if self.chk_bounded.isChecked() or os.path.getsize(file_path) > LARGE_DOCUMENT_BYTES:
+                self.extract_tables_bounded(file_path)
+                return
+            self.add_tables(read_word_tables(file_path))
+            self.status_bar.showMessage(f'تم استخراج {len(self.word_tables)} جدول', 5000)
+            
+        except Exception as e:
+            QMessageBox.critical(self, 'خطأ', f'فشل في قراءة الملف:\n{str(e)}')
+    
+    def extract_tables_from_archive(self, file_path):
+        """استخراج الجداول من كل ملفات الوورد داخل أرشيف zip"""
+        try:
+            self.status_bar.showMessage('جاري قراءة الأرشيف...', 0)
+            QApplication.processEvents()
+            
+            self.release_tables()
+            members = read_archive_tables(file_path)
+            for name, tables in members:
+                self.add_tables(tables, f'{os.path.basename(name)} - ')
+            
+            self.status_bar.showMessage(
+                f'تم استخراج {len(self.word_tables)} جدول من {len(members)} ملف', 5000)
+            
+        except Exception as e:
+            QMessageBox.critical(self, 'خطأ', f'فشل في قراءة الأرشيف:\n{str(e)}')
+    
+    def extract_tables_bounded(self, file_path):
+        """استخراج تدفقي: الملخصات فقط في الذاكرة والصفوف تُقرأ من ملف مؤقت عند الحاجة"""
+        self.status_bar.showMessage('جاري قراءة الملف تدفقياً...', 0)
+        QApplication.processEvents()
+        
+        store = stream_word_tables(file_path)
+        self.word_tables = store
+        truncated = dropped = 0
+        for i, table in enumerate(store.tables):
+            self.add_table_item(i, table['header'], table['rows'])
+            truncated += table['truncated_cells']
+            dropped += table['dropped_rows']
+        
+        message = f'تم استخراج {len(store)} جدول (ذاكرة محدودة)'
+        if truncated or dropped:
+            message += f' - اقتُطعت {truncated} خلية وأُهمل {dropped} صف لتجاوز الحدود'
+        self.status_bar.showMessage(message, 8000)
+    
+    def release_tables(self):
+        """تفريغ الجداول المستخرجة سابقاً وحذف ملفها المؤقت إن وجد"""
+        if isinstance(getattr(self, 'word_tables', None), TableStore):
+            self.word_tables.close()
+        self.word_tables = []
+        self.tables_list.clear()
+    
+    def add_tables(self, tables, prefix=''):
+        """إضافة جداول مستخرجة إلى القائمة"""
+        for i, rows in enumerate(tables):
+            self.word_tables.append(rows)
+            self.add_table_item(i, rows[0], len(rows), prefix)
+    
+    def add_table_item(self, i, first_row, row_count, prefix=''):
+        # تحديد اسم الجدول من أول خلية
+        first_text = first_row[0] if first_row else f'جدول {i+1}'
+        preview = first_text[:50] + '...' if len(first_text) > 50 else first_text
+        self.tables_list.addItem(f'{prefix}جدول {i+1}: {preview} ({row_count} صف)')
+    
+    def on_table_selected(self, item):
+        """عند اختيار جدول"""
+        idx = self.tables_list.currentRow()
+        if idx >= 0 and idx < len(self.word_tables):
+            if isinstance(self.word_tables, TableStore):
+                self.show_table_preview(self.word_tables.rows(idx, PREVIEW_ROWS))
+            else:
+                self.show_table_preview(self.word_tables[idx][:PREVIEW_ROWS])
+    
+    def show_table_preview(self, table_data):
+        """عرض معاينة الجدول"""
+        self.table_preview.clear()
+        if not table_data:
+            return
+        
+        # تحديد عدد الأعمدة
+        max_cols = max(len(row) for row in table_data)
+        self.table_preview.setRowCount(len(table_data))
+        self.table_preview.setColumnCount(max_cols)
+        
+        for i, row in enumerate(table_data):
+            for j, cell in enumerate(row):
+                item = QTableWidgetItem(cell[:100])  # اقتصار النص
+                self.table_preview.setItem(i, j, item)
+        
+        self.table_preview.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    
+    def import_selected_table(self):
+        """استيراد الجدول المحدد"""
+        idx = self.tables_list.currentRow()
+        if idx < 0:
+            QMessageBox.warning(self, 'تنبيه', 'اختر جدولاً أولاً')
+            return
+        
+        category = self.cmb_import_category.currentText()
+        table_data = self.word_tables[idx]
+        
+        new_templates = rows_to_templates(table_data, category)
+        report = self.normalize_imported({category: new_templates})
+        with INSTRUMENTS.stage('store_insert'):
+            self.history.push(ImportTemplates({category: new_templates}))
+        imported = len(new_templates)
+        
+        self.update_history_buttons()
+        self.update_templates_list()
+        self.update_status()
+        QMessageBox.information(self, 'تم', f'تم استيراد {imported} نموذج إلى "{category}"{report}')
+    
+    def import_all_tables(self):
+        """استيراد كل الجداول تلقائياً"""
+        if not hasattr(self, 'word_tables') or not self.word_tables:
+            QMessageBox.warning(self, 'تنبيه', 'لا توجد جداول للاستيراد')
+            return
+        
+        classified = classify_tables(self.word_tables)
+        report = self.normalize_imported(classified)
+        with INSTRUMENTS.stage('store_insert'):
+            total_imported = self.history.push(ImportTemplates(classified)).count
+        
+        self.refresh_after_history()
+        QMessageBox.information(self, 'تم', f'تم استيراد {total_imported} نموذج{report}')
+    
+    def normalize_imported(self, templates):
+        """تنظيف النماذج المستوردة قبل إضافتها وإرجاع سطر التقرير"""
+        if not self.chk_normalize.isChecked():
+            return ''
+        hits = normalize_templates(templates)
+        return '\n' + format_normalization_report(hits) if hits else ''
+    
+    # ==================== وظائف التحرير اليدوي ====================
+    
+    def on_category_changed(self, index):
+        """عند تغيير التصنيف"""
+        self.update_templates_list()
+    
+    def update_templates_list(self):
+        """تحديث قائمة النماذج"""
+        self.templates_list.clear()
+        
+        current_row = self.categories_list.currentRow()
+        if current_row < 0:
+            return
+        
+        category = self.categories_list.item(current_row).text()
+        
+        if category in self.templates:
+            for i, tmpl in enumerate(self.templates[category]):
+                display = f"[{tmpl.num}] {tmpl.keyword}: {tmpl.content[:40]}..."
+                self.templates_list.addItem(display)
+    
+    def on_template_selected(self, index):
+        """عند اختيار نموذج"""
+        if index < 0:
+            return
+        
+        current_cat = self.categories_list.currentItem()
+        if not current_cat:
+            return
+        
+        category = current_cat.text()
+        
+        if category in self.templates and index < len(self.templates[category]):
+            tmpl = self.templates[category][index]
+            self.txt_num.setText(tmpl.num)
+            self.txt_keyword.setText(tmpl.keyword)
+            self.txt_content.setPlainText(tmpl.content)
+    
+    def add_category(self):
+        """إضافة تصنيف جديد"""
+        name, ok = QInputDialog.getText(self, 'تصنيف جديد', 'اسم التصنيف:')
+        if ok and name:
+            if name not in self.templates:
+                self.history.push(AddCategory(name))
+                self.categories_list.addItem(name)
+                self.cmb_import_category.addItem(name)
+                self.update_history_buttons()
+    
+    def delete_category(self):
+        """حذف التصنيف المحدد"""
+        current = self.categories_list.currentItem()
+        if not current:
+            return
+        
+        name = current.text()
+        reply = QMessageBox.question(
+            self, 'تأكيد الحذف',
+            f'هل تريد حذف التصنيف "{name}" وجميع نماذجه؟',
+            QMessageBox.Yes | QMessageBox.No
+        )
+        
+        if reply == QMessageBox.Yes:
+            if name in self.templates:
+                self.history.push(DeleteCategory(name))
+                self.update_history_buttons()
+            self.categories_list.takeItem(self.categories_list.currentRow())
+            
+            # حذف من القائمة المنسدلة
+            idx = self.cmb_import_category.findText(name)
+            if idx >= 0:
+                self.cmb_import_category.removeItem(idx)
+    
+    def add_template(self):
+        """إضافة نموذج جديد"""
+        current_cat = self.categories_list.currentItem()
+        if not current_cat:
+            QMessageBox.warning(self, 'تنبيه', 'اختر تصنيفاً أولاً')
+            return
+        
+        category = current_cat.text()
+        
+        # إنشاء نموذج فارغ
+        tmpl = Template('', '', '', category)
+        self.history.push(AddTemplate(category, tmpl))
+        self.update_history_buttons()
+        self.update_templates_list()
+        
+        # تحديد النموذج الجديد
+        self.templates_list.setCurrentRow(len(self.templates[category]) - 1)
+        self.clear_editor()
+    
+    def delete_template(self):
+        """حذف النموذج المحدد"""
+        current_cat = self.categories_list.currentItem()
+        current_tmpl = self.templates_list.currentRow()
+        
+        if not current_cat or current_tmpl < 0:
+            return
+        
+        category = current_cat.text()
+        
+        reply = QMessageBox.question(
+            self, 'تأكيد الحذف',
+            'هل تريد حذف هذا النموذج؟',
+            QMessageBox.Yes | QMessageBox.No
+        )
+        
+        if reply == QMessageBox.Yes:
+            if category in self.templates:
+                self.history.push(DeleteTemplate(category, current_tmpl))
+                self.update_history_buttons()
+                self.update_templates_list()
+                self.clear_editor()
+                self.update_status()
+    
+    def save_current_template(self):
+        """حفظ التعديلات على النموذج الحالي"""
+        current_cat = self.categories_list.currentItem()
+        current_idx = self.templates_list.currentRow()
+        
+        if not current_cat or current_idx < 0:
+            QMessageBox.warning(self, 'تنبيه', 'اختر نموذجاً أولاً')
+            return
+        
+        category = current_cat.text()
+        
+        if category in self.templates and current_idx < len(self.templates[category]):
+            self.history.push(EditTemplate(
+                category, current_idx,
+                self.txt_num.text().strip(),
+                self.txt_keyword.text().strip(),
+                self.txt_content.toPlainText().strip(),
+            ))
+            
+            self.update_history_buttons()
+            self.update_templates_list()
+            self.templates_list.setCurrentRow(current_idx)
+            self.update_status()
+            
+            # فحص تزايدي للتصنيف المعدّل فقط، مع ما يرتبط به كالرقم المكرر في نموذج لاحق
+            issues = [
+                issue for issue in lint_templates(self.templates, {category})
+                if current_idx in (issue['index'], issue.get('related'))
+            ]
+            if issues:
+                self.status_bar.showMessage(
+                    'تم الحفظ مع ملاحظات: ' + ' | '.join(i['message'] for i in issues), 8000)
+            else:
+                self.status_bar.showMessage('تم حفظ التعديلات', 3000)
+    
+    # ==================== التراجع والإعادة ====================
+    
+    def undo(self):
+        command = self.history.undo()
+        if command:
+            self.refresh_after_history()
+            self.status_bar.showMessage(f'تم التراجع عن: {command.label}', 3000)
+    
+    def redo(self):
+        command = self.history.redo()
+        if command:
+            self.refresh_after_history()
+            self.status_bar.showMessage(f'تمت إعادة: {command.label}', 3000)
+    
+    def update_history_buttons(self):
+        self.btn_undo.setEnabled(self.history.can_undo())
+        self.btn_redo.setEnabled(self.history.can_redo())
+    
+    def refresh_after_history(self):
+        """مزامنة القوائم مع المخزن بعد تراجع أو إعادة، مع إبقاء التصنيف المحدد"""
+        names = list(self.templates.keys())
+        listed = [self.categories_list.item(i).text() for i in range(self.categories_list.count())]
+        if names != listed:
+            current = self.categories_list.currentItem()
+            current = current.text() if current else None
+            self.categories_list.clear()
+            self.categories_list.addItems(names)
+            self.cmb_import_category.clear()
+            self.cmb_import_category.addItems(names)
+            if current in names:
+                self.categories_list.setCurrentRow(names.index(current))
+        
+        row = self.templates_list.currentRow()
+        self.update_templates_list()
+        if 0 <= row < self.templates_list.count():
+            self.templates_list.setCurrentRow(row)
+        self.update_history_buttons()
+        self.update_status()
+    
+    def clear_editor(self):
+        """مسح حقول التحرير"""
+        self.txt_num.clear()
+        self.txt_keyword.clear()
+        self.txt_content.clear()
+    
+    def show_template_context_menu(self, pos):
+        """قائمة السياق للنماذج"""
+        menu = QMenu(self)
+        
+        action_copy = menu.addAction('📋 نسخ المحتوى')
+        action_copy.triggered.connect(self.copy_template_content)
+        
+        action_history = menu.addAction('📜 سجل التعديلات')
+        action_history.triggered.connect(self.show_template_history)
+        
+        action_delete = menu.addAction('🗑️ حذف')
+        action_delete.triggered.connect(self.delete_template)
+        
+        menu.exec_(self.templates_list.mapToGlobal(pos))
+    
+    def show_template_history(self):
+        """اختيار مراجعة سابقة وتحميلها في المحرر (تُسترجع بالحفظ)"""
+        current_cat = self.categories_list.currentItem()
+        current_idx = self.templates_list.currentRow()
+        if not current_cat or current_idx < 0:
+            return
+        
+        history = self.templates[current_cat.text()][current_idx].history
+        if not history:
+            self.status_bar.showMessage('لا يوجد سجل تعديلات لهذا النموذج', 3000)
+            return
+        
+        # رقم المراجعة يميّز المراجعات المحفوظة في نفس الثانية، كما في --history
+        labels = [
+            f"{index}  {revision['time'].replace('T', ' ') or 'قبل بدء السجل'}"
+            for index, revision in enumerate(history.revisions)
+        ]
+        choices = list(reversed(labels))
+        choice, ok = QInputDialog.getItem(self, 'سجل التعديلات', 'اختر المراجعة:', choices, 0, False)
+        if ok:
+            index = len(labels) - 1 - choices.index(choice)
+            self.txt_content.setPlainText(history.content_at_revision(index))
+            self.status_bar.showMessage(f'تم تحميل مراجعة {choice}، احفظ التعديلات لاسترجاعها', 5000)
+    
+    def copy_template_content(self):
+        """نسخ محتوى النموذج"""
+        content = self.txt_content.toPlainText()
+        if content:
+            QApplication.clipboard().setText(content)
+            self.status_bar.showMessage('تم النسخ للحافظة', 3000)
+    
+    # ==================== وظائف المعاينة والتصدير ====================
+    
+    def update_preview(self):
+        """تحديث المعاينة"""
+        format_type = self.cmb_format.currentIndex()
+        
+        # حساب الإحصائيات
+        total = sum(len(tmpls) for tmpls in self.templates.values())
+        non_empty_cats = sum(1 for tmpls in self.templates.values() if tmpls)
+        
+        self.lbl_total_templates.setText(f'إجمالي النماذج: {total}')
+        self.lbl_total_categories.setText(f'التصنيفات: {non_empty_cats}')
+        
+        placeholders = Counter()
+        for tmpls in self.templates.values():
+            for t in tmpls:
+                placeholders.update(count_placeholders(t.content))
+        self.lbl_total_placeholders.setText(f'العناصر النائبة: {sum(placeholders.values())}')
+        
+        # إنشاء الكود
+        if format_type == 0:  # JavaScript
+            code = self.generate_js_code()
+        else:  # JSON
+            code = self.generate_json_code()
+        
+        self.preview_text.setPlainText(code)
+    
+    def generate_js_code(self, minify=False, segments=False):
+        """إنشاء كود JavaScript"""
+        return render_js(build_export_data(self.templates, segments), minify)
+    
+    def generate_json_code(self, minify=False, segments=False):
+        """إنشاء كود JSON"""
+        return render_json(build_export_data(self.templates, segments), minify)
+    
+    def copy_to_clipboard(self):
+        """نسخ للحافظة"""
+        format_type = self.cmb_format.currentIndex() if hasattr(self, 'cmb_format') else 0
+        minify = self.chk_minify.isChecked() if hasattr(self, 'chk_minify') else False
+        segments = self.chk_segments.isChecked() if hasattr(self, 'chk_segments') else False
+        
+        if format_type == 0:
+            code = self.generate_js_code(minify, segments)
+        else:
+            code = self.generate_json_code(minify, segments)
+        
+        QApplication.clipboard().setText(code)
+        self.status_bar.showMessage('تم النسخ للحافظة ✓', 3000)
+        QMessageBox.information(self, 'تم', 'تم نسخ الكود للحافظة بنجاح')
+    
+    def show_lint_report(self):
+        """عرض نتيجة فحص البيانات"""
+        summary = lint_summary(lint_templates(self.templates))
+        if not summary['issues']:
+            QMessageBox.information(self, 'الفحص', 'لا توجد مشاكل ✓')
+            return
+        
+        lines = [
+            f"[{i['category']} #{i['index'] + 1}] {i['message']}"
+            for i in summary['issues'][:30]
+        ]
+        if len(summary['issues']) > 30:
+            lines.append(f"... و{len(summary['issues']) - 30} أخرى")
+        QMessageBox.warning(
+            self, 'الفحص',
+            f"أخطاء: {summary['errors']} | تنبيهات: {summary['warnings']}\n\n" + '\n'.join(lines)
+        )
+    
+    def confirm_export(self):
+        """التأكد من خلو البيانات من الأخطاء قبل التصدير"""
+        summary = lint_summary(lint_templates(self.templates))
+        if not summary['errors']:
+            return True
+        reply = QMessageBox.question(
+            self, 'تنبيه',
+            f"توجد {summary['errors']} أخطاء في البيانات. هل تريد المتابعة؟",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        return reply == QMessageBox.Yes
+    
+    def export_to_file(self):
+        """تصدير كملف"""
+        if not self.confirm_export():
+            return
+        
+        format_idx = self.cmb_export_format.currentIndex()
+        minify = self.chk_minify.isChecked()
+        segments = self.chk_segments.isChecked()
+        
+        if format_idx == 0:  # JavaScript
+            ext = 'js'
+            code = self.generate_js_code(minify, segments)
+        else:  # JSON
+            ext = 'json'
+            code = self.generate_json_code(minify, segments)
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, 'حفظ الملف', f'templatesData.{ext}',
+            f'{ext.upper()} Files (*.{ext});;All Files (*)'
+        )
+        
+        if file_path:
+            try:
+                if self.chk_production.isChecked():
+                    report = export_production(self.templates, file_path, segments)
+                    QMessageBox.information(self, 'تم', f'تم حفظ الملف:\n{file_path}\n\n{format_size_report(report)}')
+                    return
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(code)
+                QMessageBox.information(self, 'تم', f'تم حفظ الملف:\n{file_path}')
+            except Exception as e:
+                QMessageBox.critical(self, 'خطأ', f'فشل في الحفظ:\n{str(e)}')
+    
+    def export_to_index_html(self):
+        """تحديث كتلة templatesData داخل index.html"""
+        if not self.confirm_export():
+            return
+        
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, 'اختر index.html', getattr(self, 'index_html_path', '') or 'index.html',
+            'HTML Files (*.html *.htm);;All Files (*)'
+        )
+        
+        if file_path:
+            self.index_html_path = file_path
+            code = self.generate_js_code(self.chk_minify.isChecked(), self.chk_segments.isChecked())
+            try:
+                if patch_index_html(file_path, code):
+                    QMessageBox.information(self, 'تم', f'تم تحديث الملف:\n{file_path}')
+                else:
+                    self.status_bar.showMessage('لا توجد تغييرات في البيانات', 3000)
+            except Exception as e:
+                QMessageBox.critical(self, 'خطأ', f'فشل في التحديث:\n{str(e)}')
+    
+    def show_index_diff(self):
+        """عرض ما سيتغير في index.html قبل النشر"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, 'اختر index.html', getattr(self, 'index_html_path', '') or 'index.html',
+            'HTML Files (*.html *.htm);;JavaScript/JSON (*.js *.json);;All Files (*)'
+        )
+        if not file_path:
+            return
+        
+        try:
+            report = diff_templates(load_templates_data(file_path), build_export_data(self.templates))
+        except Exception as e:
+            QMessageBox.critical(self, 'خطأ', f'فشل في المقارنة:\n{str(e)}')
+            return
+        
+        changelog = format_changelog(report)
+        box = QMessageBox(QMessageBox.Information, 'المقارنة مع المنشور', changelog.split('\n', 1)[0], parent=self)
+        if '\n' in changelog:
+            box.setDetailedText(changelog.split('\n', 1)[1])
+        box.exec_()
+    
+    def export_to_word(self):
+        """إعادة النماذج إلى ملف وورد بجداول التصنيفات لتعديله ثم استيراده"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, 'حفظ ملف وورد', 'النماذج.docx', 'Word Files (*.docx);;All Files (*)'
+        )
+        
+        if file_path:
+            try:
+                report = export_word_tables(self.templates, file_path)
+            except Exception as e:
+                QMessageBox.critical(self, 'خطأ', f'فشل في التصدير:\n{str(e)}')
+                return
+            message = f"تم تصدير {report['templates']} نموذج في {report['tables']} جدول:\n{file_path}"
+            if report['unrecognized']:
+                message += '\n\nتصنيفات لن يُتعرف عليها عند الاستيراد: ' + '، '.join(report['unrecognized'])
+            if report['too_short']:
+                message += f"\n\n{report['too_short']} نموذج قصير سيتخطاه الاستيراد"
+            QMessageBox.information(self, 'تم', message)
+    
+    # ==================== التشخيص ====================
+    
+    def update_diagnostics(self):
+        """عرض إحصائيات أزمنة المراحل"""
+        summary = INSTRUMENTS.summary()
+        stages = summary['stages']
+        headers = ['المرحلة', 'العدد', 'المتوسط (ms)', 'p50 (ms)', 'p95 (ms)', 'الأقصى (ms)']
+        headers += [f'<{b * 1000:g}ms' for b in summary['buckets']] + ['أكثر']
+        
+        self.diagnostics_table.clear()
+        self.diagnostics_table.setColumnCount(len(headers))
+        self.diagnostics_table.setHorizontalHeaderLabels(headers)
+        self.diagnostics_table.setRowCount(len(stages))
+        
+        for i, (name, stats) in enumerate(sorted(stages.items())):
+            values = [name, str(stats['count'])]
+            values += [f"{stats[key] * 1000:.2f}" for key in ('mean', 'p50', 'p95', 'max')]
+            values += [str(n) for n in stats['histogram']]
+            for j, value in enumerate(values):
+                self.diagnostics_table.setItem(i, j, QTableWidgetItem(value))
+        
+        self.diagnostics_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+    
+    def reset_diagnostics(self):
+        INSTRUMENTS.reset()
+        self.last_capture = None
+        self.update_diagnostics()
+    
+    def toggle_capture(self, enabled):
+        """تشغيل أو إيقاف الالتقاط التفصيلي"""
+        if enabled:
+            INSTRUMENTS.start_capture()
+            self.status_bar.showMessage('بدأ الالتقاط التفصيلي', 3000)
+        else:
+            self.last_capture = INSTRUMENTS.stop_capture()
+            self.status_bar.showMessage('تم إيقاف الالتقاط التفصيلي', 3000)
+    
+    def export_diagnostics(self):
+        """تصدير أرقام التشخيص لإرفاقها ببلاغات الأداء"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, 'حفظ التشخيص', 'diagnostics.json',
+            'JSON Files (*.json);;All Files (*)'
+        )
+        
+        if file_path:
+            if INSTRUMENTS.capturing:
+                self.chk_capture.setChecked(False)
+            try:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(INSTRUMENTS.to_json(self.last_capture))
+                self.status_bar.showMessage('تم حفظ التشخيص', 3000)
+            except Exception as e:
+                QMessageBox.critical(self, 'خطأ', f'فشل في الحفظ:\n{str(e)}')
+    
+    # ==================== حفظ/تحميل المشروع ====================
+    
+    def save_project(self):
+        """حفظ المشروع"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, 'حفظ المشروع', 'templates_project.json',
+            'JSON Files (*.json);;All Files (*)'
+        )
+        
+        if file_path:
+            try:
+                write_project(self.templates, file_path)
+                self.status_bar.showMessage('تم حفظ المشروع', 3000)
+            except Exception as e:
+                QMessageBox.critical(self, 'خطأ', f'فشل في الحفظ:\n{str(e)}')
+    
+    def load_project(self):
+        """تحميل مشروع"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, 'تحميل مشروع', '', 'JSON Files (*.json);;All Files (*)'
+        )
+        
+        if file_path:
+            try:
+                self.templates = read_project(file_path)
+                self.history = UndoStack(self.templates)
+                self.update_history_buttons()
+                
+                # تحديث القوائم
+                self.categories_list.clear()
+                self.categories_list.addItems(list(self.templates.keys()))
+                
+                self.cmb_import_category.clear()
+                self.cmb_import_category.addItems(list(self.templates.keys()))
+                
+                self.update_status()
+                self.status_bar.showMessage('تم تحميل المشروع', 3000)
+                
+            except Exception as e:
+                QMessageBox.critical(self, 'خطأ', f'فشل في التحميل:\n{str(e)}')
+    
+    def merge_projects(self):
+        """دمج مشاريع أخرى في المشروع الحالي مع تقرير بالتعارضات"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, 'اختر المشاريع المراد دمجها', '', 'JSON Files (*.json);;All Files (*)'
+        )
+        if not file_paths:
+            return
+        
+        labels = {
+            'keep-newest': 'الأحدث تعديلاً',
+            'keep-both': 'الإبقاء على النسختين',
+            'manual': 'الإبقاء على الحالي ومراجعة التعارضات يدوياً',
+        }
+        choice, ok = QInputDialog.getItem(
+            self, 'سياسة التعارض', 'عند اختلاف نفس النموذج بين المشاريع:',
+            [labels[p] for p in MERGE_POLICIES], 0, False
+        )
+        if not ok:
+            return
+        policy = MERGE_POLICIES[[labels[p] for p in MERGE_POLICIES].index(choice)]
+        
+        try:
+            merged, report = merge_projects(file_paths, policy, base=self.templates)
+        except Exception as e:
+            QMessageBox.critical(self, 'خطأ', f'فشل في الدمج:\n{str(e)}')
+            return
+        
+        self.history.push(ReplaceTemplates(merged))
+        self.refresh_after_history()
+        
+        message = (f"عدد النماذج بعد الدمج: {report['templates']}\n"
+                   f"مكرر: {report['duplicates']}\nتعارضات: {len(report['conflicts'])}")
+        if not report['conflicts']:
+            QMessageBox.information(self, 'تم', message)
+            return
+        reply = QMessageBox.question(
+            self, 'تم', message + '\n\nهل تريد حفظ تقرير التعارضات؟',
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            file_path, _ = QFileDialog.getSaveFileName(
+                self, 'حفظ تقرير التعارضات', 'conflicts.json', 'JSON Files (*.json);;All Files (*)'
+            )
+            if file_path:
+                atomic_write(file_path, json.dumps(report, ensure_ascii=False, indent=2))
+    
+    # ==================== المظهر ====================
+    
+    def toggle_theme(self):
+        """تبديل الوضع الليلي"""
+        self.is_dark_mode = not self.is_dark_mode
+        if self.is_dark_mode:
+            self.apply_dark_theme()
+            self.btn_theme.setText('☀️ الوضع النهاري')
+        else:
+            self.apply_light_theme()
+            self.btn_theme.setText('🌙 الوضع الليلي')
+    
+    def apply_light_theme(self):
+        """تطبيق المظهر الفاتح"""
+        self.setStyleSheet("""
+            QMainWindow, QWidget {
+                background-color: #f8f6f1;
+                color: #2c2c2c;
+                font-family: 'Tajawal', 'Segoe UI', sans-serif;
+                font-size: 14px;
+            }
+            QGroupBox {
+                font-weight: bold;
+                border: 2px solid #e0ddd5;
+                border-radius: 8px;
+                margin-top: 10px;
+                padding-top: 10px;
+                background-color: #ffffff;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                subcontrol-position: top right;
+                padding: 0 10px;
+                color: #1a5f4a;
+            }
+            QPushButton {
+                background-color: #1a5f4a;
+                color: white;
+                border: none;
+                padding: 8px 16px;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #2d8b6e;
+            }
+            QPushButton:pressed {
+                background-color: #0d3d2f;
+            }
+            QLineEdit, QTextEdit, QComboBox, QSpinBox {
+                border: 2px solid #e0ddd5;
+                border-radius: 6px;
+                padding: 8px;
+                background-color: #ffffff;
+            }
+            QLineEdit:focus, QTextEdit:focus, QComboBox:focus {
+                border-color: #1a5f4a;
+            }
+            QListWidget, QTableWidget {
+                border: 2px solid #e0ddd5;
+                border-radius: 6px;
+                background-color: #ffffff;
+            }
+            QListWidget::item:selected, QTableWidget::item:selected {
+                background-color: #1a5f4a;
+                color: white;
+            }
+            QTabWidget::pane {
+                border: 2px solid #e0ddd5;
+                border-radius: 8px;
+                background-color: #ffffff;
+            }
+            QTabBar::tab {
+                background-color: #e0ddd5;
+                padding: 10px 20px;
+                margin-right: 2px;
+                border-top-left-radius: 6px;
+                border-top-right-radius: 6px;
+            }
+            QTabBar::tab:selected {
+                background-color: #1a5f4a;
+                color: white;
+            }
+            QStatusBar {
+                background-color: #1a5f4a;
+                color: white;
+            }
+            QHeaderView::section {
+                background-color: #1a5f4a;
+                color: white;
+                padding: 8px;
+                border: none;
+            }
+        """)
+    
+    def apply_dark_theme(self):
+        """تطبيق المظهر الداكن"""
+        self.setStyleSheet("""
+            QMainWindow, QWidget {
+                background-color: #1a1a1a;
+                color: #f0f0f0;
+                font-family: 'Tajawal', 'Segoe UI', sans-serif;
+                font-size: 14px;
+            }
+            QGroupBox {
+                font-weight: bold;
+                border: 2px solid #404040;
+                border-radius: 8px;
+                margin-top: 10px;
+                padding-top: 10px;
+                background-color: #2d2d2d;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                subcontrol-position: top right;
+                padding: 0 10px;
+                color: #2d8b6e;
+            }
+            QPushButton {
+                background-color: #2d8b6e;
+                color: white;
+                border: none;
+                padding: 8px 16px;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #3da37f;
+            }
+            QPushButton:pressed {
+                background-color: #1a5f4a;
+            }
+            QLineEdit, QTextEdit, QComboBox, QSpinBox {
+                border: 2px solid #404040;
+                border-radius: 6px;
+                padding: 8px;
+                background-color: #2d2d2d;
+                color: #f0f0f0;
+            }
+            QLineEdit:focus, QTextEdit:focus, QComboBox:focus {
+                border-color: #2d8b6e;
+            }
+            QListWidget, QTableWidget {
+                border: 2px solid #404040;
+                border-radius: 6px;
+                background-color: #2d2d2d;
+                color: #f0f0f0;
+            }
+            QListWidget::item:selected, QTableWidget::item:selected {
+                background-color: #2d8b6e;
+                color: white;
+            }
+            QTabWidget::pane {
+                border: 2px solid #404040;
+                border-radius: 8px;
+                background-color: #2d2d2d;
+            }
+            QTabBar::tab {
+                background-color: #404040;
+                color: #f0f0f0;
+                padding: 10px 20px;
+                margin-right: 2px;
+                border-top-left-radius: 6px;
+                border-top-right-radius: 6px;
+            }
+            QTabBar::tab:selected {
+                background-color: #2d8b6e;
+                color: white;
+            }
+            QStatusBar {
+                background-color: #2d8b6e;
+                color: white;
+            }
+            QHeaderView::section {
+                background-color: #2d8b6e;
+                color: white;
+                padding: 8px;
+                border: none;
+            }
+            QComboBox QAbstractItemView {
+                background-color: #2d2d2d;
+                color: #f0f0f0;
+                selection-background-color: #2d8b6e;
+            }
+        """)
+    
+    def update_status(self):
+        """تحديث شريط الحالة"""
+        total = sum(len(tmpls) for tmpls in self.templates.values())
+        self.status_bar.showMessage(f'إجمالي النماذج: {total}')
+
+
+
+def run_gui(started=None, startup_time=False):
+    """تشغيل الواجهة
+    
+    startup_time: طباعة الزمن حتى أول رسم للنافذة ثم الخروج (لقياس زمن الإقلاع)
+    """
+    app = QApplication(sys.argv)
+    app.setLayoutDirection(Qt.RightToLeft)
+    
+    # تعيين الخط
+    font = QFont('Tajawal', 11)
+    app.setFont(font)
+    
+    window = TemplateConverter()
+    window.show()
+    
+    if startup_time:
+        import time
+        
+        def report_first_paint():
+            elapsed = time.perf_counter() - (started or 0)
+            print(f'first_paint_ms={elapsed * 1000:.1f}')
+            app.quit()
+        QTimer.singleShot(0, report_first_paint)
+    
+    return app.exec_()